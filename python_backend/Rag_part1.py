@@ -45,7 +45,8 @@
 
 import os
 import json
-from langchain_chroma import Chroma
+from hnsw_config import build_vector_store
+from profile_store import get_profile_store, profile_id
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
 
@@ -74,6 +75,7 @@ if not os.path.exists(persistence_path):
             page_content=student_json,
             metadata={
                 "student_id": str(student.get("_id", {}).get("$oid", "")),
+                "profile_id": profile_id(student) or "",
                 "name": student.get("name", ""),
                 "skills": ", ".join(student.get("skills", [])),
                 "interests": ", ".join(student.get("interests", []))
@@ -92,8 +94,12 @@ if not os.path.exists(persistence_path):
     
     # Create the vector store and persist it
     print("Creating Chroma Vector Store...")
-    db = Chroma.from_documents(docs, embeddings, persist_directory=persistence_path)
+    db = build_vector_store(docs, embeddings, persistence_path)
     print('Chroma Vector Store Created')
+
+    # Keep whole parsed profiles next to the index for response hydration
+    stored = get_profile_store('students').put_many(students_data)
+    print(f'Profile Store Updated: {stored} profiles')
     
 else:
     print("Chroma Vector Store already exists.")
\ No newline at end of file
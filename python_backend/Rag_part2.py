@@ -1,4 +1,4 @@
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+from embedding_server import load_embedding_model
 from langchain_chroma import Chroma
 from langchain_mistralai import ChatMistralAI
 from dotenv import load_dotenv
@@ -12,7 +12,7 @@ def recommend_student(query):
     # Load the Chroma vector store for students
     current_dir = os.path.dirname(__file__)
     persistance_dir = os.path.join(current_dir, 'db', 'students_data')
-    embeddings = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
+    embeddings = load_embedding_model()
     db = Chroma(persist_directory=persistance_dir, embedding_function=embeddings)
 
     # Retrieve relevant documents
@@ -66,7 +66,7 @@ def recommend_mentor(query):
     # Load the Chroma vector store for mentors
     current_dir = os.path.dirname(__file__)
     persistance_dir = os.path.join(current_dir, 'db', 'mentors_data')
-    embeddings = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
+    embeddings = load_embedding_model()
     db = Chroma(persist_directory=persistance_dir, embedding_function=embeddings)
 
     # Retrieve relevant documents
@@ -0,0 +1,280 @@
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Any, Tuple
+
+# Framing shared by every feature: 40 ms windows hold two periods of the
+# lowest pitch searched, and a 10 ms hop matches Praat's default pitch step
+FRAME_SECONDS = 0.04
+HOP_SECONDS = 0.01
+
+PITCH_FLOOR = 75.0
+PITCH_CEILING = 600.0
+VOICING_THRESHOLD = 0.45   # Praat's default voicing threshold
+SILENCE_THRESHOLD = 0.03   # Praat's default, relative to the loudest frame
+OCTAVE_COST = 0.01         # Praat's default, favours the higher of two octave candidates
+
+PAUSE_THRESHOLD = 0.1      # RMS relative to the loudest frame
+MIN_PAUSE_SECONDS = 0.3
+
+REFERENCE_PRESSURE = 2e-5
+BLOCK_FRAMES = int(os.getenv("ACOUSTIC_BLOCK_FRAMES", "4096"))
+
+# Voice activity detection for ASR: looser than pause detection so soft
+# word endings stay in, and only silences long enough to be worth skipping are cut
+VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.05"))
+VAD_MIN_SILENCE = float(os.getenv("VAD_MIN_SILENCE", "0.6"))
+VAD_PADDING = float(os.getenv("VAD_PADDING", "0.2"))
+
+def _run_lengths(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of every run of True values."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _frame_block(frames: np.ndarray, window: np.ndarray, window_ac: np.ndarray,
+                 min_lag: int, max_lag: int, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Power, pitch candidate and its strength for a block of frames.
+
+    Pitch uses Boersma's method: the autocorrelation of the windowed frame
+    divided by the autocorrelation of the window, searched over the allowed
+    lags and refined with parabolic interpolation.
+    """
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    power = np.mean(frames ** 2, axis=1)
+
+    windowed = frames * window
+    n_fft = 1 << int(np.ceil(np.log2(2 * frames.shape[1])))
+    spectrum = np.fft.rfft(windowed, n=n_fft, axis=1)
+    ac = np.fft.irfft(np.abs(spectrum) ** 2, n=n_fft, axis=1)[:, :max_lag + 2]
+
+    energy = np.maximum(ac[:, :1], 1e-20)
+    r = (ac / energy) / window_ac[:max_lag + 2]
+
+    lags = np.arange(min_lag, max_lag + 1)
+    candidates = r[:, min_lag:max_lag + 1]
+    scores = candidates + OCTAVE_COST * np.log2(sr / (lags * PITCH_FLOOR))
+    best = np.argmax(scores, axis=1)
+    lag = best + min_lag
+    rows = np.arange(len(frames))
+
+    # Parabolic interpolation around the peak for sub-sample lag precision
+    left, center, right = r[rows, lag - 1], r[rows, lag], r[rows, lag + 1]
+    denominator = left - 2 * center + right
+    # Only divides where the peak is curved; flat (silent) frames keep a zero shift
+    shift = np.divide(
+        0.5 * (left - right),
+        denominator,
+        out=np.zeros_like(denominator),
+        where=np.abs(denominator) > 1e-12
+    )
+    shift = np.clip(shift, -0.5, 0.5)
+
+    f0 = sr / (lag + shift)
+    strength = center - 0.25 * (left - right) * shift
+    return power, f0, strength, windowed
+
+def frame_rms(y: np.ndarray, sr: int, frame_seconds: float = 0.025, hop_seconds: float = HOP_SECONDS) -> np.ndarray:
+    """RMS per frame from a running sum of squares, without materializing the frames."""
+    frame_length = int(sr * frame_seconds)
+    hop_length = int(sr * hop_seconds)
+    if len(y) < frame_length:
+        return np.zeros(0)
+
+    energy = np.concatenate(([0.0], np.cumsum(np.square(y, dtype=np.float64))))
+    starts = np.arange(0, len(y) - frame_length + 1, hop_length)
+    return np.sqrt(np.maximum(energy[starts + frame_length] - energy[starts], 0) / frame_length)
+
+def detect_speech_regions(
+    y: np.ndarray,
+    sr: int,
+    threshold: float = VAD_THRESHOLD,
+    min_silence: float = VAD_MIN_SILENCE,
+    padding: float = VAD_PADDING
+) -> np.ndarray:
+    """
+    Find the stretches of a recording that contain speech.
+    
+    Uses the same relative-energy rule as pause detection: frames whose RMS
+    is above threshold times the loudest frame are speech. Regions are
+    padded and merged across silences shorter than min_silence.
+    
+    Args:
+        y: Mono audio samples
+        sr: Sampling rate
+        threshold: RMS relative to the loudest frame that counts as speech
+        min_silence: Shortest silence, in seconds, that splits two regions
+        padding: Seconds kept on each side of a region
+        
+    Returns:
+        (regions, 2) array of start and end sample indices
+    """
+    rms = frame_rms(y, sr)
+    if len(rms) == 0 or rms.max() <= 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    hop_length = int(sr * HOP_SECONDS)
+    frame_length = int(sr * 0.025)
+    starts, ends = _run_lengths(rms / rms.max() >= threshold)
+    if len(starts) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    pad = int(padding * sr)
+    starts = np.maximum(starts * hop_length - pad, 0)
+    ends = np.minimum((ends - 1) * hop_length + frame_length + pad, len(y))
+
+    # Merge regions separated by less than min_silence
+    split = (starts[1:] - ends[:-1]) >= int(min_silence * sr)
+    starts = starts[np.concatenate(([True], split))]
+    ends = ends[np.concatenate((split, [True]))]
+    return np.stack([starts, ends], axis=1).astype(np.int64)
+
+def extract_acoustic_features(y: np.ndarray, sr: int) -> Dict[str, Any]:
+    """
+    Compute every acoustic feature of a recording in one framed pass.
+
+    The signal is framed once with strided views (no copies). Each block of
+    frames yields RMS, intensity and a pitch estimate, and pauses are found
+    by run-length encoding the silent frames.
+
+    Args:
+        y: Mono audio samples
+        sr: Sampling rate
+
+    Returns:
+        Dictionary with per-frame arrays under "frames" and the pitch,
+        pause and stability summaries used by the voice report
+    """
+    frame_length = int(sr * FRAME_SECONDS)
+    hop_length = int(sr * HOP_SECONDS)
+    y = np.asarray(y, dtype=np.float32)
+    duration = len(y) / sr if sr else 0
+
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    frames = sliding_window_view(y, frame_length)[::hop_length]
+    n_frames = len(frames)
+
+    window = np.hanning(frame_length).astype(np.float32)
+    n_fft = 1 << int(np.ceil(np.log2(2 * frame_length)))
+    window_ac = np.fft.irfft(np.abs(np.fft.rfft(window, n=n_fft)) ** 2, n=n_fft)
+    window_ac = np.maximum(window_ac / window_ac[0], 1e-6)
+
+    min_lag = max(2, int(sr / PITCH_CEILING))
+    max_lag = min(frame_length - 2, int(np.ceil(sr / PITCH_FLOOR)))
+
+    power = np.empty(n_frames)
+    f0 = np.empty(n_frames)
+    strength = np.empty(n_frames)
+    weighted_power = np.empty(n_frames)
+    window_norm = float(np.sum(window ** 2))
+
+    # Blocks keep the FFT buffers small on long recordings
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        block = slice(start, start + BLOCK_FRAMES)
+        block_power, block_f0, block_strength, windowed = _frame_block(
+            frames[block].astype(np.float64), window, window_ac, min_lag, max_lag, sr
+        )
+        power[block] = block_power
+        f0[block] = block_f0
+        strength[block] = block_strength
+        weighted_power[block] = np.sum(windowed ** 2, axis=1) / window_norm
+
+    rms = np.sqrt(power)
+    peak_rms = rms.max() if n_frames else 0
+    times = (np.arange(n_frames) * hop_length + frame_length / 2) / sr
+
+    # Voiced frames: periodic enough and not silent
+    voiced = (strength > VOICING_THRESHOLD) & (rms > SILENCE_THRESHOLD * peak_rms)
+    voiced &= (f0 >= PITCH_FLOOR) & (f0 <= PITCH_CEILING)
+    pitch = np.where(voiced, f0, np.nan)
+
+    intensity_db = 10 * np.log10(np.maximum(weighted_power, 1e-20) / REFERENCE_PRESSURE ** 2)
+
+    # Pauses: runs of quiet frames that are followed by speech
+    rms_norm = rms / peak_rms if peak_rms > 0 else rms
+    starts, ends = _run_lengths(rms_norm < PAUSE_THRESHOLD)
+    min_pause_frames = int(MIN_PAUSE_SECONDS * sr / hop_length)
+    keep = (ends < n_frames) & (ends - starts >= min_pause_frames)
+    starts, ends = starts[keep], ends[keep]
+    pauses = (ends - starts) * hop_length / sr
+
+    return {
+        "duration": duration,
+        "frames": {
+            "times": times.astype(np.float32),
+            "rms": rms.astype(np.float32),
+            "intensity_db": intensity_db.astype(np.float32),
+            "pitch": pitch.astype(np.float32),
+            "pause_segments": np.stack([times[starts], times[starts] + pauses], axis=1) if len(starts) else np.empty((0, 2))
+        },
+        "pitch": summarize_pitch(pitch[voiced]),
+        "pauses": summarize_pauses(pauses, duration),
+        "stability": summarize_intensity(intensity_db)
+    }
+
+def summarize_pitch(pitch_values: np.ndarray) -> Dict[str, float]:
+    """Pitch statistics over voiced frames."""
+    if len(pitch_values) == 0:
+        return {
+            "pitch_mean": 0,
+            "pitch_std": 0,
+            "pitch_min": 0,
+            "pitch_max": 0,
+            "pitch_variability": 0,
+            "pitch_variation": 0,
+            "pitch_confidence": 0
+        }
+
+    pitch_mean = float(np.mean(pitch_values))
+    pitch_std = float(np.std(pitch_values))
+    pitch_min = float(np.min(pitch_values))
+    pitch_max = float(np.max(pitch_values))
+
+    return {
+        "pitch_mean": round(pitch_mean, 1),
+        "pitch_std": round(pitch_std, 1),
+        "pitch_min": round(pitch_min, 1),
+        "pitch_max": round(pitch_max, 1),
+        # Coefficient of variation, and range normalized by mean
+        "pitch_variability": round(pitch_std / pitch_mean, 3) if pitch_mean > 0 else 0,
+        "pitch_variation": round((pitch_max - pitch_min) / pitch_mean, 3) if pitch_mean > 0 else 0,
+        # Confidence based on number of voiced frames
+        "pitch_confidence": min(10, len(pitch_values) / 100)
+    }
+
+def summarize_pauses(pauses: np.ndarray, duration: float) -> Dict[str, Any]:
+    """Pause count, rate per minute and average length."""
+    pause_count = len(pauses)
+    pause_frequency = pause_count / (duration / 60) if duration > 0 else 0
+
+    return {
+        "pause_count": pause_count,
+        "pause_frequency": round(pause_frequency, 1),  # pauses per minute
+        "avg_pause_duration": round(float(np.mean(pauses)), 2) if pause_count else 0,
+        "pauses": pauses.round(3).tolist()
+    }
+
+def summarize_intensity(intensity_db: np.ndarray) -> Dict[str, float]:
+    """Volume stability from the spread of frame intensities."""
+    if len(intensity_db) == 0:
+        return {
+            "intensity_mean": 0,
+            "intensity_std": 0,
+            "volume_variation": 0,
+            "volume_stability": 5.0
+        }
+
+    intensity_mean = float(np.mean(intensity_db))
+    intensity_std = float(np.std(intensity_db))
+
+    # Coefficient of variation as stability measure; lower variation = higher stability
+    volume_variation = intensity_std / intensity_mean if intensity_mean > 0 else 0
+    volume_stability = max(0, 10 - (volume_variation * 20))
+
+    return {
+        "intensity_mean": round(intensity_mean, 1),
+        "intensity_std": round(intensity_std, 1),
+        "volume_variation": round(volume_variation, 3),
+        "volume_stability": round(volume_stability, 1)
+    }
@@ -0,0 +1,395 @@
+import os
+import time
+import uuid
+import pickle
+import shutil
+import sqlite3
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, List, Any, Optional
+from result_cache import get_cache, report_key
+
+current_dir = os.path.dirname(__file__)
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "32"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(current_dir, 'db', 'analysis_jobs.sqlite3'))
+
+JOB_FIELDS = (
+    "job_id", "status", "submitted_at", "started_at", "finished_at", "wall_time",
+    "error", "cached", "cache_key", "work_dir", "owner_pid"
+)
+ORPHANED_JOB_ERROR = "The API worker running this job exited before it finished."
+
+class QueueFullError(Exception):
+    pass
+
+def process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobStore:
+    """
+    Analysis job records shared by every API worker through one SQLite file.
+
+    A job is queued on the pool of the worker that accepted the upload, but
+    any worker can report its status and result. The in-flight table maps a
+    report cache key to the job analyzing that upload and is claimed inside
+    an immediate transaction, so the same upload arriving at two workers at
+    once still starts one job. Like the collection lock files, this assumes
+    all workers run on one host: a job whose owning worker has exited is
+    marked failed instead of staying queued forever.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit, with explicit transactions where a read and a write must be atomic
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, submitted_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, wall_time REAL, error TEXT, "
+            "cached INTEGER NOT NULL DEFAULT 0, cache_key TEXT, work_dir TEXT, owner_pid INTEGER, result BLOB)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS inflight (cache_key TEXT PRIMARY KEY, job_id TEXT NOT NULL)")
+
+    def create(self, job: Dict[str, Any], result: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Insert a job, unless another job is already analyzing the same upload.
+
+        Args:
+            job: Job record with every JOB_FIELDS key; a queued job with a
+                cache_key claims that key
+            result: Report of a job completed from the cache
+
+        Returns:
+            ID of the inserted job, or of the active job it was collapsed into
+        """
+        claim = job["status"] == "queued" and job["cache_key"] is not None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if claim:
+                    row = self._conn.execute(
+                        "SELECT j.job_id, j.owner_pid FROM inflight i JOIN jobs j ON j.job_id = i.job_id "
+                        "WHERE i.cache_key = ? AND j.status IN ('queued', 'running')",
+                        (job["cache_key"],)
+                    ).fetchone()
+                    if row is not None and process_alive(row[1]):
+                        self._conn.execute("COMMIT")
+                        return row[0]
+                    if row is not None:
+                        self._fail_orphan(row[0])
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO inflight (cache_key, job_id) VALUES (?, ?)",
+                        (job["cache_key"], job["job_id"])
+                    )
+
+                self._conn.execute(
+                    f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}, result) VALUES ({', '.join('?' * (len(JOB_FIELDS) + 1))})",
+                    [job[field] for field in JOB_FIELDS] + [pickle.dumps(result) if result is not None else None]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job["job_id"]
+
+    def _fail_orphan(self, job_id: str):
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+            (ORPHANED_JOB_ERROR, time.time(), job_id)
+        )
+        self._conn.execute("DELETE FROM inflight WHERE job_id = ?", (job_id,))
+
+    def mark_running(self, job_id: str, started_at: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ? AND status = 'queued'",
+                (started_at, job_id)
+            )
+
+    def finish(self, job_id: str, status: str, finished_at: float, wall_time: float,
+               started_at: Optional[float] = None, error: Optional[str] = None,
+               result: Optional[Dict[str, Any]] = None):
+        """Record a job's outcome and release its in-flight claim."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, wall_time = ?, "
+                    "started_at = COALESCE(?, started_at), error = ?, result = ? WHERE job_id = ?",
+                    (status, finished_at, wall_time, started_at, error,
+                     pickle.dumps(result) if result is not None else None, job_id)
+                )
+                self._conn.execute("DELETE FROM inflight WHERE job_id = ?", (job_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict[str, Any]]:
+        columns = JOB_FIELDS + (("result",) if with_result else ())
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(zip(columns, row))
+
+            if job["status"] in ("queued", "running") and not process_alive(job["owner_pid"]):
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._fail_orphan(job_id)
+                self._conn.execute("COMMIT")
+                job.update({"status": "failed", "error": ORPHANED_JOB_ERROR, "finished_at": time.time()})
+
+        job["cached"] = bool(job["cached"])
+        if with_result:
+            job["result"] = pickle.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def expire(self, cutoff: float):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """The process's connection to the shared job store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+        return _store
+
+def run_analysis_job(
+    job_id: str,
+    video_path: str,
+    work_dir: str,
+    pcm_path: Optional[str] = None,
+    content_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Entry point executed inside a pool process.
+
+    The analysis modules are imported here so the API process never loads
+    Whisper, DeepFace or spaCy itself.
+    """
+    from presentation_analysis import analyze_presentation
+    from model_registry import registry
+
+    started_at = time.time()
+    get_job_store().mark_running(job_id, started_at)
+    result = analyze_presentation(video_path, work_dir, pcm_path, content_hash)
+    return {
+        "result": result,
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "pid": os.getpid(),
+        "models": registry.stats()
+    }
+
+class AnalysisJobManager:
+    """
+    Runs video analyses on a bounded process pool and tracks their status.
+
+    Jobs are queued in the pool rather than run inside the request, so a long
+    video never holds an HTTP connection or blocks the event loop. Uploads are
+    identified by their content hash: one whose report is cached completes
+    immediately, and one that is already being analyzed, by any API worker,
+    joins that job. Job records live in the shared JobStore; the queue, the
+    counters and the wall times below are this worker's own.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS, max_pending: int = MAX_PENDING_JOBS):
+        # spawn keeps the uvicorn worker's threads and sockets out of the children
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.store = get_job_store()
+        # Jobs queued on this worker's pool, with their records
+        self._futures: Dict[str, Future] = {}
+        self._local_jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wall_times: List[float] = []
+        self._counts = {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0,
+            "cache_hits": 0, "deduplicated": 0
+        }
+        self._model_stats: Dict[int, Dict[str, Any]] = {}
+
+    def submit(
+        self,
+        video_path: str,
+        work_dir: str,
+        pcm_path: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> str:
+        """
+        Queue an analysis job.
+
+        Args:
+            video_path: Path to the uploaded video
+            work_dir: Job directory, removed when the job finishes
+            pcm_path: Audio demuxed while the upload streamed in, if any
+            content_hash: SHA-256 of the uploaded bytes, if known
+
+        Returns:
+            Job ID, possibly of an existing job for the same upload
+        """
+        cache = get_cache()
+        key = report_key(content_hash) if cache is not None and content_hash is not None else None
+        # Read before taking the lock, so status polls never wait on unpickling a report
+        report = cache.get(key) if key is not None else None
+
+        with self._lock:
+            self.store.expire(time.time() - JOB_TTL_SECONDS)
+            if report is not None:
+                job = self._new_record("completed", key, None)
+                job.update({
+                    "started_at": job["submitted_at"],
+                    "finished_at": job["submitted_at"],
+                    "wall_time": 0.0,
+                    "cached": True
+                })
+                job_id = self.store.create(job, report)
+                self._counts["submitted"] += 1
+                self._counts["completed"] += 1
+                self._counts["cache_hits"] += 1
+                reused = True
+            else:
+                if len(self._futures) >= self.max_pending:
+                    self._counts["rejected"] += 1
+                    raise QueueFullError("Analysis queue is full, try again later.")
+
+                job = self._new_record("queued", key, work_dir)
+                # Collapses into the job of any worker already analyzing this upload
+                job_id = self.store.create(job)
+                reused = job_id != job["job_id"]
+                if reused:
+                    self._counts["deduplicated"] += 1
+                else:
+                    self._counts["submitted"] += 1
+                    future = self.executor.submit(run_analysis_job, job_id, video_path, work_dir, pcm_path, content_hash)
+                    self._futures[job_id] = future
+                    self._local_jobs[job_id] = job
+
+        if reused:
+            # Answered by another job or the cache, so this upload is not needed
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return job_id
+
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id
+
+    def _new_record(self, status: str, cache_key: Optional[str], work_dir: Optional[str]) -> Dict[str, Any]:
+        return {
+            "job_id": str(uuid.uuid4()),
+            "status": status,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "wall_time": None,
+            "error": None,
+            "cached": False,
+            "cache_key": cache_key,
+            "work_dir": work_dir,
+            "owner_pid": os.getpid()
+        }
+
+    def _on_done(self, job_id: str, future: Future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            job = self._local_jobs.pop(job_id)
+
+        finished_at = time.time()
+        wall_time = round(finished_at - job["submitted_at"], 2)
+        try:
+            output = future.result()
+            status = "completed"
+            self.store.finish(job_id, status, finished_at, wall_time,
+                              started_at=output["started_at"], result=output["result"])
+        except Exception as e:
+            output = None
+            status = "failed"
+            self.store.finish(job_id, status, finished_at, wall_time, error=str(e))
+
+        with self._lock:
+            self._counts[status] += 1
+            if output is not None:
+                self._model_stats[output["pid"]] = output["models"]
+            self._wall_times.append(wall_time)
+            self._wall_times = self._wall_times[-500:]
+
+        print(f"Analysis job {job_id} {status} in {wall_time}s")
+        shutil.rmtree(job["work_dir"], ignore_errors=True)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+
+        elapsed = (job["finished_at"] or time.time()) - job["submitted_at"]
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "submitted_at": job["submitted_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "elapsed": round(elapsed, 2),
+            "cached": job["cached"],
+            "error": job["error"]
+        }
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id, with_result=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sum(1 for future in self._futures.values() if future.running())
+            queued = len(self._futures) - running
+            wall_times = np.asarray(self._wall_times) if self._wall_times else None
+
+            metrics = {
+                "workers": self.max_workers,
+                "queue_depth": queued,
+                "running": running,
+                "max_pending": self.max_pending,
+                **self._counts,
+                "wall_time_avg": round(float(wall_times.mean()), 2) if wall_times is not None else 0,
+                "wall_time_p50": round(float(np.percentile(wall_times, 50)), 2) if wall_times is not None else 0,
+                "wall_time_p95": round(float(np.percentile(wall_times, 95)), 2) if wall_times is not None else 0,
+                "models_by_worker": dict(self._model_stats)
+            }
+
+        # Across every API worker
+        metrics["jobs_by_status"] = self.store.status_counts()
+        cache = get_cache()
+        if cache is not None:
+            metrics["cache"] = cache.stats()
+        return metrics
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,340 @@
+import os
+import time
+import argparse
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple, Optional
+from model_registry import get_model
+from acoustic_features import detect_speech_regions
+from asr_backends import ASR_BACKEND
+from analysis_jobs import ANALYSIS_WORKERS
+
+ASR_SAMPLE_RATE = 16000
+ASR_VAD = os.getenv("ASR_VAD", "1") == "1"
+# Word timings feed the speech timeline; segment timings are spread over words without them
+ASR_WORD_TIMESTAMPS = os.getenv("ASR_WORD_TIMESTAMPS", "1") == "1"
+
+# Long-form mode: recordings longer than ASR_LONGFORM_SECONDS are split at
+# silences into windows of at most ASR_WINDOW_SECONDS and transcribed in parallel.
+# ASR_WORKERS is the total per API worker: each of the ANALYSIS_WORKERS job
+# processes runs its own pool, and every pool process holds a model copy
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) // 2)))))
+ASR_POOL_WORKERS = max(1, ASR_WORKERS // ANALYSIS_WORKERS)
+ASR_LONGFORM_SECONDS = float(os.getenv("ASR_LONGFORM_SECONDS", "120"))
+ASR_WINDOW_SECONDS = float(os.getenv("ASR_WINDOW_SECONDS", "30"))
+# Overlap used only when one stretch of speech is longer than a window
+ASR_WINDOW_OVERLAP = 1.0
+
+def map_to_original(times: np.ndarray, regions: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """
+    Map times on the trimmed timeline back onto the original recording.
+
+    Args:
+        times: Seconds on the trimmed timeline
+        regions: (regions, 2) sample ranges the trimmed audio was cut from
+        sample_rate: Sampling rate
+
+    Returns:
+        Seconds on the original timeline
+    """
+    times = np.asarray(times, dtype=np.float64)
+    lengths = (regions[:, 1] - regions[:, 0]) / sample_rate
+    trimmed_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+
+    # A time exactly on a boundary belongs to the region that starts there
+    index = np.clip(np.searchsorted(trimmed_starts, times, side="right") - 1, 0, len(regions) - 1)
+    return regions[index, 0] / sample_rate + (times - trimmed_starts[index])
+
+def remap_segments(segments: List[Dict[str, Any]], regions: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """Rewrite segment and word timestamps from the trimmed onto the original timeline."""
+    if not segments:
+        return segments
+
+    starts = map_to_original([segment["start"] for segment in segments], regions, sample_rate)
+    ends = map_to_original([segment["end"] for segment in segments], regions, sample_rate)
+
+    remapped = []
+    for segment, start, end in zip(segments, starts, ends):
+        segment = {**segment, "start": round(float(start), 3), "end": round(float(end), 3)}
+        words = segment.get("words")
+        if words:
+            word_starts = map_to_original([word["start"] for word in words], regions, sample_rate)
+            word_ends = map_to_original([word["end"] for word in words], regions, sample_rate)
+            segment["words"] = [
+                {**word, "start": round(float(ws), 3), "end": round(float(we), 3)}
+                for word, ws, we in zip(words, word_starts, word_ends)
+            ]
+        remapped.append(segment)
+    return remapped
+
+def transcribe(audio: np.ndarray, model_size: str = "base", sample_rate: int = ASR_SAMPLE_RATE, vad: bool = ASR_VAD) -> Dict[str, Any]:
+    """
+    Transcribe 16 kHz mono samples with the configured ASR backend, skipping silence.
+
+    Only the speech regions found by the energy-based VAD are sent to the
+    model, and segment timestamps are mapped back onto the original timeline.
+
+    Args:
+        audio: Mono float32 samples
+        model_size: Whisper model size
+        sample_rate: Sampling rate of audio
+        vad: Trim silence before transcribing
+
+    Returns:
+        Dictionary with transcript, segments, language and the ASR seconds saved
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    total_seconds = len(audio) / sample_rate
+
+    if vad:
+        regions = detect_speech_regions(audio, sample_rate)
+    else:
+        regions = np.array([[0, len(audio)]], dtype=np.int64)
+
+    speech_seconds = float(np.sum(regions[:, 1] - regions[:, 0])) / sample_rate if len(regions) else 0.0
+    if speech_seconds == 0:
+        return {
+            "transcript": "",
+            "segments": [],
+            "language": None,
+            "asr_seconds": 0.0,
+            "asr_seconds_saved": round(total_seconds, 2)
+        }
+
+    if total_seconds > ASR_LONGFORM_SECONDS and ASR_POOL_WORKERS > 1:
+        result = transcribe_long(audio, regions, model_size, sample_rate)
+    else:
+        speech = concatenate_regions(audio, regions)
+        output = get_model("asr", ASR_BACKEND, model_size).transcribe(speech, word_timestamps=ASR_WORD_TIMESTAMPS)
+        result = {
+            "transcript": output["text"],
+            "segments": remap_segments(output["segments"], regions, sample_rate),
+            "language": output["language"]
+        }
+
+    result["asr_seconds"] = round(speech_seconds, 2)
+    result["asr_seconds_saved"] = round(total_seconds - speech_seconds, 2)
+    return result
+
+def concatenate_regions(audio: np.ndarray, regions: np.ndarray) -> np.ndarray:
+    if len(regions) == 1 and regions[0, 0] == 0 and regions[0, 1] == len(audio):
+        return audio
+    return np.concatenate([audio[start:end] for start, end in regions])
+
+def plan_windows(regions: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE, window_seconds: float = ASR_WINDOW_SECONDS) -> List[np.ndarray]:
+    """
+    Group speech regions into windows of bounded length, cutting only at silences.
+
+    A single region longer than a window is split into overlapping pieces;
+    the overlap is removed again when the windows are stitched.
+
+    Args:
+        regions: (regions, 2) speech sample ranges
+        sample_rate: Sampling rate
+        window_seconds: Maximum speech per window
+
+    Returns:
+        One (regions, 2) array per window
+    """
+    max_samples = int(window_seconds * sample_rate)
+    overlap = int(ASR_WINDOW_OVERLAP * sample_rate)
+
+    pieces = []
+    for start, end in regions:
+        while end - start > max_samples:
+            pieces.append((start, start + max_samples))
+            start += max_samples - overlap
+        pieces.append((start, end))
+
+    windows = []
+    current = []
+    current_samples = 0
+    for start, end in pieces:
+        if current and current_samples + (end - start) > max_samples:
+            windows.append(np.array(current, dtype=np.int64))
+            current, current_samples = [], 0
+        current.append((start, end))
+        current_samples += end - start
+    if current:
+        windows.append(np.array(current, dtype=np.int64))
+    return windows
+
+def _init_asr_worker(backend: str, model_size: str, threads: int):
+    # Split the cores between workers instead of letting each use all of them
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    if backend == "whisper":
+        import torch
+        torch.set_num_threads(threads)
+    get_model("asr", backend, model_size)
+
+def _transcribe_window(speech: np.ndarray, model_size: str, backend: str = ASR_BACKEND) -> Dict[str, Any]:
+    output = get_model("asr", backend, model_size).transcribe(
+        speech,
+        condition_on_previous_text=False,
+        word_timestamps=ASR_WORD_TIMESTAMPS
+    )
+    return {"segments": output["segments"], "language": output["language"]}
+
+_asr_pool: Optional[ProcessPoolExecutor] = None
+_asr_pool_key: Optional[Tuple[str, str, int, int]] = None
+
+def get_asr_pool(model_size: str, workers: int = ASR_POOL_WORKERS, backend: str = ASR_BACKEND,
+                 threads: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Process pool whose workers keep a warm ASR model between recordings.
+
+    Args:
+        model_size: Whisper model size
+        workers: Number of worker processes
+        threads: Threads per worker, see get_asr_pool
+        backend: ASR backend name
+        threads: Threads per worker; by default the cores are split between
+            the pools of all analysis job processes
+    """
+    global _asr_pool, _asr_pool_key
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // (workers * ANALYSIS_WORKERS))
+    if _asr_pool is None or _asr_pool_key != (backend, model_size, workers, threads):
+        if _asr_pool is not None:
+            _asr_pool.shutdown()
+        _asr_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_asr_worker,
+            initargs=(backend, model_size, threads)
+        )
+        _asr_pool_key = (backend, model_size, workers, threads)
+    return _asr_pool
+
+def transcribe_long(
+    audio: np.ndarray,
+    regions: np.ndarray,
+    model_size: str = "base",
+    sample_rate: int = ASR_SAMPLE_RATE,
+    workers: int = ASR_POOL_WORKERS,
+    threads: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Transcribe a long recording as parallel windows and stitch the results.
+
+    Args:
+        audio: Mono float32 samples
+        regions: Speech sample ranges to transcribe
+        model_size: Whisper model size
+        sample_rate: Sampling rate
+        workers: Number of worker processes
+
+    Returns:
+        Dictionary with transcript, segments and language
+    """
+    windows = plan_windows(regions, sample_rate)
+    pool = get_asr_pool(model_size, workers, threads=threads)
+    futures = [pool.submit(_transcribe_window, concatenate_regions(audio, window), model_size) for window in windows]
+
+    results = [future.result() for future in futures]
+    window_segments = [remap_segments(result["segments"], window, sample_rate) for result, window in zip(results, windows)]
+    segments = stitch_segments(window_segments)
+
+    # Language by majority over windows
+    languages = [result["language"] for result in results if result["language"]]
+    language = max(set(languages), key=languages.count) if languages else None
+
+    return {
+        "transcript": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+        "windows": len(windows)
+    }
+
+def stitch_segments(window_segments: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Join per-window segments into one monotonic list.
+
+    Anything a window transcribed before the end of what the previous window
+    already covered is the overlap between the two, so it is dropped: whole
+    words when word timestamps exist, otherwise whole segments whose midpoint
+    falls inside the covered range.
+
+    Args:
+        window_segments: Segments of each window on the original timeline, in order
+
+    Returns:
+        Renumbered segments with non-decreasing timestamps
+    """
+    stitched = []
+    covered_until = 0.0
+
+    for segments in window_segments:
+        for segment in segments:
+            words = segment.get("words")
+            if words:
+                words = [word for word in words if word["start"] >= covered_until - 0.05]
+                if not words:
+                    continue
+                segment = {
+                    **segment,
+                    "words": words,
+                    "text": "".join(word["word"] for word in words),
+                    "start": max(segment["start"], words[0]["start"])
+                }
+            elif (segment["start"] + segment["end"]) / 2 < covered_until:
+                continue
+
+            segment = {**segment, "id": len(stitched), "start": max(segment["start"], covered_until)}
+            segment["end"] = max(segment["end"], segment["start"])
+            stitched.append(segment)
+            covered_until = segment["end"]
+
+    return stitched
+
+def synthetic_recording(seconds: float, sample_rate: int = ASR_SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Speech-like bursts of harmonic tones separated by pauses, for benchmarking."""
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+    position = 0
+    while position < len(audio):
+        burst = int(rng.uniform(1.5, 6.0) * sample_rate)
+        t = np.arange(min(burst, len(audio) - position)) / sample_rate
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(1, 4) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        audio[position:position + len(t)] = 0.2 * (np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase))
+        position += burst + int(rng.uniform(0.3, 1.5) * sample_rate)
+    return audio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure long-form transcription speedup against worker count.")
+    parser.add_argument("--audio", help="Audio or video file; a synthetic recording is used when omitted")
+    parser.add_argument("--seconds", type=float, default=600, help="Length of the synthetic recording")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    if args.audio:
+        from video_utils import decode_audio
+        audio = decode_audio(args.audio)
+    else:
+        audio = synthetic_recording(args.seconds)
+
+    regions = detect_speech_regions(audio, ASR_SAMPLE_RATE)
+    cores = os.cpu_count() or 1
+    counts = args.workers or sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    print(f"{len(audio) / ASR_SAMPLE_RATE:.0f}s recording, {len(regions)} speech regions, "
+          f"{len(plan_windows(regions))} windows, {cores} cores")
+
+    baseline = None
+    for workers in counts:
+        # A standalone run has the machine to itself
+        threads = max(1, cores // workers)
+        # Warm the pool first so model loading is not part of the measurement
+        pool = get_asr_pool(args.model, workers, threads=threads)
+        list(pool.map(_transcribe_window, [np.zeros(ASR_SAMPLE_RATE, dtype=np.float32)] * workers, [args.model] * workers))
+
+        start = time.perf_counter()
+        result = transcribe_long(audio, regions, args.model, workers=workers, threads=threads)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} wall={elapsed:7.2f}s speedup={baseline / elapsed:5.2f}x "
+              f"segments={len(result['segments'])}")
+
+    _asr_pool.shutdown()
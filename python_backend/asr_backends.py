@@ -0,0 +1,125 @@
+import os
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional
+
+current_dir = os.path.dirname(__file__)
+
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")
+ASR_MODEL_DIR = os.getenv("ASR_MODEL_DIR", os.path.join(current_dir, 'models', 'asr'))
+ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "int8")
+
+class ASRBackend(ABC):
+    """
+    Speech recognizer over 16 kHz mono float32 samples.
+
+    transcribe returns the openai-whisper result shape, so callers never
+    depend on the engine: {"text": str, "language": str, "segments": [
+    {"id", "start", "end", "text", optional "words": [{"word", "start", "end"}]}]}
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray, condition_on_previous_text: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        pass
+
+class WhisperBackend(ASRBackend):
+    """The PyTorch openai-whisper package with fp32 weights."""
+
+    name = "whisper"
+
+    def __init__(self, model_size: str = "base"):
+        import whisper
+        self.model = whisper.load_model(model_size)
+
+    def parameters(self):
+        # Lets the model registry measure the resident size exactly
+        return self.model.parameters()
+
+    def buffers(self):
+        return self.model.buffers()
+
+    def transcribe(self, audio: np.ndarray, condition_on_previous_text: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        result = self.model.transcribe(
+            audio,
+            condition_on_previous_text=condition_on_previous_text,
+            word_timestamps=word_timestamps
+        )
+        return {"text": result["text"], "segments": result["segments"], "language": result["language"]}
+
+class CTranslate2Backend(ASRBackend):
+    """
+    Whisper converted for CTranslate2 (faster-whisper), int8-quantized on the CPU.
+
+    Models are read from local files only: ASR_MODEL_DIR/<model_size>, e.g.
+    a directory produced by `ct2-transformers-converter --model openai/whisper-base
+    --quantization int8 --output_dir models/asr/base`.
+    """
+
+    name = "ctranslate2"
+
+    def __init__(self, model_size: str = "base", model_path: Optional[str] = None,
+                 compute_type: str = ASR_COMPUTE_TYPE, threads: int = 0):
+        from faster_whisper import WhisperModel
+
+        model_path = model_path or os.path.join(ASR_MODEL_DIR, model_size)
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"No CTranslate2 model at {model_path}")
+
+        self.model = WhisperModel(
+            model_path,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=threads,
+            local_files_only=True
+        )
+
+    def transcribe(self, audio: np.ndarray, condition_on_previous_text: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(
+            audio,
+            condition_on_previous_text=condition_on_previous_text,
+            word_timestamps=word_timestamps
+        )
+
+        results: List[Dict[str, Any]] = []
+        for segment in segments:
+            result = {
+                "id": len(results),
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob
+            }
+            if segment.words:
+                result["words"] = [
+                    {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                    for word in segment.words
+                ]
+            results.append(result)
+
+        return {"text": "".join(segment["text"] for segment in results), "segments": results, "language": info.language}
+
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    CTranslate2Backend.name: CTranslate2Backend
+}
+
+def load_backend(name: str = ASR_BACKEND, model_size: str = "base") -> ASRBackend:
+    """
+    Build an ASR backend.
+
+    Args:
+        name: Backend name, one of ASR_BACKENDS
+        model_size: Whisper model size
+
+    Returns:
+        Loaded backend
+    """
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}', expected one of {sorted(ASR_BACKENDS)}")
+    return ASR_BACKENDS[name](model_size)
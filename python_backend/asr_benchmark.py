@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import glob
+import argparse
+import resource
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple, Optional
+
+current_dir = os.path.dirname(__file__)
+
+FIXTURE_DIR = os.path.join(current_dir, 'fixtures', 'asr')
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.mp4')
+# Stands in for a fixture path when no recordings are available
+SYNTHETIC_PREFIX = 'synthetic:'
+
+def load_fixtures(fixture_dir: str) -> List[Tuple[str, str]]:
+    """
+    Collect audio files that have a reference transcript next to them.
+
+    Args:
+        fixture_dir: Directory with <name>.<audio ext> and <name>.txt pairs
+
+    Returns:
+        List of (audio path, reference text)
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*'))):
+        base, ext = os.path.splitext(path)
+        if ext.lower() in AUDIO_EXTENSIONS and os.path.exists(base + '.txt'):
+            with open(base + '.txt', encoding='utf-8') as f:
+                fixtures.append((path, f.read()))
+    return fixtures
+
+def synthetic_fixtures(seconds: float) -> List[Tuple[str, Optional[str]]]:
+    """A generated recording without a reference, so speed and memory can still be compared."""
+    return [(f"{SYNTHETIC_PREFIX}{seconds:g}", None)]
+
+def load_fixture_audio(path: str) -> np.ndarray:
+    if path.startswith(SYNTHETIC_PREFIX):
+        from asr import synthetic_recording
+        return synthetic_recording(float(path[len(SYNTHETIC_PREFIX):]))
+    from video_utils import decode_audio
+    return decode_audio(path)
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word-level Levenshtein distance divided by the reference length.
+
+    Args:
+        reference: Ground-truth transcript
+        hypothesis: Recognized transcript
+
+    Returns:
+        WER, 0 for a perfect match
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return float(len(hyp) > 0)
+
+    # One row of the edit-distance table at a time
+    previous = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        substitutions = previous[:-1] + (np.array(hyp, dtype=object) != ref_word)
+        for j in range(1, len(hyp) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, substitutions[j - 1])
+        previous = current
+
+    return float(previous[-1]) / len(ref)
+
+def run_backend(backend: str, model_size: str, fixtures: List[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+    """
+    Load one backend and transcribe every fixture, inside a fresh process.
+
+    Returns:
+        Dictionary with load time, memory, speed and WER figures; WER is
+        None when no fixture has a reference transcript
+    """
+    from asr_backends import load_backend
+    from video_utils import AUDIO_SAMPLE_RATE
+    from model_registry import _rss_bytes
+
+    audios = [load_fixture_audio(path) for path, _ in fixtures]
+    rss_before = _rss_bytes()
+
+    start = time.perf_counter()
+    model = load_backend(backend, model_size)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = _rss_bytes()
+
+    audio_seconds = 0.0
+    transcribe_seconds = 0.0
+    errors = []
+    for audio, (_, reference) in zip(audios, fixtures):
+        start = time.perf_counter()
+        result = model.transcribe(audio)
+        transcribe_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / AUDIO_SAMPLE_RATE
+        if reference is not None:
+            errors.append(word_error_rate(reference, result["text"]))
+
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "model_mb": (rss_loaded - rss_before) / 1e6,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+        "transcribe_s": transcribe_seconds,
+        "rtf": transcribe_seconds / audio_seconds if audio_seconds else 0,
+        "wer": float(np.mean(errors)) if errors else None
+    }
+
+if __name__ == "__main__":
+    from asr_backends import ASR_BACKENDS
+
+    parser = argparse.ArgumentParser(description="Compare ASR backends on speed, memory and word error rate.")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR,
+                        help="Directory of audio files with matching .txt reference transcripts")
+    parser.add_argument("--backends", nargs="+", default=sorted(ASR_BACKENDS))
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--seconds", type=float, default=60,
+                        help="Length of the synthetic recording used when there are no fixtures")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if os.path.isdir(args.fixtures) else []
+    if fixtures:
+        print(f"{len(fixtures)} fixtures, model size {args.model}")
+    else:
+        # Tones carry no words, so only the speed and memory columns are meaningful
+        print(f"No fixtures in {args.fixtures} (<name>.wav with <name>.txt transcripts), "
+              f"using a {args.seconds:g}s synthetic recording without WER, model size {args.model}")
+        fixtures = synthetic_fixtures(args.seconds)
+
+    print(f"\n{'backend':<12} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'asr s':>7} {'RTF':>6} {'WER':>6}")
+    for backend in args.backends:
+        # A fresh process per backend so memory figures do not include the others
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                row = pool.submit(run_backend, backend, args.model, fixtures).result()
+            except Exception as e:
+                print(f"{backend:<12} failed: {str(e)}")
+                continue
+        wer = "n/a" if row['wer'] is None else f"{row['wer']:.3f}"
+        print(f"{row['backend']:<12} {row['load_s']:>7.2f} {row['model_mb']:>9.1f} {row['peak_rss_mb']:>8.1f} "
+              f"{row['transcribe_s']:>7.2f} {row['rtf']:>6.3f} {wer:>6}")
@@ -1,7 +1,6 @@
 import os
-from langchain_text_splitters import CharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import JSONLoader
+from hnsw_config import build_vector_store
+from profile_store import load_profile_documents, get_profile_store
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 
 current_dir = os.path.dirname(__file__)
@@ -11,11 +10,7 @@ persistance_path = os.path.join(current_dir, 'db', 'mentors_data')
 if not os.path.exists(persistance_path):
     print("Persistance path does not exist. Creating one now...")
 
-    loader = JSONLoader(file_path, jq_schema='.[]', text_content=False)
-    data = loader.load()
-
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    docs = text_splitter.split_documents(data)
+    docs, profiles = load_profile_documents(file_path)
 
     # Displaying information about the chunks
     print('\n ----- Document Chunks Information -----')
@@ -29,8 +24,12 @@ if not os.path.exists(persistance_path):
 
     # create the vector store and persist it automatically
     print("Creating Chroma Vector Store...")
-    db = Chroma.from_documents(docs, embeddings, persist_directory=persistance_path)
+    db = build_vector_store(docs, embeddings, persistance_path)
     print('Chroma Vector Store Created')
 
+    # Keep whole parsed profiles next to the index for response hydration
+    stored = get_profile_store('mentors').put_many(profiles)
+    print(f'Profile Store Updated: {stored} profiles')
+
 else:
     print("Chroma Vector Store already exists.")
\ No newline at end of file
@@ -0,0 +1,301 @@
+import os
+import time
+import fcntl
+import sqlite3
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+from profile_store import get_profile_store, split_profiles, profile_id, backfill
+from vector_snapshot import refresh_snapshot
+
+current_dir = os.path.dirname(__file__)
+
+COLLECTIONS = {
+    "students": os.path.join(current_dir, 'db', 'students_data'),
+    "mentors": os.path.join(current_dir, 'db', 'mentors_data')
+}
+
+COLLECTION_NAME = "langchain"
+# The rebuilt collection is filled under this name and renamed once complete
+REBUILD_COLLECTION_NAME = "langchain_compacting"
+
+COMPACTION_THRESHOLD = float(os.getenv("COMPACTION_THRESHOLD", "0.2"))
+COMPACTION_INTERVAL = float(os.getenv("COMPACTION_INTERVAL", "60"))
+
+@contextmanager
+def collection_lock(name: str):
+    """
+    Exclusive cross-process lock for writes to one collection.
+
+    Every uvicorn worker shares the same persisted stores, so writers and the
+    compactor serialize on a lock file rather than an in-process lock.
+    """
+    lock_path = os.path.join(current_dir, 'db', f'.{name}.lock')
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _collection(persist_directory: str):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    return client, client.get_collection(COLLECTION_NAME)
+
+def recover_compaction(persist_directory: str) -> Optional[str]:
+    """
+    Finish or roll back a compaction that was interrupted, e.g. by a crash.
+
+    Must be called with the collection lock held.
+
+    Args:
+        persist_directory: Directory of the persisted Chroma store
+
+    Returns:
+        "rolled_back", "completed", or None if there was nothing to recover
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    # Older chromadb releases list collections, newer ones list names
+    names = {getattr(collection, "name", collection) for collection in client.list_collections()}
+    if REBUILD_COLLECTION_NAME not in names:
+        return None
+
+    if COLLECTION_NAME in names:
+        # Interrupted while rebuilding: the original is intact, the partial copy is dropped
+        client.delete_collection(REBUILD_COLLECTION_NAME)
+        return "rolled_back"
+
+    # Interrupted after the original was dropped: the rebuilt copy is complete
+    client.get_collection(REBUILD_COLLECTION_NAME).modify(name=COLLECTION_NAME)
+    return "completed"
+
+def _profile_chunk_ids(collection, pid: str) -> List[str]:
+    return collection.get(where={"profile_id": pid}, include=[])["ids"]
+
+def update_profile(name: str, embedding_model, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace a profile: index its new chunks and tombstone the old ones.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+        embedding_model: Embedding model used to embed the new chunks
+        profile: Full updated profile
+
+    Returns:
+        Dictionary with the profile ID and chunk counts
+    """
+    from hnsw_config import open_vector_store
+
+    pid = profile_id(profile)
+    if not pid:
+        raise ValueError("Profile has no _id")
+
+    persist_directory = COLLECTIONS[name]
+    store = get_profile_store(name)
+
+    with collection_lock(name):
+        db = open_vector_store(persist_directory, embedding_model)
+        old_ids = _profile_chunk_ids(db._collection, pid)
+        new_ids = db.add_documents(split_profiles([profile]))
+
+        store.put_many([profile])
+        store.add_tombstones(old_ids, pid)
+        refresh_snapshot(name, persist_directory)
+
+    return {"profile_id": pid, "added_chunks": len(new_ids), "tombstoned_chunks": len(old_ids)}
+
+def delete_profile(name: str, pid: str) -> Dict[str, Any]:
+    """
+    Delete a profile: tombstone its chunks and drop it from the profile store.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+        pid: Profile ID
+
+    Returns:
+        Dictionary with the profile ID and chunk count
+    """
+    store = get_profile_store(name)
+
+    with collection_lock(name):
+        _, collection = _collection(COLLECTIONS[name])
+        old_ids = _profile_chunk_ids(collection, pid)
+
+        # Tombstone before deleting so searches never hydrate a missing profile
+        store.add_tombstones(old_ids, pid)
+        found = store.delete(pid)
+
+    return {"profile_id": pid, "found": found or bool(old_ids), "tombstoned_chunks": len(old_ids)}
+
+def disk_usage(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            total += os.path.getsize(os.path.join(root, file))
+    return total
+
+def index_stats(name: str) -> Dict[str, Any]:
+    """
+    Report chunk, tombstone and disk usage figures for a collection.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+
+    Returns:
+        Dictionary with index stats
+    """
+    persist_directory = COLLECTIONS[name]
+    _, collection = _collection(persist_directory)
+    chunk_count = collection.count()
+    tombstone_count = len(get_profile_store(name).tombstones())
+
+    return {
+        "collection": name,
+        "chunks": chunk_count,
+        "tombstones": tombstone_count,
+        "tombstone_ratio": round(tombstone_count / chunk_count, 3) if chunk_count else 0,
+        "disk_bytes": disk_usage(persist_directory)
+    }
+
+def compact(name: str, force: bool = False, threshold: float = COMPACTION_THRESHOLD) -> Dict[str, Any]:
+    """
+    Rebuild a collection without its tombstoned chunks once they cross the threshold.
+
+    Live chunks are re-added with their stored embeddings, so nothing is
+    re-embedded. The rebuilt collection gets a fresh HNSW segment and the
+    SQLite file is vacuumed, which returns the space of deleted rows.
+
+    The copy is built under a temporary name and only swapped in once it is
+    complete; recover_compaction repairs a run that died mid-way. The
+    swapped-in collection has a new ID, so readers must look the collection
+    up by name per request, as open_vector_store and the handlers here do,
+    rather than hold a collection object across compactions.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+        force: Compact even when below the threshold
+        threshold: Tombstone ratio that triggers compaction
+
+    Returns:
+        Dictionary with compaction results
+    """
+    persist_directory = COLLECTIONS[name]
+    store = get_profile_store(name)
+
+    with collection_lock(name):
+        recover_compaction(persist_directory)
+        client, collection = _collection(persist_directory)
+        tombstones = store.tombstones()
+        chunk_count = collection.count()
+        ratio = len(tombstones) / chunk_count if chunk_count else 0
+
+        if not tombstones or (ratio < threshold and not force):
+            return {"collection": name, "compacted": False, "tombstone_ratio": round(ratio, 3)}
+
+        start = time.perf_counter()
+        disk_before = disk_usage(persist_directory)
+
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        live = [i for i, chunk_id in enumerate(data["ids"]) if chunk_id not in tombstones]
+        ids = [data["ids"][i] for i in live]
+        embeddings = np.asarray(data["embeddings"], dtype=np.float32)[live] if live else np.empty((0, 0), dtype=np.float32)
+        documents = [data["documents"][i] for i in live]
+        metadatas = [data["metadatas"][i] for i in live]
+
+        rebuilt = client.create_collection(REBUILD_COLLECTION_NAME, metadata=collection.metadata)
+        batch_size = 1000
+        for i in range(0, len(ids), batch_size):
+            rebuilt.add(
+                ids=ids[i:i + batch_size],
+                embeddings=embeddings[i:i + batch_size],
+                documents=documents[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size]
+            )
+
+        # Swap the complete copy in; a crash between these two calls is finished by recover_compaction
+        client.delete_collection(COLLECTION_NAME)
+        rebuilt.modify(name=COLLECTION_NAME)
+
+        conn = sqlite3.connect(os.path.join(persist_directory, "chroma.sqlite3"))
+        conn.execute("VACUUM")
+        conn.close()
+
+        store.clear_tombstones(tombstones)
+        refresh_snapshot(name, persist_directory)
+
+        return {
+            "collection": name,
+            "compacted": True,
+            "removed_chunks": chunk_count - len(ids),
+            "live_chunks": len(ids),
+            "disk_bytes_before": disk_before,
+            "disk_bytes_after": disk_usage(persist_directory),
+            "seconds": round(time.perf_counter() - start, 2)
+        }
+
+class Compactor:
+    """
+    Background thread that compacts collections whose tombstone ratio crosses the threshold.
+    """
+
+    def __init__(self, interval: float = COMPACTION_INTERVAL, threshold: float = COMPACTION_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        results = []
+        for name, persist_directory in COLLECTIONS.items():
+            if not os.path.exists(persist_directory):
+                continue
+            try:
+                result = compact(name, threshold=self.threshold)
+                if result["compacted"]:
+                    print(f"Compacted {name}: {result}")
+                results.append(result)
+            except Exception as e:
+                print(f"Compaction error for {name}: {str(e)}")
+        return results
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self):
+        for name, persist_directory in COLLECTIONS.items():
+            if not os.path.exists(persist_directory):
+                continue
+            try:
+                with collection_lock(name):
+                    recovered = recover_compaction(persist_directory)
+                    # Stores indexed before chunks carried a profile_id cannot be updated or deleted by profile
+                    migrated = backfill(name)
+                    if migrated["tagged"]:
+                        refresh_snapshot(name, persist_directory)
+                if recovered:
+                    print(f"Recovered interrupted compaction of {name}: {recovered}")
+                if migrated["tagged"] or migrated["untagged"]:
+                    print(f"Tagged {migrated['tagged']} {name} chunks with profile IDs, "
+                          f"{migrated['untagged']} match no known profile")
+            except Exception as e:
+                print(f"Collection recovery error for {name}: {str(e)}")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+if __name__ == "__main__":
+    for name in COLLECTIONS:
+        print(compact(name, force=True))
@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import socket
+import struct
+import asyncio
+import argparse
+import threading
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_SOCKET_PATH = os.getenv("EMBEDDING_SOCKET", "")
+# How long a starting worker waits for the sidecar before loading the model itself
+EMBEDDING_CONNECT_WAIT = float(os.getenv("EMBEDDING_CONNECT_WAIT", "5"))
+
+# Wire format: every frame is a 4-byte little-endian length followed by the
+# payload. Requests are one JSON frame; embed responses are a JSON header
+# frame followed by a raw float32 frame.
+FRAME_HEADER = struct.Struct("<I")
+
+def encode_frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+class EmbeddingServer:
+    """
+    Embedding sidecar that batches requests from many workers into shared forward passes.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.queue: Optional[asyncio.Queue] = None
+
+        self.started_at = time.time()
+        self.stats = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "queued_texts": 0,
+            "encode_seconds": 0.0,
+            "connections": 0
+        }
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        uptime = time.time() - self.started_at
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "avg_batch_size": round(self.stats["texts"] / batches, 2) if batches else 0,
+            "texts_per_second": round(self.stats["texts"] / uptime, 2) if uptime > 0 else 0,
+            "encode_texts_per_second": round(self.stats["texts"] / self.stats["encode_seconds"], 2)
+            if self.stats["encode_seconds"] > 0 else 0,
+            "uptime_seconds": round(uptime, 1)
+        }
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # Same preprocessing as HuggingFaceEmbeddings so vectors match the stored ones
+        texts = [text.replace("\n", " ") for text in texts]
+        return np.asarray(self.model.encode(texts, batch_size=self.max_batch_size), dtype=np.float32)
+
+    async def batch_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            texts, future = await self.queue.get()
+            batch = [(texts, future)]
+            total = len(texts)
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting requests until the batch is full or the wait expires
+            while total < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    texts, future = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append((texts, future))
+                total += len(texts)
+
+            flat = [text for texts, _ in batch for text in texts]
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self.executor, self.encode, flat)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.stats["queued_texts"] -= total
+
+            self.stats["encode_seconds"] += time.perf_counter() - start
+            self.stats["batches"] += 1
+            self.stats["texts"] += total
+
+            position = 0
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[position:position + len(texts)])
+                position += len(texts)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                request = json.loads(await reader.readexactly(length))
+                self.stats["requests"] += 1
+
+                if request.get("op") == "stats":
+                    writer.write(encode_frame(json.dumps(self.snapshot_stats()).encode("utf-8")))
+                elif request.get("op") == "embed":
+                    texts = request.get("texts", [])
+                    future = asyncio.get_running_loop().create_future()
+                    self.stats["queued_texts"] += len(texts)
+                    await self.queue.put((texts, future))
+                    try:
+                        vectors = await future
+                        header = {"shape": list(vectors.shape)}
+                        writer.write(encode_frame(json.dumps(header).encode("utf-8")))
+                        writer.write(encode_frame(vectors.tobytes()))
+                    except Exception as e:
+                        writer.write(encode_frame(json.dumps({"error": str(e)}).encode("utf-8")))
+                else:
+                    writer.write(encode_frame(json.dumps({"error": f"Unknown op {request.get('op')}"}).encode("utf-8")))
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            self.stats["connections"] -= 1
+            writer.close()
+
+    async def serve(self, socket_path: str):
+        self.queue = asyncio.Queue()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+        batcher = asyncio.create_task(self.batch_loop())
+        print(f"Embedding server listening on {socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+class EmbeddingClient:
+    """
+    LangChain embedding function backed by the embedding sidecar.
+
+    Provides embed_documents and embed_query without subclassing Embeddings,
+    so the API process does not import LangChain just to talk to the sidecar.
+
+    Each thread keeps its own connection, so FastAPI's threadpool can issue
+    requests concurrently and let the sidecar batch them together.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, size: int) -> bytes:
+        chunks = []
+        while size > 0:
+            chunk = conn.recv(size)
+            if not chunk:
+                raise ConnectionError("Embedding server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _recv_frame(self, conn: socket.socket) -> bytes:
+        (length,) = FRAME_HEADER.unpack(self._recv_exact(conn, FRAME_HEADER.size))
+        return self._recv_exact(conn, length)
+
+    def _request(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        frame = encode_frame(json.dumps(payload).encode("utf-8"))
+
+        # Retry once on a fresh connection in case the server was restarted
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.sendall(frame)
+                header = json.loads(self._recv_frame(conn))
+                body = self._recv_frame(conn) if "shape" in header else None
+                break
+            except (ConnectionError, OSError):
+                self._reset()
+                if attempt == 1:
+                    raise
+
+        if "error" in header:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+        return header, body
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        header, body = self._request({"op": "embed", "texts": list(texts)})
+        return np.frombuffer(body, dtype=np.float32).reshape(header["shape"])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_array([text])[0].tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        header, _ = self._request({"op": "stats"})
+        return header
+
+def connect_sidecar(socket_path: str, wait: float = EMBEDDING_CONNECT_WAIT) -> Optional[EmbeddingClient]:
+    """
+    Connect to the embedding sidecar, retrying while it starts up.
+
+    Args:
+        socket_path: Unix domain socket of the embedding sidecar
+        wait: Seconds to keep retrying before giving up
+
+    Returns:
+        A client that answered a stats request, or None
+    """
+    client = EmbeddingClient(socket_path, timeout=5.0)
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            client.stats()
+            client.timeout = 30.0
+            client._reset()
+            return client
+        except (ConnectionError, OSError, RuntimeError) as e:
+            if time.monotonic() >= deadline:
+                print(f"Embedding sidecar at {socket_path} unavailable: {str(e)}")
+                return None
+            time.sleep(0.5)
+
+@lru_cache(maxsize=1)
+def load_embedding_model(socket_path: str = DEFAULT_SOCKET_PATH) -> "Embeddings":
+    """
+    Return the embedding function for this process.
+
+    Uses the sidecar when EMBEDDING_SOCKET is set and the server answers
+    within EMBEDDING_CONNECT_WAIT seconds, and otherwise loads the model
+    in-process. The result is cached for the life of the process, so a
+    worker that fell back keeps its own model even if the sidecar comes up
+    later; start the sidecar before the workers to share one copy.
+
+    Args:
+        socket_path: Unix domain socket of the embedding sidecar
+
+    Returns:
+        LangChain embedding function
+    """
+    if socket_path:
+        client = connect_sidecar(socket_path)
+        if client is not None:
+            return client
+        print("Falling back to an in-process embedding model")
+
+    from model_registry import get_model
+    return get_model("embedder", MODEL_NAME)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared embedding sidecar for multi-worker deployments.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH or "/tmp/talent-hunt-embeddings.sock")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = EmbeddingServer(args.model, args.max_batch_size, args.max_wait_ms)
+    asyncio.run(server.serve(args.socket))
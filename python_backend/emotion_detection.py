@@ -1,15 +1,38 @@
 import os
-import cv2
 import numpy as np
-from typing import Dict, List, Any, Tuple
-import mediapipe as mp
-from deepface import DeepFace
+from typing import Dict, List, Any, Tuple, Iterator, Optional
 import time
+from model_registry import get_model
+from video_utils import MediaContext
 
-# Initialize MediaPipe Face Detection
-mp_face_detection = mp.solutions.face_detection
-mp_face_mesh = mp.solutions.face_mesh
-mp_drawing = mp.solutions.drawing_utils
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "32"))
+EMOTION_INPUT_SIZE = 48
+FACE_CROP_MARGIN = 0.1
+
+# Landmark metrics are vectorized, so frames can be sampled well above 1 fps
+FACE_SAMPLE_FPS = float(os.getenv("FACE_SAMPLE_FPS", "5"))
+FACE_FRAME_BUDGET = int(os.getenv("FACE_FRAME_BUDGET", "600"))
+
+# Adaptive emotion sampling: a face is only re-classified once the frame or the
+# landmarks have changed enough since the last classified one, or after a
+# maximum interval so slow drifts are still picked up
+ADAPTIVE_EMOTION_SAMPLING = os.getenv("ADAPTIVE_EMOTION_SAMPLING", "1") == "1"
+FRAME_CHANGE_THRESHOLD = float(os.getenv("FRAME_CHANGE_THRESHOLD", "0.04"))
+LANDMARK_CHANGE_THRESHOLD = float(os.getenv("LANDMARK_CHANGE_THRESHOLD", "0.01"))
+EMOTION_MAX_INTERVAL = float(os.getenv("EMOTION_MAX_INTERVAL", "5"))
+SIGNATURE_SIZE = 32
+
+# FaceMesh landmark indices
+LEFT_EYE_OUTER, LEFT_EYE_INNER = 33, 133
+RIGHT_EYE_INNER, RIGHT_EYE_OUTER = 362, 263
+MOUTH_TOP, MOUTH_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT = 13, 14, 78, 308
+NOSE_TIP, FOREHEAD, CHIN = 1, 10, 152
+
+# Head turned less than this (as a fraction of eye distance / face height) counts as facing the camera
+FACING_YAW_LIMIT = 0.25
+FACING_PITCH_LIMIT = 0.2
 
 def analyze_facial_expressions(video_path: str) -> Dict[str, Any]:
     """
@@ -21,10 +44,48 @@ def analyze_facial_expressions(video_path: str) -> Dict[str, Any]:
     Returns:
         Dictionary with facial expression metrics
     """
-    # Extract frames from video at 1 fps
-    frames = extract_frames(video_path, fps=1)
+    # Sample frames from video, decoded one at a time
+    frames = extract_frames(video_path, fps=FACE_SAMPLE_FPS, max_frames=FACE_FRAME_BUDGET)
+    
+    # Use mediapipe for landmarks, kept warm in the model registry
+    face_mesh = get_model("face_mesh")
+    
+    # Collect landmarks of every frame with a face, and emotion-model inputs
+    # only for the frames that changed enough to be worth classifying
+    landmarks = []
+    faces = []
+    frame_times = []
+    face_frames = []
+    emotion_owners = []
+    last_signature = None
+    last_landmarks = None
+    last_inferred_at = None
+    
+    for timestamp, frame in frames:
+        frame_times.append(timestamp)
+        result = analyze_frame(frame, face_mesh)
+        
+        if result is None:
+            continue
+        
+        frame_landmarks, face = result
+        signature = frame_signature(frame)
+        
+        if (not ADAPTIVE_EMOTION_SAMPLING or last_signature is None
+                or timestamp - last_inferred_at >= EMOTION_MAX_INTERVAL
+                or frame_change(signature, last_signature) > FRAME_CHANGE_THRESHOLD
+                or landmark_change(frame_landmarks, last_landmarks) > LANDMARK_CHANGE_THRESHOLD):
+            faces.append(face)
+            last_signature, last_landmarks, last_inferred_at = signature, frame_landmarks, timestamp
+        
+        landmarks.append(frame_landmarks)
+        face_frames.append(len(frame_times) - 1)
+        # Frames that were not classified reuse the last classified face
+        emotion_owners.append(len(faces) - 1)
+    
+    frame_count = len(frame_times)
     
-    if not frames:
+    if frame_count == 0:
         return {
             "face_detected": False,
             "confidence_score": 5.0,  # Neutral default
@@ -37,30 +98,7 @@ def analyze_facial_expressions(video_path: str) -> Dict[str, Any]:
             "error": "No frames extracted from video"
         }
     
-    # Analyze each frame
-    emotions_results = []
-    face_detected_frames = 0
-    smile_frames = 0
-    eye_contact_frames = 0
-    
-    # Use mediapipe for eye contact analysis
-    with mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5) as face_mesh:
-        
-        for frame in frames:
-            result = analyze_frame(frame, face_mesh)
-            
-            if result["face_detected"]:
-                face_detected_frames += 1
-                emotions_results.append(result["emotions"])
-                
-                if result["is_smiling"]:
-                    smile_frames += 1
-                    
-                if result["eye_contact"]:
-                    eye_contact_frames += 1
+    face_detected_frames = len(landmarks)
     
     # If no faces detected in any frame
     if face_detected_frames == 0:
@@ -72,17 +110,42 @@ def analyze_facial_expressions(video_path: str) -> Dict[str, Any]:
             "eye_contact_percentage": 0.0,
             "smile_percentage": 0.0,
             "attention_score": 5.0,
-            "frame_count": len(frames),
+            "frame_count": frame_count,
             "error": "No faces detected in video frames"
         }
     
+    # (frames, 468, 3) landmark tensor; every metric below is one vectorized pass
+    landmarks = np.stack(landmarks)
+    eye_contact = check_eye_contact(landmarks)
+    smiling = detect_smile(landmarks)
+    yaw, pitch = estimate_head_pose(landmarks)
+    facing = (np.abs(yaw) < FACING_YAW_LIMIT) & (np.abs(pitch) < FACING_PITCH_LIMIT)
+    
     # Calculate percentages
-    face_percentage = face_detected_frames / len(frames)
-    smile_percentage = smile_frames / max(1, face_detected_frames)
-    eye_contact_percentage = eye_contact_frames / max(1, face_detected_frames)
+    face_percentage = face_detected_frames / frame_count
+    smile_percentage = float(smiling.mean())
+    eye_contact_percentage = float(eye_contact.mean())
+    
+    # Weight each classified face by the video time it stands for, so the
+    # aggregate matches what classifying every sampled frame would give
+    durations = frame_durations(np.asarray(frame_times))
+    emotion_weights = np.bincount(
+        np.asarray(emotion_owners),
+        weights=durations[np.asarray(face_frames)],
+        minlength=len(faces)
+    )
+    video_minutes = float(frame_times[-1] + durations[-1]) / 60
+    inferences_saved = face_detected_frames - len(faces)
     
-    # Aggregate emotion results
-    aggregated_emotions = aggregate_emotions(emotions_results)
+    # Classify the faces in batches, then aggregate the (frames, classes) matrix
+    classification_error = None
+    try:
+        aggregated_emotions = aggregate_emotions(classify_emotions(np.stack(faces)), emotion_weights)
+    except Exception as e:
+        # If emotion inference fails, use neutral emotion
+        print(f"Emotion classification error: {str(e)}")
+        classification_error = f"Emotion classification failed: {str(e)}"
+        aggregated_emotions = {"neutral": 0.7, "happiness": 0.3}
     
     # Calculate confidence and engagement scores
     confidence_score = calculate_confidence_score(
@@ -101,201 +164,249 @@ def analyze_facial_expressions(video_path: str) -> Dict[str, Any]:
     # Calculate attention score
     attention_score = (eye_contact_percentage * 10 + face_percentage * 10) / 2
     
-    return {
+    results = {
         "face_detected": True,
         "confidence_score": round(confidence_score, 1),
         "engagement_score": round(engagement_score, 1),
         "emotion_distribution": {k: round(v, 2) for k, v in aggregated_emotions.items()},
         "eye_contact_percentage": round(eye_contact_percentage * 100, 1),
         "smile_percentage": round(smile_percentage * 100, 1),
+        "facing_camera_percentage": round(float(facing.mean()) * 100, 1),
+        "head_yaw_mean": round(float(np.abs(yaw).mean()), 3),
+        "head_pitch_mean": round(float(np.abs(pitch).mean()), 3),
         "attention_score": round(attention_score, 1),
-        "frame_count": len(frames),
-        "faces_detected_count": face_detected_frames
+        "frame_count": frame_count,
+        "faces_detected_count": face_detected_frames,
+        "emotion_inference_count": len(faces),
+        "emotion_inferences_saved": inferences_saved,
+        "emotion_inferences_saved_per_minute": round(inferences_saved / video_minutes, 1) if video_minutes > 0 else 0
     }
+    # Marks the neutral fallback like the other fallbacks, so it is never cached
+    if classification_error:
+        results["error"] = classification_error
+    return results
 
-def extract_frames(video_path: str, fps: int = 1) -> List[np.ndarray]:
+def extract_frames(video_path: str, fps: float = 1, max_frames: int = FACE_FRAME_BUDGET) -> Iterator[np.ndarray]:
     """
-    Extract frames from a video at specified fps.
+    Sample frames from a video at specified fps.
+    
+    Long videos are sampled evenly across their whole duration within
+    max_frames, and frames are yielded one at a time to bound memory.
     
     Args:
         video_path: Path to the video file
         fps: Frames per second to extract
+        max_frames: Frame budget for the whole video
         
     Returns:
-        List of frames as numpy arrays
+        Iterator over (timestamp in seconds, frame) pairs
     """
-    frames = []
-    cap = cv2.VideoCapture(video_path)
-    
-    if not cap.isOpened():
-        return frames
-    
-    video_fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_interval = int(video_fps / fps)
-    
-    frame_count = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        
-        if not ret:
-            break
-        
-        # Extract frames at specified interval
-        if frame_count % frame_interval == 0:
-            frames.append(frame)
-        
-        frame_count += 1
-        
-        # Limit to 100 frames max to avoid memory issues
-        if len(frames) >= 100:
-            break
-    
-    cap.release()
-    return frames
+    return MediaContext(video_path).frames(fps, max_frames=max_frames, timestamps=True)
 
-def analyze_frame(frame: np.ndarray, face_mesh) -> Dict[str, Any]:
+def analyze_frame(frame: np.ndarray, face_mesh) -> Optional[Tuple[np.ndarray, np.ndarray]]:
     """
-    Analyze a single frame for facial expressions.
+    Run FaceMesh on a single frame.
+    
+    Only the landmarks and a small emotion-model input are kept, so the
+    frame itself can be released before the next one is decoded.
     
     Args:
         frame: Video frame as numpy array
         face_mesh: MediaPipe face mesh model
         
     Returns:
-        Dictionary with frame analysis results
+        (468, 3) landmark array and 48x48 grayscale face, or None if no face was found
     """
+    import cv2
+    
     # Convert BGR to RGB
     rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     
     # Process frame with MediaPipe
     results = face_mesh.process(rgb_frame)
     
-    result = {
-        "face_detected": False,
-        "emotions": {"neutral": 1.0},
-        "is_smiling": False,
-        "eye_contact": False
-    }
-    
     # If no face detected
     if not results.multi_face_landmarks:
-        return result
-    
-    # Face detected
-    result["face_detected"] = True
+        return None
     
     # Extract face landmarks
     face_landmarks = results.multi_face_landmarks[0]
+    landmarks = np.array([(point.x, point.y, point.z) for point in face_landmarks.landmark], dtype=np.float32)
     
-    # Analyze eye contact
-    result["eye_contact"] = check_eye_contact(face_landmarks)
-    
-    # Analyze smile
-    result["is_smiling"] = detect_smile(face_landmarks)
+    # Crop the face MediaPipe already found, so no second detector has to run
+    return landmarks, prepare_face(crop_face(frame, landmarks))
+
+def crop_face(frame: np.ndarray, landmarks: np.ndarray, margin: float = FACE_CROP_MARGIN) -> np.ndarray:
+    """
+    Crop the face bounding box spanned by the landmarks, with a small margin.
     
-    try:
-        # Analyze emotions with DeepFace
-        emotion_result = DeepFace.analyze(
-            img_path=frame,
-            actions=['emotion'],
-            enforce_detection=False,
-            silent=True
-        )
+    Args:
+        frame: Video frame as numpy array
+        landmarks: (468, 3) normalized landmark array
+        margin: Padding added on each side, as a fraction of the box size
         
-        if isinstance(emotion_result, list):
-            emotion_result = emotion_result[0]
-            
-        result["emotions"] = emotion_result["emotion"]
-        # Convert to probability distribution
-        total = sum(result["emotions"].values())
-        result["emotions"] = {k: v/total for k, v in result["emotions"].items()}
+    Returns:
+        Face crop as numpy array
+    """
+    height, width = frame.shape[:2]
+    xs = landmarks[:, 0] * width
+    ys = landmarks[:, 1] * height
+    
+    pad_x = (xs.max() - xs.min()) * margin
+    pad_y = (ys.max() - ys.min()) * margin
+    x0 = int(max(0, xs.min() - pad_x))
+    x1 = int(min(width, xs.max() + pad_x))
+    y0 = int(max(0, ys.min() - pad_y))
+    y1 = int(min(height, ys.max() + pad_y))
+    
+    if x1 <= x0 or y1 <= y0:
+        return frame
+    return frame[y0:y1, x0:x1]
+
+def prepare_face(face_crop: np.ndarray) -> np.ndarray:
+    """Convert a BGR face crop to the 48x48 grayscale input of the emotion model."""
+    import cv2
+    gray = cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE))
+
+def classify_emotions(faces: np.ndarray, batch_size: int = EMOTION_BATCH_SIZE) -> np.ndarray:
+    """
+    Classify the emotions of prepared faces with DeepFace's emotion model in batches.
+    
+    Applies the same preprocessing as DeepFace.analyze (48x48 grayscale,
+    scaled to [0, 1]) but skips its face detection, since the crops come
+    from MediaPipe.
+    
+    Args:
+        faces: (faces, 48, 48) grayscale array from prepare_face
+        batch_size: Faces per forward pass
         
-    except Exception as e:
-        # If DeepFace fails, use neutral emotion
-        result["emotions"] = {"neutral": 0.7, "happiness": 0.3}
+    Returns:
+        (faces, classes) probability matrix, columns ordered as EMOTION_LABELS
+    """
+    model = get_model("deepface_emotion")
+    # Newer DeepFace releases wrap the Keras model in a client object
+    model = getattr(model, "model", model)
     
-    return result
+    batch = faces.astype(np.float32)[..., np.newaxis] / 255.0
+    predictions = np.asarray(model.predict(batch, batch_size=batch_size, verbose=0), dtype=np.float64)
+    return predictions / np.maximum(predictions.sum(axis=1, keepdims=True), 1e-12)
 
-def check_eye_contact(face_landmarks) -> bool:
+def check_eye_contact(landmarks: np.ndarray) -> np.ndarray:
     """
     Check if the person is looking at the camera.
     
     Args:
-        face_landmarks: MediaPipe face landmarks
+        landmarks: (frames, 468, 3) landmark array
         
     Returns:
-        Boolean indicating eye contact
+        Boolean array indicating eye contact per frame
     """
-    # Extract eye landmarks
-    left_eye = [(face_landmarks.landmark[33].x, face_landmarks.landmark[33].y),
-                (face_landmarks.landmark[133].x, face_landmarks.landmark[133].y)]
-    right_eye = [(face_landmarks.landmark[362].x, face_landmarks.landmark[362].y),
-                 (face_landmarks.landmark[263].x, face_landmarks.landmark[263].y)]
-    
     # Calculate eye direction
-    left_eye_dir = left_eye[1][0] - left_eye[0][0]
-    right_eye_dir = right_eye[1][0] - right_eye[0][0]
+    left_eye_dir = landmarks[:, LEFT_EYE_INNER, 0] - landmarks[:, LEFT_EYE_OUTER, 0]
+    right_eye_dir = landmarks[:, RIGHT_EYE_OUTER, 0] - landmarks[:, RIGHT_EYE_INNER, 0]
     
     # Check if eyes are looking forward
     # Simplified heuristic: if both eyes have similar horizontal direction
-    eye_direction_diff = abs(left_eye_dir - right_eye_dir)
+    eye_direction_diff = np.abs(left_eye_dir - right_eye_dir)
     
     return eye_direction_diff < 0.05
 
-def detect_smile(face_landmarks) -> bool:
+def detect_smile(landmarks: np.ndarray) -> np.ndarray:
     """
     Detect if the person is smiling.
     
     Args:
-        face_landmarks: MediaPipe face landmarks
+        landmarks: (frames, 468, 3) landmark array
         
     Returns:
-        Boolean indicating smile detection
+        Boolean array indicating smile detection per frame
     """
-    # Extract mouth landmarks
-    mouth_top = face_landmarks.landmark[13]
-    mouth_bottom = face_landmarks.landmark[14]
-    mouth_left = face_landmarks.landmark[78]
-    mouth_right = face_landmarks.landmark[308]
-    
     # Calculate mouth aspect ratio
-    mouth_width = np.sqrt((mouth_right.x - mouth_left.x)**2 + (mouth_right.y - mouth_left.y)**2)
-    mouth_height = np.sqrt((mouth_top.x - mouth_bottom.x)**2 + (mouth_top.y - mouth_bottom.y)**2)
+    mouth_width = np.linalg.norm(landmarks[:, MOUTH_RIGHT, :2] - landmarks[:, MOUTH_LEFT, :2], axis=1)
+    mouth_height = np.linalg.norm(landmarks[:, MOUTH_TOP, :2] - landmarks[:, MOUTH_BOTTOM, :2], axis=1)
     
-    mouth_ratio = mouth_height / mouth_width if mouth_width > 0 else 0
+    mouth_ratio = np.divide(mouth_height, mouth_width, out=np.zeros_like(mouth_height), where=mouth_width > 0)
     
     # Check for smile
     return mouth_ratio < 0.3  # Lower values indicate wider mouth, suggesting smile
 
-def aggregate_emotions(emotions_list: List[Dict[str, float]]) -> Dict[str, float]:
+def estimate_head_pose(landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate head yaw and pitch from the nose position within the face.
+    
+    Args:
+        landmarks: (frames, 468, 3) landmark array
+        
+    Returns:
+        Yaw (nose offset from the eye midpoint over eye distance) and pitch
+        (nose offset from the forehead-chin midpoint over face height) per
+        frame. Both are near 0 for a frontal face; pitch keeps a small
+        positive offset since the nose tip sits slightly below mid-face.
+    """
+    eye_left = landmarks[:, LEFT_EYE_OUTER, :2]
+    eye_right = landmarks[:, RIGHT_EYE_OUTER, :2]
+    nose = landmarks[:, NOSE_TIP, :2]
+    
+    eye_distance = np.maximum(np.linalg.norm(eye_right - eye_left, axis=1), 1e-6)
+    yaw = (nose[:, 0] - (eye_left[:, 0] + eye_right[:, 0]) / 2) / eye_distance
+    
+    forehead = landmarks[:, FOREHEAD, 1]
+    chin = landmarks[:, CHIN, 1]
+    face_height = np.maximum(chin - forehead, 1e-6)
+    pitch = (nose[:, 1] - (forehead + chin) / 2) / face_height
+    
+    return yaw, pitch
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """Tiny grayscale thumbnail used as a cheap change signal between frames."""
+    import cv2
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(gray, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+    return thumbnail.astype(np.float32) / 255.0
+
+def frame_change(signature: np.ndarray, previous: np.ndarray) -> float:
+    """Mean absolute difference between two frame signatures, in [0, 1]."""
+    return float(np.abs(signature - previous).mean())
+
+def landmark_change(landmarks: np.ndarray, previous: np.ndarray) -> float:
+    """Mean displacement of the landmarks in normalized image coordinates."""
+    return float(np.linalg.norm(landmarks[:, :2] - previous[:, :2], axis=1).mean())
+
+def frame_durations(frame_times: np.ndarray) -> np.ndarray:
+    """
+    Seconds of video each sampled frame stands for.
+    
+    Args:
+        frame_times: Timestamps of the sampled frames, ascending
+        
+    Returns:
+        Gap to the next sampled frame; the last frame gets the median gap
+    """
+    if len(frame_times) < 2:
+        return np.ones(len(frame_times))
+    gaps = np.diff(frame_times)
+    return np.append(gaps, np.median(gaps))
+
+def aggregate_emotions(emotions: np.ndarray, weights: Optional[np.ndarray] = None) -> Dict[str, float]:
     """
     Aggregate emotions across frames.
     
     Args:
-        emotions_list: List of emotion distributions
+        emotions: (frames, classes) probability matrix, columns ordered as EMOTION_LABELS
+        weights: Optional per-row weights, e.g. the time each row covers
         
     Returns:
         Aggregated emotion distribution
     """
-    if not emotions_list:
+    if len(emotions) == 0:
         return {"neutral": 1.0}
     
-    # Initialize aggregated emotions
-    aggregated = {}
-    
-    # Sum emotions across frames
-    for emotions in emotions_list:
-        for emotion, value in emotions.items():
-            if emotion in aggregated:
-                aggregated[emotion] += value
-            else:
-                aggregated[emotion] = value
-    
-    # Normalize
-    total = sum(aggregated.values())
-    aggregated = {k: v/total for k, v in aggregated.items()}
+    # Sum emotions across frames and normalize
+    totals = emotions.sum(axis=0) if weights is None else weights @ emotions
+    totals = totals / totals.sum()
     
-    return aggregated
+    return dict(zip(EMOTION_LABELS, totals.tolist()))
 
 def calculate_confidence_score(
     emotions: Dict[str, float],
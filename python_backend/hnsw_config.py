@@ -0,0 +1,105 @@
+import os
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
+# Defaults match Chroma's own HNSW defaults so existing stores stay consistent
+DEFAULT_HNSW_SPACE = os.getenv("HNSW_SPACE", "l2")
+DEFAULT_HNSW_M = int(os.getenv("HNSW_M", "16"))
+DEFAULT_HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))
+DEFAULT_HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "10"))
+
+SUPPORTED_SPACES = ("l2", "ip", "cosine")
+
+def hnsw_metadata(
+    space: Optional[str] = None,
+    M: Optional[int] = None,
+    construction_ef: Optional[int] = None,
+    search_ef: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build the Chroma collection metadata that configures its HNSW index.
+
+    Args:
+        space: Distance function ("l2", "ip" or "cosine")
+        M: Maximum number of neighbour links per node
+        construction_ef: Candidate list size used while building the graph
+        search_ef: Candidate list size used while querying
+
+    Returns:
+        Collection metadata dictionary
+    """
+    space = space or DEFAULT_HNSW_SPACE
+    if space not in SUPPORTED_SPACES:
+        raise ValueError(f"Unsupported HNSW space '{space}'. Expected one of {SUPPORTED_SPACES}.")
+
+    return {
+        "hnsw:space": space,
+        "hnsw:M": M or DEFAULT_HNSW_M,
+        "hnsw:construction_ef": construction_ef or DEFAULT_HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": search_ef or DEFAULT_HNSW_SEARCH_EF
+    }
+
+def build_vector_store(docs, embedding_function, persist_directory: str, **hnsw_params) -> "Chroma":
+    """
+    Create a new persisted Chroma store with explicit HNSW settings.
+
+    Args:
+        docs: Documents to index
+        embedding_function: Embedding model
+        persist_directory: Directory to persist the store to
+        **hnsw_params: space, M, construction_ef and search_ef overrides
+
+    Returns:
+        Chroma vector store
+    """
+    from langchain_chroma import Chroma
+
+    return Chroma.from_documents(
+        docs,
+        embedding_function,
+        persist_directory=persist_directory,
+        collection_metadata=hnsw_metadata(**hnsw_params)
+    )
+
+def open_vector_store(persist_directory: str, embedding_function, **hnsw_params) -> "Chroma":
+    """
+    Open a persisted Chroma store, creating it with the given HNSW settings if needed.
+
+    HNSW settings are fixed when a collection is created. If the stored
+    settings differ from the requested ones, a warning is printed and the
+    store has to be rebuilt for the new settings to take effect. That
+    includes search_ef: chromadb 0.6 copies it onto the collection's vector
+    segment at creation and offers no way to change it afterwards, so it
+    cannot be tuned per request or per process. Searches served from a
+    vector snapshot are exact and do not use it at all.
+
+    Args:
+        persist_directory: Directory of the persisted store
+        embedding_function: Embedding model
+        **hnsw_params: space, M, construction_ef and search_ef overrides
+
+    Returns:
+        Chroma vector store
+    """
+    from langchain_chroma import Chroma
+
+    requested = hnsw_metadata(**hnsw_params)
+    db = Chroma(
+        persist_directory=persist_directory,
+        embedding_function=embedding_function,
+        collection_metadata=requested
+    )
+
+    stored = db._collection.metadata or {}
+    mismatched = {
+        key: (stored.get(key), value)
+        for key, value in requested.items()
+        if key in stored and stored[key] != value
+    }
+    if mismatched:
+        print(f"HNSW settings differ from stored collection (stored, requested): {mismatched}. "
+              f"Rebuild {persist_directory} to apply them.")
+
+    return db
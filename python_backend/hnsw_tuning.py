@@ -0,0 +1,198 @@
+import os
+import time
+import argparse
+import itertools
+import numpy as np
+import hnswlib
+from typing import Dict, List, Any
+
+current_dir = os.path.dirname(__file__)
+
+COLLECTIONS = {
+    "students": os.path.join(current_dir, 'db', 'students_data'),
+    "mentors": os.path.join(current_dir, 'db', 'mentors_data')
+}
+
+def load_embeddings(persist_directory: str) -> np.ndarray:
+    """
+    Load all stored vectors from a persisted Chroma collection.
+
+    Args:
+        persist_directory: Directory of the persisted store
+
+    Returns:
+        Matrix of shape (n, dim)
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection("langchain")
+    data = collection.get(include=["embeddings"])
+
+    return np.asarray(data["embeddings"], dtype=np.float32)
+
+def make_queries(vectors: np.ndarray, num_queries: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """
+    Build query vectors by perturbing randomly chosen corpus vectors.
+
+    Args:
+        vectors: Corpus matrix
+        num_queries: Number of queries to generate
+        noise: Standard deviation of the perturbation relative to vector norm
+        seed: Random seed
+
+    Returns:
+        Query matrix of shape (num_queries, dim)
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(vectors), size=num_queries)
+    base = vectors[picks]
+    scale = np.linalg.norm(base, axis=1, keepdims=True) * noise / np.sqrt(vectors.shape[1])
+
+    return (base + rng.standard_normal(base.shape).astype(np.float32) * scale).astype(np.float32)
+
+def brute_force_knn(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """
+    Exact k nearest neighbours, used as ground truth.
+
+    Args:
+        vectors: Corpus matrix
+        queries: Query matrix
+        k: Number of neighbours
+        space: Distance function ("l2", "ip" or "cosine")
+
+    Returns:
+        Neighbour indices of shape (num_queries, k)
+    """
+    if space == "l2":
+        distances = (
+            np.sum(queries ** 2, axis=1, keepdims=True)
+            - 2 * queries @ vectors.T
+            + np.sum(vectors ** 2, axis=1)
+        )
+    elif space == "ip":
+        distances = -(queries @ vectors.T)
+    else:
+        q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        v = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        distances = -(q @ v.T)
+
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+
+    return np.take_along_axis(top, order, axis=1)
+
+def evaluate(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    ground_truth: np.ndarray,
+    space: str,
+    M: int,
+    construction_ef: int,
+    search_efs: List[int]
+) -> List[Dict[str, Any]]:
+    """
+    Build one HNSW index and measure recall and latency for each search ef.
+
+    Args:
+        vectors: Corpus matrix
+        queries: Query matrix
+        ground_truth: Exact neighbour indices
+        space: Distance function
+        M: Maximum number of neighbour links per node
+        construction_ef: Candidate list size used while building
+        search_efs: Search candidate list sizes to try
+
+    Returns:
+        One result row per search ef
+    """
+    k = ground_truth.shape[1]
+    index = hnswlib.Index(space=space, dim=vectors.shape[1])
+
+    build_start = time.perf_counter()
+    index.init_index(max_elements=len(vectors), ef_construction=construction_ef, M=M)
+    index.add_items(vectors, np.arange(len(vectors)))
+    build_seconds = time.perf_counter() - build_start
+
+    rows = []
+    for search_ef in search_efs:
+        index.set_ef(max(search_ef, k))
+        latencies = np.empty(len(queries))
+        hits = 0
+
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            labels, _ = index.knn_query(query, k=k)
+            latencies[i] = time.perf_counter() - start
+            hits += len(np.intersect1d(labels[0], ground_truth[i]))
+
+        rows.append({
+            "M": M,
+            "construction_ef": construction_ef,
+            "search_ef": search_ef,
+            "recall": hits / ground_truth.size,
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+            "build_s": build_seconds
+        })
+
+    return rows
+
+def pareto_frontier(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Keep the settings that no other setting beats on both recall and p99 latency.
+
+    Args:
+        rows: Result rows from evaluate
+
+    Returns:
+        Frontier rows sorted by latency
+    """
+    frontier = []
+    best_recall = -1.0
+    for row in sorted(rows, key=lambda r: (r["p99_ms"], -r["recall"])):
+        if row["recall"] > best_recall:
+            frontier.append(row)
+            best_recall = row["recall"]
+
+    return frontier
+
+def print_rows(title: str, rows: List[Dict[str, Any]], k: int):
+    print(f"\n ----- {title} -----")
+    print(f"{'M':>4} {'c_ef':>6} {'s_ef':>6} {f'recall@{k}':>10} {'p50 ms':>9} {'p99 ms':>9} {'build s':>8}")
+    for row in rows:
+        print(f"{row['M']:>4} {row['construction_ef']:>6} {row['search_ef']:>6} "
+              f"{row['recall']:>10.4f} {row['p50_ms']:>9.4f} {row['p99_ms']:>9.4f} {row['build_s']:>8.2f}")
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep HNSW settings and print the recall/latency frontier.")
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), default="students")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Use N random vectors instead of a stored collection")
+    parser.add_argument("--space", choices=["l2", "ip", "cosine"], default="l2")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--M", type=parse_int_list, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=parse_int_list, default=[50, 100, 200])
+    parser.add_argument("--search-ef", type=parse_int_list, default=[10, 20, 50, 100])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = np.random.default_rng(1).standard_normal((args.synthetic, 384)).astype(np.float32)
+    else:
+        vectors = load_embeddings(COLLECTIONS[args.collection])
+
+    k = min(args.k, len(vectors))
+    queries = make_queries(vectors, args.queries)
+    ground_truth = brute_force_knn(vectors, queries, k, args.space)
+    print(f"Corpus: {len(vectors)} vectors of dim {vectors.shape[1]}, {len(queries)} queries, k={k}")
+
+    rows = []
+    for M, construction_ef in itertools.product(args.M, args.construction_ef):
+        rows.extend(evaluate(vectors, queries, ground_truth, args.space, M, construction_ef, args.search_ef))
+
+    print_rows("All settings", rows, k)
+    print_rows("Recall / p99 latency frontier", pareto_frontier(rows), k)
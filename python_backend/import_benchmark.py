@@ -0,0 +1,117 @@
+import os
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Any, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Cold-import budget per module in milliseconds, measured in a fresh
+# interpreter. Heavy dependencies (torch, Whisper, MediaPipe, DeepFace, spaCy,
+# NLTK, LangChain, Chroma) are imported on first use, so none of these
+# modules should pay for them at import time.
+IMPORT_BUDGETS_MS = {
+    "model_registry": 50,
+    "acoustic_features": 250,
+    "video_utils": 250,
+    "asr": 300,
+    "speech_timeline": 250,
+    "transcript_document": 250,
+    "term_matcher": 250,
+    "result_cache": 250,
+    "voice_analysis": 350,
+    "nlp_analysis": 300,
+    "emotion_detection": 300,
+    "presentation_analysis": 450,
+    "analysis_jobs": 300,
+    "embedding_server": 250,
+    "main": 2500
+}
+
+def parse_importtime(stderr: str, module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Read `python -X importtime` output.
+
+    Args:
+        stderr: Output of the interpreter
+        module: Module whose import was measured
+
+    Returns:
+        Cumulative import time of the module in ms, and the slowest
+        dependencies imported directly by it as (name, ms)
+    """
+    total = None
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative = int(fields[1]) / 1000
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() == module and depth == 0:
+            total = cumulative
+        elif depth == 1:
+            children.append((name.strip(), cumulative))
+
+    if total is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return total, sorted(children, key=lambda item: -item[1])[:3]
+
+def measure_import(module: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Import a module in fresh interpreters and keep the fastest run.
+
+    Args:
+        module: Module name, importable from this directory
+        repeat: Number of fresh interpreters
+
+    Returns:
+        Dictionary with the import time in ms and its slowest dependencies
+    """
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=current_dir,
+            capture_output=True,
+            text=True
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            raise RuntimeError(error[-1] if error else f"import {module} failed")
+
+        total, children = parse_importtime(completed.stderr, module)
+        if best is None or total < best["ms"]:
+            best = {"ms": total, "slowest": children}
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when the cold import time of a module exceeds its budget.")
+    parser.add_argument("--modules", nargs="+", default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module; the fastest run counts")
+    parser.add_argument("--scale", type=float, default=float(os.getenv("IMPORT_BUDGET_SCALE", "1")),
+                        help="Multiply every budget, for slower machines")
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'module':<24} {'import ms':>10} {'budget ms':>10}  slowest dependencies")
+    for module in args.modules:
+        budget = IMPORT_BUDGETS_MS.get(module, 250) * args.scale
+        try:
+            result = measure_import(module, args.repeat)
+        except Exception as e:
+            print(f"{module:<24} {'error':>10} {budget:>10.0f}  {str(e)}")
+            over_budget.append(module)
+            continue
+
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in result["slowest"])
+        flag = "" if result["ms"] <= budget else "  OVER BUDGET"
+        print(f"{module:<24} {result['ms']:>10.1f} {budget:>10.0f}  {slowest}{flag}")
+        if result["ms"] > budget:
+            over_budget.append(module)
+
+    if over_budget:
+        raise SystemExit(f"Import time budget exceeded or import failed: {', '.join(over_budget)}")
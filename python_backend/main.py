@@ -1,27 +1,35 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Response, Request
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import tempfile
 import shutil
 import uuid
+import hashlib
 from datetime import date
 from fastapi import Body
 import os
 from fastapi.middleware.cors import CORSMiddleware
-from langchain_text_splitters import CharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import JSONLoader
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
-from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema.output_parser import StrOutputParser
 import traceback
 import json
-# from video_utils import extract_audio
-# from nlp_analysis import analyze_transcript
-# from emotion_detection import analyze_facial_expressions
-# from voice_analysis import analyze_voice
+import math
+import threading
+from contextlib import contextmanager
+from mmr import search_with_mmr, DEFAULT_MMR_LAMBDA, DEFAULT_MMR_FETCH_K
+from hnsw_config import build_vector_store, open_vector_store
+from vector_snapshot import VectorSnapshot, load_snapshot, refresh_snapshot
+from embedding_server import load_embedding_model, EmbeddingClient
+from profile_store import (
+    get_profile_store,
+    load_profile_documents,
+    unique_profile_hits,
+    hydrate_profiles,
+    render_profiles_response
+)
+from compaction import Compactor, collection_lock, update_profile, delete_profile, index_stats
+from analysis_jobs import AnalysisJobManager, QueueFullError
+from video_utils import StreamingDemuxer, UploadTooLargeError, MAX_UPLOAD_BYTES
 
 
 load_dotenv()
@@ -38,13 +46,95 @@ app.add_middleware(
 
 @app.on_event("startup")
 def startup_event():
-    app.state.embedding_model = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
-    print("Model cached in FastAPI state!")
+    # Thin client to the shared sidecar when EMBEDDING_SOCKET is set, else a local model
+    app.state.embedding_model = load_embedding_model()
+    print(f"Embedding model cached in FastAPI state! ({type(app.state.embedding_model).__name__})")
+
+    # Memory-map exported snapshots so workers share one read-only copy
+    app.state.snapshots = {name: load_snapshot(name) for name in ("students", "mentors")}
+    print(f"Vector snapshots loaded: {[name for name, snap in app.state.snapshots.items() if snap is not None]}")
+
+    # Compact collections in the background once enough chunks are tombstoned
+    app.state.compactor = Compactor()
+    app.state.compactor.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if hasattr(app.state, 'compactor'):
+        app.state.compactor.stop()
+    if getattr(app.state, 'job_manager', None) is not None:
+        app.state.job_manager.shutdown()
+
+_snapshots_lock = threading.Lock()
+
+def acquire_snapshot(name: str) -> Optional[VectorSnapshot]:
+    """Return the current snapshot of a collection, held for the caller, reloading it if its file was replaced."""
+    with _snapshots_lock:
+        if not hasattr(app.state, 'snapshots'):
+            app.state.snapshots = {}
+
+        snapshot = app.state.snapshots.get(name)
+        if snapshot is None or snapshot.is_stale():
+            previous = snapshot
+            snapshot = load_snapshot(name)
+            app.state.snapshots[name] = snapshot
+            if previous is not None:
+                # Unmapped once the requests still searching it are done
+                previous.retire()
+
+        if snapshot is not None:
+            snapshot.acquire()
+        return snapshot
+
+@contextmanager
+def vector_source(name: str, persistence_dir: str):
+    """
+    Use the snapshot for a collection if one is exported, else the Chroma collection.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+        persistence_dir: Directory of the persisted Chroma store
+
+    Yields:
+        Object exposing the Chroma collection count/query API
+    """
+    snapshot = acquire_snapshot(name)
+    if snapshot is None:
+        yield open_vector_store(persistence_dir, app.state.embedding_model)._collection
+        return
+
+    try:
+        yield snapshot
+    finally:
+        snapshot.release()
+
+
+@app.get('/api/embedding_stats')
+def embedding_stats():
+    model = getattr(app.state, 'embedding_model', None)
+    if not isinstance(model, EmbeddingClient):
+        return {"mode": "in-process"}
+    try:
+        return {"mode": "sidecar", **model.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Embedding sidecar unavailable: {e}")
 
 
 # Request Model for File Path
 class FilePathRequest(BaseModel):
     file_path: str
+    hnsw_space: Optional[str] = None
+    hnsw_M: Optional[int] = None
+    hnsw_construction_ef: Optional[int] = None
+    hnsw_search_ef: Optional[int] = None
+
+def hnsw_params(request: FilePathRequest) -> Dict[str, Any]:
+    return {
+        "space": request.hnsw_space,
+        "M": request.hnsw_M,
+        "construction_ef": request.hnsw_construction_ef,
+        "search_ef": request.hnsw_search_ef
+    }
 
 @app.post('/api/add_student')
 def add_student(request: FilePathRequest):
@@ -53,18 +143,19 @@ def add_student(request: FilePathRequest):
         current_dir = os.path.dirname(__file__)
         persistance_path = os.path.join(current_dir, 'db', 'students_data')
 
-        loader = JSONLoader(file_path=file_path, jq_schema='.[]', text_content=False)
-        data = loader.load()
+        docs, profiles = load_profile_documents(file_path)
 
-        text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        docs = text_splitter.split_documents(data)
+        # Held until the snapshot is refreshed, so a compaction never rebuilds from a read that misses these chunks
+        with collection_lock("students"):
+            if not os.path.exists(persistance_path):
+                os.makedirs(persistance_path)  # Ensure directory exists
+                db = build_vector_store(docs, app.state.embedding_model, persistance_path, **hnsw_params(request))
+            else:
+                db = open_vector_store(persistance_path, app.state.embedding_model, **hnsw_params(request))
+                db.add_documents(docs)
 
-        if not os.path.exists(persistance_path):
-            os.makedirs(persistance_path)  # Ensure directory exists
-            db = Chroma.from_documents(docs,app.state.embedding_model, persist_directory=persistance_path)
-        else:
-            db = Chroma(persist_directory=persistance_path, embedding_function=app.state.embedding_model)
-            db.add_documents(docs)
+            get_profile_store("students").put_many(profiles)
+            refresh_snapshot("students", persistance_path)
 
         return {"message": "Student added successfully", "total_documents": len(db.get())}
     except Exception as e:
@@ -77,30 +168,116 @@ def add_mentor(request: FilePathRequest):
         current_dir = os.path.dirname(__file__)
         persistance_path = os.path.join(current_dir, 'db', 'mentors_data')
 
-        loader = JSONLoader(file_path=file_path, jq_schema='.[]', text_content=False)
-        data = loader.load()
+        docs, profiles = load_profile_documents(file_path)
 
-        text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        docs = text_splitter.split_documents(data)
+        with collection_lock("mentors"):
+            if not os.path.exists(persistance_path):
+                os.makedirs(persistance_path)  # Ensure directory exists
+                db = build_vector_store(docs, app.state.embedding_model, persistance_path, **hnsw_params(request))
+            else:
+                db = open_vector_store(persistance_path, app.state.embedding_model, **hnsw_params(request))
+                db.add_documents(docs)
 
-        if not os.path.exists(persistance_path):
-            os.makedirs(persistance_path)  # Ensure directory exists
-            db = Chroma.from_documents(docs, app.state.embedding_model, persist_directory=persistance_path)
-        else:
-            db = Chroma(persist_directory=persistance_path, embedding_function=app.state.embedding_model)
-            db.add_documents(docs)
+            get_profile_store("mentors").put_many(profiles)
+            refresh_snapshot("mentors", persistance_path)
 
         return {"message": "Mentor added successfully", "total_documents": len(db.get())}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
+class ProfileRequest(BaseModel):
+    profile: Dict[str, Any]
+
+class ProfileIdRequest(BaseModel):
+    profile_id: str
+
+@app.post('/api/update_student')
+def update_student(request: ProfileRequest):
+    try:
+        return {"message": "Student updated successfully", **update_profile("students", app.state.embedding_model, request.profile)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/api/delete_student')
+def delete_student(request: ProfileIdRequest):
+    try:
+        result = delete_profile("students", request.profile_id)
+        if not result["found"]:
+            raise HTTPException(status_code=404, detail="Student not found")
+        return {"message": "Student deleted successfully", **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/api/update_mentor')
+def update_mentor(request: ProfileRequest):
+    try:
+        return {"message": "Mentor updated successfully", **update_profile("mentors", app.state.embedding_model, request.profile)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/api/delete_mentor')
+def delete_mentor(request: ProfileIdRequest):
+    try:
+        result = delete_profile("mentors", request.profile_id)
+        if not result["found"]:
+            raise HTTPException(status_code=404, detail="Mentor not found")
+        return {"message": "Mentor deleted successfully", **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get('/api/index_stats')
+def get_index_stats():
+    try:
+        return {"collections": [index_stats(name) for name in ("students", "mentors")]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def mmr_params(request_data: Dict[str, Any]) -> Tuple[float, int]:
+    """
+    Read the optional MMR settings of a recommendation request.
+
+    Args:
+        request_data: Request body
+
+    Returns:
+        Tuple of (lambda clamped to [0, 1], candidate pool size)
+
+    Raises:
+        HTTPException: 400 if a value is not a number or fetch_k is not positive
+    """
+    try:
+        mmr_lambda = float(request_data.get('mmr_lambda', DEFAULT_MMR_LAMBDA))
+        fetch_k = int(request_data.get('fetch_k', DEFAULT_MMR_FETCH_K))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="mmr_lambda must be a number and fetch_k an integer")
+    if math.isnan(mmr_lambda):
+        raise HTTPException(status_code=400, detail="mmr_lambda must be a number")
+    if fetch_k <= 0:
+        raise HTTPException(status_code=400, detail="fetch_k must be positive")
+    return min(max(mmr_lambda, 0.0), 1.0), fetch_k
+
 @app.post("/api/recommend_students")
 def recommend_student(request_data: dict = Body(...)):
+    # Validated before the LLM call, so bad input is a 400 rather than a 500 after a wasted generation
+    mmr_lambda, fetch_k = mmr_params(request_data)
     try:
         # Extract userData from the request
         userData = request_data.get('userData', {})
         
+        # The LLM client stack is only needed by the recommendation endpoints
+        from langchain.prompts import ChatPromptTemplate
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain.schema.output_parser import StrOutputParser
+
         model = ChatGoogleGenerativeAI(model='gemini-2.0-flash')
         print("USER INPUT: ", userData)
 
@@ -140,26 +317,28 @@ def recommend_student(request_data: dict = Body(...)):
         # Check if embedding model exists
         if not hasattr(app.state, 'embedding_model'):
             # Initialize the embedding model if not already available
-            from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-            app.state.embedding_model = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
+            app.state.embedding_model = load_embedding_model()
             
-        db = Chroma(persist_directory=persistence_dir, embedding_function=app.state.embedding_model)
-        retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 4})
-        
-        # Get relevant documents
-        relevant_docs = retriever.invoke(query)
+        # Pull a larger candidate pool and rerank it with MMR for skill diversity
+        with vector_source("students", persistence_dir) as collection:
+            hits, timings = search_with_mmr(
+                collection,
+                app.state.embedding_model,
+                query,
+                k=4,
+                fetch_k=fetch_k,
+                lambda_mult=mmr_lambda,
+                tombstones=get_profile_store("students").tombstones()
+            )
+        print(f"Retrieval timings: {timings}")
         
-        # Process all documents properly
-        relevant_docs_content = []
-        for doc in relevant_docs:
-            try:
-                content = json.loads(doc.page_content)
-                relevant_docs_content.append(content)
-            except json.JSONDecodeError as json_err:
-                print(f"JSON decoding error: {json_err} - Document content: {doc.page_content[:100]}...")
-                # Skip invalid documents or handle as needed
+        # Hydrate whole profiles from the profile store, already serialized
+        profiles = hydrate_profiles(get_profile_store("students"), hits)
         
-        return {"teammates": relevant_docs_content}
+        return Response(
+            content=render_profiles_response("teammates", profiles, {"timings": timings}),
+            media_type="application/json"
+        )
     
     except Exception as e:
         error_details = {
@@ -177,6 +356,10 @@ def recommend_mentor(request_data: dict = Body(...)):
         # Extract userData from the request
         userData = request_data.get('userData', {})
         
+        from langchain.prompts import ChatPromptTemplate
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain.schema.output_parser import StrOutputParser
+
         model = ChatGoogleGenerativeAI(model='gemini-2.0-flash')
         print("USER INPUT: ", userData)
 
@@ -199,26 +382,29 @@ def recommend_mentor(request_data: dict = Body(...)):
         # Check if embedding model exists
         if not hasattr(app.state, 'embedding_model'):
             # Initialize the embedding model if not already available
-            from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-            app.state.embedding_model = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
+            app.state.embedding_model = load_embedding_model()
             
-        db = Chroma(persist_directory=persistence_dir, embedding_function=app.state.embedding_model)
-        retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 5})
-        
         # Get relevant documents
-        relevant_docs = retriever.invoke(query)
+        query_embedding = app.state.embedding_model.embed_query(query)
+        # Over-fetch so that split profiles and tombstoned chunks still leave 5 distinct mentors
+        tombstones = get_profile_store("mentors").tombstones()
+        with vector_source("mentors", persistence_dir) as collection:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=max(1, min(20 + len(tombstones), collection.count())),
+                include=["documents", "metadatas"]
+            )
+        hits = unique_profile_hits(
+            results["documents"][0],
+            results["metadatas"][0],
+            results["ids"][0],
+            tombstones
+        )[:5]
         
-        # Process all documents properly
-        relevant_docs_content = []
-        for doc in relevant_docs:
-            try:
-                content = json.loads(doc.page_content)
-                relevant_docs_content.append(content)
-            except json.JSONDecodeError as json_err:
-                print(f"JSON decoding error: {json_err} - Document content: {doc.page_content[:100]}...")
-                # Skip invalid documents
+        # Hydrate whole profiles from the profile store, already serialized
+        profiles = hydrate_profiles(get_profile_store("mentors"), hits)
         
-        return {"mentors": relevant_docs_content}
+        return Response(content=render_profiles_response("mentors", profiles), media_type="application/json")
     
     except Exception as e:
         error_details = {
@@ -230,144 +416,166 @@ def recommend_mentor(request_data: dict = Body(...)):
         print(error_details['traceback'])
         raise HTTPException(status_code=500, detail=str(e))    
 
-# @app.post("/api/analyze_video")
-# async def analyze_presentations(video: UploadFile = File(...)) -> Dict[str, Any]:
-#     if not video.filename.lower().endswith(('.mp4', '.mov', '.avi')):
-#         raise HTTPException(status_code=400, detail="Invalid video format. Only .mp4, .mov, and .avi are supported.")
-#     temp_dir = tempfile.mkdtemp()
-#     try:
-#         # Save uploaded video
-#         temp_video_path = os.path.join(temp_dir, f"{uuid.uuid4()}{os.path.splitext(video.filename)[1]}")
-#         with open(temp_video_path, "wb") as buffer:
-#             shutil.copyfileobj(video.file, buffer)
-        
-#         # Extract audio
-#         audio_path = extract_audio(temp_video_path, temp_dir)
-        
-#         # Process the video and audio in parallel (in a real implementation)
-#         # For now, we'll do it sequentially
-        
-#         # 1. Analyze audio for transcription & voice qualities
-#         voice_results = analyze_voice(audio_path)
-        
-#         # 2. Analyze facial expressions
-#         emotion_results = analyze_facial_expressions(temp_video_path)
-        
-#         # 3. Analyze transcript for NLP assessment
-#         nlp_results = analyze_transcript(voice_results["transcript"])
-        
-#         # 4. Calculate final scores
-#         final_scores = calculate_final_scores(nlp_results, emotion_results, voice_results)
-        
-#         # 5. Generate recommendations
-#         recommendations = generate_recommendations(final_scores, nlp_results, emotion_results, voice_results)
-        
-#         # Compile results
-#         analysis_results = {
-#             "scores": final_scores,
-#             "recommendations": recommendations,
-#             "details": {
-#                 "nlp_analysis": nlp_results,
-#                 "emotion_analysis": emotion_results,
-#                 "voice_analysis": voice_results
-#             }
-#         }
-        
-#         return analysis_results
-
-#     finally:
-#         # Clean up temporary files
-#         shutil.rmtree(temp_dir)
-
-# def calculate_final_scores(nlp_results, emotion_results, voice_results):
-#     """Calculate final scores based on all analyses."""
-#     return {
-#         "content_clarity": round((
-#             nlp_results["clarity_score"] * 0.7 + 
-#             voice_results["speech_coherence"] * 0.3
-#         ), 1),
-#         "technical_vocabulary": round(nlp_results["tech_term_score"], 1),
-#         "delivery": round((
-#             voice_results["fluency_score"] * 0.6 + 
-#             voice_results["pace_score"] * 0.4
-#         ), 1),
-#         "confidence": round((
-#             emotion_results["confidence_score"] * 0.5 + 
-#             voice_results["voice_steadiness"] * 0.5
-#         ), 1),
-#         "engagement": round((
-#             emotion_results["engagement_score"] * 0.7 + 
-#             voice_results["pitch_variation"] * 0.3
-#         ), 1),
-#         "overall": round((
-#             nlp_results["clarity_score"] * 0.25 +
-#             nlp_results["tech_term_score"] * 0.15 +
-#             voice_results["fluency_score"] * 0.2 +
-#             emotion_results["confidence_score"] * 0.2 +
-#             emotion_results["engagement_score"] * 0.2
-#         ), 1)
-#     }
-
-# def generate_recommendations(scores, nlp_results, emotion_results, voice_results):
-#     """Generate personalized recommendations based on lowest scores."""
-#     recommendations = []
-    
-#     # Check content clarity
-#     if scores["content_clarity"] < 7.0:
-#         if nlp_results["clarity_score"] < 7.0:
-#             recommendations.append(
-#                 "Consider simplifying your explanations and using more concrete examples to illustrate technical concepts."
-#             )
-#         if voice_results["speech_coherence"] < 7.0:
-#             recommendations.append(
-#                 "Try to organize your thoughts more clearly before speaking. Using transition phrases can help connect ideas."
-#             )
-    
-#     # Check technical vocabulary
-#     if scores["technical_vocabulary"] < 7.0:
-#         recommendations.append(
-#             f"Your use of technical terms could be improved. Consider incorporating more domain-specific vocabulary appropriate for {nlp_results['detected_domain']}."
-#         )
-    
-#     # Check delivery
-#     if scores["delivery"] < 7.0:
-#         if voice_results["fluency_score"] < 7.0:
-#             recommendations.append(
-#                 "Practice speaking more fluently by reducing filler words like 'um' and 'uh'. Try recording yourself and identifying areas for improvement."
-#             )
-#         if voice_results["pace_score"] < 7.0:
-#             recommendations.append(
-#                 f"Your speaking pace of {voice_results['words_per_minute']} words per minute could be improved. Aim for a comfortable 120-150 words per minute."
-#             )
-    
-#     # Check confidence
-#     if scores["confidence"] < 7.0:
-#         if emotion_results["confidence_score"] < 7.0:
-#             recommendations.append(
-#                 "Try to maintain more consistent eye contact with the camera and improve your posture to project confidence."
-#             )
-#         if voice_results["voice_steadiness"] < 7.0:
-#             recommendations.append(
-#                 "Your voice shows signs of nervousness. Practice breathing techniques to maintain a steadier tone."
-#             )
-    
-#     # Check engagement
-#     if scores["engagement"] < 7.0:
-#         if emotion_results["engagement_score"] < 7.0:
-#             recommendations.append(
-#                 "Consider incorporating more facial expressions and gestures to appear more engaged with your content."
-#             )
-#         if voice_results["pitch_variation"] < 7.0:
-#             recommendations.append(
-#                 "Your voice tone is somewhat monotonous. Try varying your pitch and emphasis to make key points stand out."
-#             )
-    
-#     # If doing well overall
-#     if not recommendations and scores["overall"] >= 8.0:
-#         recommendations.append(
-#             "Great job! Your presentation skills are strong. To further improve, consider focusing on advanced techniques like storytelling and audience interaction."
-#         )
-    
-#     return recommendations
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi')
+
+def save_upload(video: UploadFile, temp_dir: str) -> Tuple[str, str]:
+    """Write an upload to disk, hashing it on the way so repeated uploads hit the result cache."""
+    temp_video_path = os.path.join(temp_dir, f"{uuid.uuid4()}{os.path.splitext(video.filename)[1]}")
+    digest = hashlib.sha256()
+    written = 0
+    with open(temp_video_path, "wb") as buffer:
+        while chunk := video.file.read(1024 * 1024):
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise UploadTooLargeError(f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+            buffer.write(chunk)
+            digest.update(chunk)
+    return temp_video_path, digest.hexdigest()
+
+def get_job_manager() -> AnalysisJobManager:
+    # Created on first use so workers that never analyze video never start a pool
+    if getattr(app.state, 'job_manager', None) is None:
+        app.state.job_manager = AnalysisJobManager()
+    return app.state.job_manager
+
+@app.post("/api/analyze_video", status_code=202)
+async def analyze_presentations(video: UploadFile = File(...)) -> Dict[str, Any]:
+    if not video.filename.lower().endswith(VIDEO_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Invalid video format. Only .mp4, .mov, and .avi are supported.")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # Save uploaded video off the event loop, then hand it to the process pool;
+        # submitting reads the result cache, so it stays off the loop too
+        temp_video_path, content_hash = await run_in_threadpool(save_upload, video, temp_dir)
+        job_id = await run_in_threadpool(get_job_manager().submit, temp_video_path, temp_dir, None, content_hash)
+    except UploadTooLargeError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
+    # A repeated upload may already be completed from the cache or running
+    return {"job_id": job_id, "status": get_job_manager().status(job_id)["status"]}
+
+async def discard_stream(demuxer: Optional[StreamingDemuxer], temp_dir: Optional[str]):
+    """Stop a streaming upload that will not be analyzed and delete what it wrote."""
+    if demuxer is not None:
+        await run_in_threadpool(demuxer.abort)
+    if temp_dir is not None:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+@app.post("/api/analyze_video/stream", status_code=202)
+async def analyze_presentation_stream(request: Request, filename: str) -> Dict[str, Any]:
+    """
+    Accept the video as the raw request body and demux its audio while it uploads.
+
+    Unlike the multipart endpoint, nothing waits for the whole body: each
+    chunk is written to disk and fed to ffmpeg as it arrives, and oversized
+    or overlong uploads are rejected as soon as a limit is crossed.
+    """
+    if not filename.lower().endswith(VIDEO_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Invalid video format. Only .mp4, .mov, and .avi are supported.")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+
+    temp_dir = None
+    demuxer = None
+    try:
+        # Inside the try, so a demuxer that fails to start still cleans up and returns a formatted error
+        temp_dir = tempfile.mkdtemp()
+        video_path = os.path.join(temp_dir, f"{uuid.uuid4()}{os.path.splitext(filename)[1]}")
+        demuxer = await run_in_threadpool(StreamingDemuxer, video_path)
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(demuxer.feed, chunk)
+        pcm_path = await run_in_threadpool(demuxer.finish, os.path.join(temp_dir, "audio.f32"))
+        job_id = await run_in_threadpool(get_job_manager().submit, video_path, temp_dir, pcm_path, demuxer.content_hash)
+    except UploadTooLargeError as e:
+        await discard_stream(demuxer, temp_dir)
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        await discard_stream(None, temp_dir)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        await discard_stream(demuxer, temp_dir)
+        raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "job_id": job_id,
+        "status": get_job_manager().status(job_id)["status"],
+        "bytes_received": demuxer.bytes_received,
+        "audio_seconds_decoded": round(demuxer.seconds_decoded, 1),
+        "audio_streamed": pcm_path is not None
+    }
+
+@app.get("/api/analyze_video/{job_id}")
+def analysis_status(job_id: str) -> Dict[str, Any]:
+    status = get_job_manager().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@app.get("/api/analyze_video/{job_id}/result")
+def analysis_result(job_id: str) -> Dict[str, Any]:
+    job = get_job_manager().result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+@app.get("/api/analysis_metrics")
+def analysis_metrics() -> Dict[str, Any]:
+    return get_job_manager().metrics()
+
+class TranscriptBatchRequest(BaseModel):
+    transcripts: List[str]
+    batch_size: Optional[int] = None
+    n_process: Optional[int] = None
+
+# Larger batches only hold more parsed documents in memory at once
+MAX_TRANSCRIPT_BATCH_SIZE = 1024
+
+def transcript_batch_params(request: TranscriptBatchRequest) -> Tuple[int, int]:
+    """
+    Read the optional spaCy settings of a transcript batch request.
+
+    Args:
+        request: Transcript batch request
+
+    Returns:
+        Tuple of (batch size, parser processes capped at the core count)
+
+    Raises:
+        HTTPException: 400 if batch_size or n_process is out of range
+    """
+    from nlp_analysis import SPACY_BATCH_SIZE, SPACY_PROCESSES
+
+    batch_size = SPACY_BATCH_SIZE if request.batch_size is None else request.batch_size
+    if not 1 <= batch_size <= MAX_TRANSCRIPT_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {MAX_TRANSCRIPT_BATCH_SIZE}")
+    n_process = max(1, SPACY_PROCESSES) if request.n_process is None else request.n_process
+    if n_process <= 0:
+        raise HTTPException(status_code=400, detail="n_process must be positive")
+    # More parser processes than cores would only add overhead
+    return batch_size, min(n_process, os.cpu_count() or 1)
+
+@app.post("/api/analyze_transcripts")
+def analyze_transcript_batch(request: TranscriptBatchRequest) -> Dict[str, Any]:
+    from nlp_analysis import analyze_transcripts
+
+    batch_size, n_process = transcript_batch_params(request)
+    try:
+        results = analyze_transcripts(request.transcripts, batch_size=batch_size, n_process=n_process)
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"results": results, "count": len(results)}
@@ -0,0 +1,141 @@
+import os
+import time
+import numpy as np
+from typing import Dict, List, Any, Tuple, Optional
+from profile_store import unique_profile_hits
+
+# Default MMR settings, overridable per deployment
+DEFAULT_MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))
+DEFAULT_MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "50"))
+
+def mmr_rerank(
+    query_embedding: np.ndarray,
+    candidate_embeddings: np.ndarray,
+    k: int = 4,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA
+) -> List[int]:
+    """
+    Select k diverse candidates using maximal marginal relevance.
+
+    Args:
+        query_embedding: Query vector of shape (dim,)
+        candidate_embeddings: Candidate matrix of shape (n, dim)
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Indices into candidate_embeddings in selection order
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    n = candidates.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    k = min(k, n)
+
+    # Cosine similarity via normalized dot products
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms
+
+    relevance = candidates @ query
+
+    # Highest similarity of every candidate to anything already selected,
+    # updated with one matrix-vector product per pick
+    max_sim_selected = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    available[first] = False
+
+    while len(selected) < k:
+        np.maximum(max_sim_selected, candidates @ candidates[selected[-1]], out=max_sim_selected)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim_selected
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+
+    return selected
+
+def search_with_mmr(
+    collection,
+    embedding_model,
+    query: str,
+    k: int = 4,
+    fetch_k: int = DEFAULT_MMR_FETCH_K,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+    tombstones: Optional[set] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Retrieve a candidate pool from the vector store and rerank it with MMR.
+
+    The stored embeddings are returned by the vector store alongside the
+    documents, so candidates are never re-embedded. Chunks of the same
+    profile are collapsed to the best-ranked one before reranking.
+
+    Args:
+        collection: Chroma collection or VectorSnapshot to query
+        embedding_model: Embedding model used to embed the query
+        query: Search query
+        k: Number of results to return
+        fetch_k: Size of the candidate pool
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+        tombstones: Chunk IDs of deleted or replaced profiles to skip
+
+    Returns:
+        Tuple of (selected hits with profile_id and document, timings in milliseconds)
+    """
+    start = time.perf_counter()
+    query_embedding = embedding_model.embed_query(query)
+    embed_done = time.perf_counter()
+
+    # Over-fetch by the tombstone count so filtering never shrinks the pool,
+    # but never ask for more results than the collection holds
+    tombstones = tombstones or set()
+    n_results = min(max(k, fetch_k + len(tombstones)), collection.count())
+    if n_results == 0:
+        return [], {
+            "embed_ms": round((embed_done - start) * 1000, 3),
+            "retrieval_ms": 0.0,
+            "rerank_ms": 0.0,
+            "pool_size": 0
+        }
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=n_results,
+        include=["documents", "metadatas", "embeddings"]
+    )
+    retrieval_done = time.perf_counter()
+
+    hits = unique_profile_hits(results["documents"][0], results["metadatas"][0], results["ids"][0], tombstones)
+    embeddings = np.asarray(results["embeddings"][0])[[hit["index"] for hit in hits]]
+
+    selected = mmr_rerank(np.asarray(query_embedding), embeddings, k=k, lambda_mult=lambda_mult)
+    rerank_done = time.perf_counter()
+
+    timings = {
+        "embed_ms": round((embed_done - start) * 1000, 3),
+        "retrieval_ms": round((retrieval_done - embed_done) * 1000, 3),
+        "rerank_ms": round((rerank_done - retrieval_done) * 1000, 3),
+        "pool_size": len(hits)
+    }
+
+    return [hits[i] for i in selected], timings
+
+if __name__ == "__main__":
+    # Quick latency check of the rerank stage on random MiniLM-sized pools
+    rng = np.random.default_rng(0)
+    for pool_size in (50, 100, 300, 500):
+        pool = rng.standard_normal((pool_size, 384)).astype(np.float32)
+        query = rng.standard_normal(384).astype(np.float32)
+        mmr_rerank(query, pool, k=4)
+
+        runs = 200
+        start = time.perf_counter()
+        for _ in range(runs):
+            mmr_rerank(query, pool, k=4)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+        print(f"pool={pool_size:4d} k=4 rerank={elapsed_ms:.3f} ms")
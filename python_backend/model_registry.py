@@ -0,0 +1,187 @@
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Tuple
+
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096"))
+# Key-term extraction only reads noun_chunks, which need the tagger and
+# parser; the remaining spaCy components are not loaded at all
+SPACY_EXCLUDE = tuple(name for name in os.getenv("SPACY_EXCLUDE", "ner,lemmatizer").split(",") if name)
+
+class MissingModelError(Exception):
+    """A model or data package has not been provisioned on this machine."""
+    pass
+
+def _rss_bytes() -> int:
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _model_bytes(model: Any) -> int:
+    """Exact parameter size for PyTorch modules, 0 when it cannot be measured directly."""
+    parameters = getattr(model, "parameters", None)
+    buffers = getattr(model, "buffers", None)
+    if callable(parameters) and callable(buffers):
+        try:
+            return sum(t.numel() * t.element_size() for t in list(parameters()) + list(buffers()))
+        except Exception:
+            return 0
+    return 0
+
+class ModelRegistry:
+    """
+    Lazily loads models, keeps them warm and evicts the least recently used
+    ones when the total resident size would exceed the memory budget.
+
+    Models are keyed by name plus loader arguments, e.g. ("asr", "whisper", "base").
+    """
+
+    def __init__(self, budget_mb: float = MODEL_MEMORY_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._loaders: Dict[str, Tuple[Callable[..., Any], bool]] = {}
+        self._models: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._stats: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Tuple, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[..., Any], pinned: bool = False):
+        """
+        Register a model loader.
+
+        Args:
+            name: Model name
+            loader: Callable that builds the model from the get() arguments
+            pinned: Never evict this model
+        """
+        self._loaders[name] = (loader, pinned)
+
+    def get(self, name: str, *args) -> Any:
+        """
+        Return a warm model instance, loading it on first use.
+
+        Args:
+            name: Registered model name
+            *args: Loader arguments, part of the cache key
+
+        Returns:
+            Model instance
+        """
+        key = (name,) + args
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._stats[key]["hits"] += 1
+                self._stats[key]["last_used"] = time.time()
+                return self._models[key]
+            if name not in self._loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available,
+        # but only once per key
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    return self.get(name, *args)
+
+            loader, pinned = self._loaders[name]
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = loader(*args)
+            load_seconds = time.perf_counter() - start
+            resident = _model_bytes(model) or max(0, _rss_bytes() - rss_before)
+
+            with self._lock:
+                stats = self._stats.setdefault(key, {"hits": 0, "loads": 0, "evictions": 0})
+                stats.update({
+                    "load_seconds": round(load_seconds, 3),
+                    "resident_bytes": resident,
+                    "pinned": pinned,
+                    "last_used": time.time()
+                })
+                stats["loads"] += 1
+                self._models[key] = model
+                self._evict(keep=key)
+
+            print(f"Loaded model {':'.join(map(str, key))} in {load_seconds:.2f}s ({resident / 1e6:.1f} MB)")
+            return model
+
+    def _resident_total(self) -> int:
+        return sum(self._stats[key]["resident_bytes"] for key in self._models)
+
+    def _evict(self, keep: Tuple):
+        for key in list(self._models):
+            if self._resident_total() <= self.budget_bytes:
+                break
+            if key == keep or self._stats[key]["pinned"]:
+                continue
+            del self._models[key]
+            self._stats[key]["evictions"] += 1
+            print(f"Evicted model {':'.join(map(str, key))} to stay within the memory budget")
+        gc.collect()
+
+    def evict(self, name: str, *args):
+        with self._lock:
+            key = (name,) + args
+            if self._models.pop(key, None) is not None:
+                self._stats[key]["evictions"] += 1
+        gc.collect()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self._resident_total(),
+                "models": {
+                    ":".join(map(str, key)): {**stats, "loaded": key in self._models}
+                    for key, stats in self._stats.items()
+                }
+            }
+
+def load_asr(backend: str, model_size: str = "base"):
+    from asr_backends import load_backend
+    return load_backend(backend, model_size)
+
+def load_deepface_emotion():
+    from deepface import DeepFace
+    try:
+        return DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    except TypeError:
+        # Older DeepFace releases take only the model name
+        return DeepFace.build_model("Emotion")
+
+def load_face_mesh():
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+def load_spacy(name: str = "en_core_web_sm"):
+    import spacy
+    try:
+        return spacy.load(name, exclude=list(SPACY_EXCLUDE))
+    except OSError as e:
+        raise MissingModelError(f"spaCy model '{name}' is not installed; run `python provision.py spacy`") from e
+
+def load_embedder(model_name: str = 'sentence-transformers/all-MiniLM-L6-v2'):
+    from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+registry = ModelRegistry()
+registry.register("asr", load_asr)
+registry.register("deepface_emotion", load_deepface_emotion)
+registry.register("face_mesh", load_face_mesh)
+registry.register("spacy", load_spacy)
+# Served from app.state for the process lifetime, so eviction would not free it
+registry.register("embedder", load_embedder, pinned=True)
+
+def get_model(name: str, *args) -> Any:
+    """Return a warm instance of a registered model from the process-wide registry."""
+    return registry.get(name, *args)
@@ -1,82 +1,45 @@
-import re
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from typing import Dict, List, Any, Tuple
-from collections import Counter
-import string
-import textstat
-import spacy
+import os
+import numpy as np
+from typing import Dict, List, Any, Union, Optional
+from model_registry import get_model
+from transcript_document import TranscriptDocument
+from term_matcher import TermMatches, get_term_matcher
 
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Domains listed in the report, highest score first
+DOMAIN_SCORE_LIMIT = int(os.getenv("DOMAIN_SCORE_LIMIT", "10"))
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import sys
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+# Batch analysis: transcripts per spaCy batch and parser processes
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "32"))
+SPACY_PROCESSES = int(os.getenv("SPACY_PROCESSES", "1"))
 
-# Technical domain keywords
-TECH_DOMAINS = {
-    "web_development": [
-        "html", "css", "javascript", "react", "angular", "vue", "dom", "api", 
-        "frontend", "backend", "responsive", "server", "client", "database", 
-        "framework", "component", "routing", "state", "props", "hooks", "redux"
-    ],
-    "data_science": [
-        "python", "pandas", "numpy", "matplotlib", "tensorflow", "keras", "sklearn",
-        "regression", "classification", "clustering", "neural network", "machine learning",
-        "deep learning", "data", "model", "training", "dataset", "feature", "accuracy"
-    ],
-    "cloud_computing": [
-        "aws", "azure", "gcp", "cloud", "serverless", "container", "docker", "kubernetes",
-        "lambda", "ec2", "s3", "microservice", "scaling", "deployment", "infrastructure"
-    ],
-    "cybersecurity": [
-        "encryption", "authentication", "authorization", "vulnerability", "exploit",
-        "firewall", "malware", "virus", "phishing", "hacking", "security", "threat",
-        "protection", "defense", "attack", "penetration", "testing"
-    ]
-}
-
-def analyze_transcript(transcript: str) -> Dict[str, Any]:
+def analyze_transcript(transcript: Union[str, TranscriptDocument], noun_phrases: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Analyze the transcript for various metrics related to technical communication.
     
     Args:
-        transcript: The text transcript of the presentation
+        transcript: The text transcript of the presentation, or a document
+            already tokenized for another analysis
+        noun_phrases: Noun chunks of the transcript, if already parsed
         
     Returns:
         Dictionary containing various analysis metrics
     """
-    # Preprocess text
-    clean_text = preprocess_text(transcript)
-    sentences = sent_tokenize(clean_text)
-    words = word_tokenize(clean_text)
+    # Tokenize once; every metric below reads the shared document
+    document = transcript if isinstance(transcript, TranscriptDocument) else TranscriptDocument(transcript)
     
     # Basic text stats
-    word_count = len(words)
-    sentence_count = len(sentences)
+    word_count = document.word_count
+    sentence_count = document.sentence_count
     avg_sentence_length = word_count / max(1, sentence_count)
     
     # Calculate complexity metrics
-    readability_score = textstat.flesch_reading_ease(clean_text)
-    complexity_score = calculate_complexity_score(clean_text)
+    readability = document.readability()
+    readability_score = readability["flesch_reading_ease"]
+    complexity_score = calculate_complexity_score(readability)
     
-    # Analyze technical content
-    domain_scores = analyze_technical_domains(clean_text)
+    # Analyze technical content; one scan counts the terms of every domain
+    matches = get_term_matcher().scan(document.words)
+    domain_scores = analyze_technical_domains(document, matches)
     detected_domain = max(domain_scores.items(), key=lambda x: x[1])[0]
     tech_term_score = min(10.0, domain_scores[detected_domain] * 10)
     
@@ -88,10 +51,10 @@ def analyze_transcript(transcript: str) -> Dict[str, Any]:
     )
     
     # Find key terms used
-    key_terms = extract_key_terms(clean_text, detected_domain)
+    key_terms = extract_key_terms(document, detected_domain, matches, noun_phrases)
     
     # Analysis of explanation structure
-    explanation_structure = analyze_explanation_structure(sentences)
+    explanation_structure = analyze_explanation_structure(document)
     
     return {
         "word_count": word_count,
@@ -107,22 +70,11 @@ def analyze_transcript(transcript: str) -> Dict[str, Any]:
         "explanation_structure": explanation_structure
     }
 
-def preprocess_text(text: str) -> str:
-    """Clean and normalize text."""
-    # Convert to lowercase
-    text = text.lower()
-    # Remove punctuation
-    text = re.sub(f'[{re.escape(string.punctuation)}]', ' ', text)
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def calculate_complexity_score(text: str) -> float:
+def calculate_complexity_score(readability: Dict[str, float]) -> float:
     """Calculate a complexity score based on various metrics."""
-    # Use textstat for various complexity metrics
-    gunning_fog = textstat.gunning_fog(text)
-    smog_index = textstat.smog_index(text)
-    coleman_liau = textstat.coleman_liau_index(text)
+    gunning_fog = readability["gunning_fog"]
+    smog_index = readability["smog_index"]
+    coleman_liau = readability["coleman_liau_index"]
     
     # Normalize to a 0-10 scale
     # Higher is more complex
@@ -131,29 +83,23 @@ def calculate_complexity_score(text: str) -> float:
     
     return normalized_score
 
-def analyze_technical_domains(text: str) -> Dict[str, float]:
+def analyze_technical_domains(document: TranscriptDocument, matches: Optional[TermMatches] = None) -> Dict[str, float]:
     """
     Analyze text for technical terms from different domains.
-    Returns normalized scores for each domain.
+    Returns normalized scores for the highest-scoring domains.
     """
-    word_set = set(text.lower().split())
-    stop_words = set(stopwords.words('english'))
-    word_set = word_set - stop_words
-    
-    domain_scores = {}
+    matcher = get_term_matcher()
+    if matches is None:
+        matches = matcher.scan(document.words)
     
-    for domain, keywords in TECH_DOMAINS.items():
-        # Count occurrences of domain keywords
-        domain_term_count = sum(1 for term in keywords if term in text.lower())
-        # Normalize by total words and keyword set size
-        domain_scores[domain] = domain_term_count / (len(keywords) + 1)
+    # Distinct domain keywords found, normalized by keyword set size
+    scores = matches.domain_terms / (matcher.domain_sizes + 1)
     
     # Normalize scores to sum to 1.0
-    total_score = sum(domain_scores.values()) + 0.0001  # Avoid division by zero
-    for domain in domain_scores:
-        domain_scores[domain] /= total_score
+    scores = scores / (scores.sum() + 0.0001)  # Avoid division by zero
     
-    return domain_scores
+    top = np.argsort(-scores, kind="stable")[:DOMAIN_SCORE_LIMIT]
+    return {matcher.domains[index]: float(scores[index]) for index in top}
 
 def calculate_clarity_score(readability: float, complexity: float, avg_sentence_length: float) -> float:
     """
@@ -182,51 +128,92 @@ def calculate_clarity_score(readability: float, complexity: float, avg_sentence_
     
     return clarity_score
 
-def extract_key_terms(text: str, domain: str) -> List[str]:
+def analyze_transcripts(
+    transcripts: List[str],
+    batch_size: int = SPACY_BATCH_SIZE,
+    n_process: int = SPACY_PROCESSES
+) -> List[Dict[str, Any]]:
+    """
+    Analyze many transcripts, parsing them together with nlp.pipe.
+    
+    Args:
+        transcripts: Text transcripts
+        batch_size: Transcripts per spaCy batch
+        n_process: Parser processes; more than one spreads parsing across cores
+        
+    Returns:
+        One analyze_transcript result per transcript, in order
+    """
+    documents = [TranscriptDocument(transcript) for transcript in transcripts]
+    nlp = get_model("spacy", "en_core_web_sm")
+    parsed = nlp.pipe((document.clean_text for document in documents), batch_size=batch_size, n_process=n_process)
+    
+    return [
+        analyze_transcript(document, noun_phrases=extract_noun_phrases(doc))
+        for document, doc in zip(documents, parsed)
+    ]
+
+def extract_noun_phrases(doc) -> List[str]:
+    """Lowercase noun chunks of a parsed spaCy document."""
+    return [chunk.text.lower() for chunk in doc.noun_chunks]
+
+def extract_key_terms(
+    document: TranscriptDocument,
+    domain: str,
+    matches: Optional[TermMatches] = None,
+    noun_phrases: Optional[List[str]] = None
+) -> List[str]:
     """
     Extract key technical terms used in the transcript.
     
     Args:
-        text: Preprocessed transcript text
+        document: Tokenized transcript
         domain: Detected technical domain
+        matches: Term matches of the document, if already scanned
+        noun_phrases: Noun chunks of the document, if already parsed
     
     Returns:
         List of key technical terms used
     """
+    matcher = get_term_matcher()
+    if matches is None:
+        matches = matcher.scan(document.words)
+    
     # Use domain-specific keywords if available
-    domain_terms = set(TECH_DOMAINS.get(domain, []))
+    domain_terms = set(matcher.domain_term_ids(domain).tolist())
     
     # Find terms in text
-    doc = nlp(text)
-    noun_phrases = [chunk.text.lower() for chunk in doc.noun_chunks]
+    if noun_phrases is None:
+        nlp = get_model("spacy", "en_core_web_sm")
+        noun_phrases = extract_noun_phrases(nlp(document.clean_text))
     
     # Extract technical terms
-    tech_terms = []
-    for term in domain_terms:
-        if term in text.lower():
-            tech_terms.append(term)
+    tech_terms = matches.found_terms(domain)
     
     # Add important noun phrases
-    for np in noun_phrases:
-        if len(np.split()) > 1 and np not in tech_terms:
-            for term in domain_terms:
-                if term in np:
-                    tech_terms.append(np)
-                    break
+    for phrase in noun_phrases:
+        words = phrase.split()
+        if len(words) > 1 and phrase not in tech_terms:
+            found, _ = matcher.find(words)
+            if domain_terms.intersection(found):
+                tech_terms.append(phrase)
     
     # Limit to top 10 terms
     return tech_terms[:10]
 
-def analyze_explanation_structure(sentences: List[str]) -> Dict[str, Any]:
+def analyze_explanation_structure(document: TranscriptDocument) -> Dict[str, Any]:
     """
     Analyze the structure of the explanation.
     
     Args:
-        sentences: List of sentences from the transcript
+        document: Tokenized transcript
     
     Returns:
         Dictionary with explanation structure metrics
     """
+    # Already lowercase and free of punctuation
+    sentences = document.clean_sentences
+
     intro_markers = ["introduce", "overview", "going to", "will be", "today", "talk about"]
     conclusion_markers = ["conclude", "summary", "in conclusion", "finally", "to sum up", "in the end"]
     transition_markers = ["next", "furthermore", "moreover", "additionally", "however", "therefore"]
@@ -236,13 +223,13 @@ def analyze_explanation_structure(sentences: List[str]) -> Dict[str, Any]:
     intro_section = sentences[:max(1, int(num_sentences * 0.2))]
     conclusion_section = sentences[max(0, int(num_sentences * 0.8)):]
     
-    has_intro = any(marker in ' '.join(intro_section).lower() for marker in intro_markers)
-    has_conclusion = any(marker in ' '.join(conclusion_section).lower() for marker in conclusion_markers)
+    has_intro = any(marker in ' '.join(intro_section) for marker in intro_markers)
+    has_conclusion = any(marker in ' '.join(conclusion_section) for marker in conclusion_markers)
     
     transition_count = sum(
         1 for sentence in sentences 
         for marker in transition_markers 
-        if marker in sentence.lower()
+        if marker in sentence
     )
     
     # Calculate structure quality
@@ -0,0 +1,151 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+PIPELINE_THREADS = int(os.getenv("PIPELINE_THREADS", "4"))
+PIPELINE_PROCESSES = int(os.getenv("PIPELINE_PROCESSES", "1"))
+
+class Stage:
+    """
+    One node of an analysis pipeline.
+
+    Args:
+        name: Name of the value the stage produces
+        func: Callable invoked with the values of its dependencies, in order
+        deps: Names of the inputs or stages it depends on
+        executor: "thread" for I/O and GIL-releasing work, "process" for
+            CPU-bound Python work; process stages need a picklable top-level func
+        on_error: Optional callable turning the stage's exception into its result
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Sequence[str] = (),
+        executor: str = "thread",
+        on_error: Optional[Callable[[Exception], Any]] = None
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}' for stage '{name}'")
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.executor = executor
+        self.on_error = on_error
+
+class PipelineRunner:
+    """
+    Runs a DAG of stages, starting each as soon as its dependencies finish.
+
+    Independent branches run concurrently, so end-to-end latency approaches
+    the longest dependency chain rather than the sum of all stages. The
+    executors are kept for the runner's lifetime, so process stages reuse
+    warm worker processes across runs.
+    """
+
+    def __init__(self, stages: List[Stage], threads: int = PIPELINE_THREADS, processes: int = PIPELINE_PROCESSES):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+
+        self.threads = threads
+        self.processes = processes
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self, kind: str):
+        if kind == "process":
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="pipeline")
+        return self._thread_pool
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute every stage.
+
+        Args:
+            inputs: Initial values stages can depend on
+
+        Returns:
+            Dictionary with stage results under "results" and timing data under "timings"
+        """
+        for stage in self.stages.values():
+            missing = [d for d in stage.deps if d not in self.stages and d not in inputs]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown {missing}")
+
+        results = dict(inputs)
+        pending = dict(self.stages)
+        running = {}
+        stage_timings = {}
+        start = time.perf_counter()
+
+        while pending or running:
+            # Launch every stage whose dependencies are all available
+            ready = [name for name, stage in pending.items() if all(d in results for d in stage.deps)]
+            for name in ready:
+                stage = pending.pop(name)
+                args = [results[d] for d in stage.deps]
+                future = self._executor(stage.executor).submit(stage.func, *args)
+                running[future] = (stage, time.perf_counter())
+
+            if not running:
+                raise RuntimeError(f"Pipeline cannot make progress, blocked stages: {sorted(pending)}")
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, started = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except Exception as e:
+                    if stage.on_error is None:
+                        raise
+                    results[stage.name] = stage.on_error(e)
+
+                stage_timings[stage.name] = {
+                    "start": round(started - start, 3),
+                    "end": round(time.perf_counter() - start, 3),
+                    "executor": stage.executor
+                }
+
+        wall_time = time.perf_counter() - start
+        return {
+            "results": results,
+            "timings": {
+                "wall_time": round(wall_time, 3),
+                "stages": stage_timings,
+                "critical_path": self.critical_path(stage_timings)
+            }
+        }
+
+    def critical_path(self, stage_timings: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Walk back from the last stage to finish through its latest-finishing dependency."""
+        if not stage_timings:
+            return []
+
+        path = [max(stage_timings, key=lambda name: stage_timings[name]["end"])]
+        while True:
+            deps = [d for d in self.stages[path[-1]].deps if d in stage_timings]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda name: stage_timings[name]["end"]))
+
+        return list(reversed(path))
+
+    def shutdown(self):
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown()
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
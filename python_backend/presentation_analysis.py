@@ -0,0 +1,222 @@
+from typing import Dict, Any, Optional
+from pipeline import Stage, PipelineRunner
+from video_utils import MediaContext, load_media
+from nlp_analysis import analyze_transcript
+from emotion_detection import analyze_facial_expressions
+from voice_analysis import transcribe_audio, analyze_acoustics, combine_voice_results, voice_analysis_fallback
+from transcript_document import TranscriptDocument
+from result_cache import cached, is_cached, is_fallback, get_cache, report_key, content_digest
+
+def open_media(video_path: str, pcm_path: Optional[str], content_hash: Optional[str]) -> MediaContext:
+    """Open the upload, decoding its audio up front unless both voice branches are cached."""
+    if is_cached("transcription", content_hash) and is_cached("acoustics", content_hash):
+        # Still decodes lazily if an entry is evicted before its stage reads it
+        return MediaContext(video_path, pcm_path=pcm_path)
+    return load_media(video_path, pcm_path)
+
+def run_facial_expressions(video_path: str, content_hash: Optional[str]) -> Dict[str, Any]:
+    return cached("emotion_results", lambda: analyze_facial_expressions(video_path), content_hash)
+
+def run_transcription(media: MediaContext, content_hash: Optional[str]) -> Dict[str, Any]:
+    return cached("transcription", lambda: transcribe_audio(media.audio), content_hash)
+
+def run_acoustics(media: MediaContext, content_hash: Optional[str]) -> Dict[str, Any]:
+    return cached("acoustics", lambda: analyze_acoustics(media), content_hash)
+
+def run_nlp(document: TranscriptDocument) -> Dict[str, Any]:
+    # Keyed by the transcript, so the same words are analyzed once whatever video they came from
+    return cached("nlp_results", lambda: analyze_transcript(document), content_digest(document.text.encode("utf-8")))
+
+def build_document(transcription) -> TranscriptDocument:
+    """Tokenize the transcript once for both the voice and NLP analyses."""
+    if isinstance(transcription, Exception):
+        return TranscriptDocument("")
+    return TranscriptDocument(transcription["transcript"])
+
+def build_voice_results(transcription, acoustics, document) -> Dict[str, Any]:
+    """Join the ASR and acoustic branches, falling back to defaults if either failed."""
+    for branch in (transcription, acoustics):
+        if isinstance(branch, Exception):
+            print(f"Voice analysis error: {str(branch)}")
+            return voice_analysis_fallback(branch)
+    return combine_voice_results(transcription, acoustics, document)
+
+def keep_error(error: Exception) -> Exception:
+    return error
+
+def build_pipeline() -> PipelineRunner:
+    """
+    Analysis DAG: face analysis and audio decoding start together, ASR and
+    acoustic metrics run concurrently on the shared decoded audio, and the
+    transcript is tokenized once for the voice report and NLP.
+
+    Given the upload's content hash, the transcription, acoustics, face and
+    NLP stages reuse cached outputs, so only stages whose settings changed
+    run again and the scores are always rebuilt from current weights.
+    """
+    return PipelineRunner([
+        # The audio track is demuxed once and shared in memory by both voice branches
+        Stage("media", open_media, deps=("video_path", "pcm_path", "content_hash")),
+        # Facial analysis is CPU-bound Python per frame, so it gets its own process
+        Stage("emotion_results", run_facial_expressions, deps=("video_path", "content_hash"), executor="process"),
+        Stage("transcription", run_transcription, deps=("media", "content_hash"), on_error=keep_error),
+        Stage("acoustics", run_acoustics, deps=("media", "content_hash"), on_error=keep_error),
+        Stage("document", build_document, deps=("transcription",)),
+        Stage("voice_results", build_voice_results, deps=("transcription", "acoustics", "document")),
+        Stage("nlp_results", run_nlp, deps=("document",))
+    ])
+
+_pipeline: Optional[PipelineRunner] = None
+
+def get_pipeline() -> PipelineRunner:
+    # Reused across jobs so the face-analysis process stays warm
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = build_pipeline()
+    return _pipeline
+
+def analyze_presentation(
+    video_path: str,
+    work_dir: str,
+    pcm_path: Optional[str] = None,
+    content_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run the full presentation analysis on a video file.
+    
+    Args:
+        video_path: Path to the video file
+        work_dir: Directory for intermediate files
+        pcm_path: Audio already demuxed during upload, if any
+        content_hash: SHA-256 of the uploaded bytes; enables the result cache
+        
+    Returns:
+        Dictionary with scores, recommendations and per-analyzer details
+    """
+    run = get_pipeline().run({
+        "video_path": video_path,
+        "work_dir": work_dir,
+        "pcm_path": pcm_path,
+        "content_hash": content_hash
+    })
+    results = run["results"]
+    
+    nlp_results = results["nlp_results"]
+    emotion_results = results["emotion_results"]
+    voice_results = results["voice_results"]
+    
+    # Calculate final scores
+    final_scores = calculate_final_scores(nlp_results, emotion_results, voice_results)
+    
+    # Generate recommendations
+    recommendations = generate_recommendations(final_scores, nlp_results, emotion_results, voice_results)
+    
+    # Compile results
+    report = {
+        "scores": final_scores,
+        "recommendations": recommendations,
+        "details": {
+            "nlp_analysis": nlp_results,
+            "emotion_analysis": emotion_results,
+            "voice_analysis": voice_results
+        },
+        "timings": run["timings"]
+    }
+
+    # A report built on any analyzer's fallback is not kept, so a retry runs it again
+    cache = get_cache()
+    degraded = any(is_fallback(part) for part in (nlp_results, emotion_results, voice_results))
+    if cache is not None and content_hash is not None and not degraded:
+        cache.put(report_key(content_hash), report)
+    return report
+
+def calculate_final_scores(nlp_results, emotion_results, voice_results):
+    """Calculate final scores based on all analyses."""
+    return {
+        "content_clarity": round((
+            nlp_results["clarity_score"] * 0.7 + 
+            voice_results["speech_coherence"] * 0.3
+        ), 1),
+        "technical_vocabulary": round(nlp_results["tech_term_score"], 1),
+        "delivery": round((
+            voice_results["fluency_score"] * 0.6 + 
+            voice_results["pace_score"] * 0.4
+        ), 1),
+        "confidence": round((
+            emotion_results["confidence_score"] * 0.5 + 
+            voice_results["voice_steadiness"] * 0.5
+        ), 1),
+        "engagement": round((
+            emotion_results["engagement_score"] * 0.7 + 
+            voice_results["pitch_variation"] * 0.3
+        ), 1),
+        "overall": round((
+            nlp_results["clarity_score"] * 0.25 +
+            nlp_results["tech_term_score"] * 0.15 +
+            voice_results["fluency_score"] * 0.2 +
+            emotion_results["confidence_score"] * 0.2 +
+            emotion_results["engagement_score"] * 0.2
+        ), 1)
+    }
+
+def generate_recommendations(scores, nlp_results, emotion_results, voice_results):
+    """Generate personalized recommendations based on lowest scores."""
+    recommendations = []
+    
+    # Check content clarity
+    if scores["content_clarity"] < 7.0:
+        if nlp_results["clarity_score"] < 7.0:
+            recommendations.append(
+                "Consider simplifying your explanations and using more concrete examples to illustrate technical concepts."
+            )
+        if voice_results["speech_coherence"] < 7.0:
+            recommendations.append(
+                "Try to organize your thoughts more clearly before speaking. Using transition phrases can help connect ideas."
+            )
+    
+    # Check technical vocabulary
+    if scores["technical_vocabulary"] < 7.0:
+        recommendations.append(
+            f"Your use of technical terms could be improved. Consider incorporating more domain-specific vocabulary appropriate for {nlp_results['detected_domain']}."
+        )
+    
+    # Check delivery
+    if scores["delivery"] < 7.0:
+        if voice_results["fluency_score"] < 7.0:
+            recommendations.append(
+                "Practice speaking more fluently by reducing filler words like 'um' and 'uh'. Try recording yourself and identifying areas for improvement."
+            )
+        if voice_results["pace_score"] < 7.0:
+            recommendations.append(
+                f"Your speaking pace of {voice_results['words_per_minute']} words per minute could be improved. Aim for a comfortable 120-150 words per minute."
+            )
+    
+    # Check confidence
+    if scores["confidence"] < 7.0:
+        if emotion_results["confidence_score"] < 7.0:
+            recommendations.append(
+                "Try to maintain more consistent eye contact with the camera and improve your posture to project confidence."
+            )
+        if voice_results["voice_steadiness"] < 7.0:
+            recommendations.append(
+                "Your voice shows signs of nervousness. Practice breathing techniques to maintain a steadier tone."
+            )
+    
+    # Check engagement
+    if scores["engagement"] < 7.0:
+        if emotion_results["engagement_score"] < 7.0:
+            recommendations.append(
+                "Consider incorporating more facial expressions and gestures to appear more engaged with your content."
+            )
+        if voice_results["pitch_variation"] < 7.0:
+            recommendations.append(
+                "Your voice tone is somewhat monotonous. Try varying your pitch and emphasis to make key points stand out."
+            )
+    
+    # If doing well overall
+    if not recommendations and scores["overall"] >= 8.0:
+        recommendations.append(
+            "Great job! Your presentation skills are strong. To further improve, consider focusing on advanced techniques like storytelling and audience interaction."
+        )
+    
+    return recommendations
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import orjson
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+current_dir = os.path.dirname(__file__)
+PROFILE_DIR = os.path.join(current_dir, 'db', 'profiles')
+
+COLLECTIONS = {
+    "students": (os.path.join(current_dir, 'db', 'students_data'), os.path.join(current_dir, 'student.json')),
+    "mentors": (os.path.join(current_dir, 'db', 'mentors_data'), os.path.join(current_dir, 'mentors.json'))
+}
+
+def profile_id(profile: Dict[str, Any]) -> Optional[str]:
+    """Return the MongoDB ObjectId of a profile as a plain string."""
+    _id = profile.get("_id")
+    if isinstance(_id, dict):
+        _id = _id.get("$oid")
+    return str(_id) if _id else None
+
+class ProfileStore:
+    """
+    Full profiles keyed by profile ID, stored pre-serialized as orjson bytes.
+
+    Responses are assembled from the stored bytes directly, so the request
+    path never decodes JSON for retrieved profiles.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS profiles (id TEXT PRIMARY KEY, body BLOB NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tombstones (chunk_id TEXT PRIMARY KEY, profile_id TEXT, created_at REAL)"
+        )
+        self._conn.commit()
+
+    def put_many(self, profiles: Iterable[Dict[str, Any]]) -> int:
+        rows = [(profile_id(p), orjson.dumps(p)) for p in profiles]
+        rows = [row for row in rows if row[0]]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO profiles (id, body) VALUES (?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def get_many(self, ids: List[str]) -> Dict[str, bytes]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id, body FROM profiles WHERE id IN ({placeholders})", ids).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        body = self.get_many([id]).get(id)
+        return orjson.loads(body) if body is not None else None
+
+    def delete(self, id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM profiles WHERE id = ?", (id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def items(self) -> List[Tuple[str, bytes]]:
+        with self._lock:
+            return self._conn.execute("SELECT id, body FROM profiles").fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def add_tombstones(self, chunk_ids: List[str], profile_id: Optional[str] = None):
+        """Mark index chunks as stale so searches skip them until compaction removes them."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tombstones (chunk_id, profile_id, created_at) VALUES (?, ?, ?)",
+                [(chunk_id, profile_id, now) for chunk_id in chunk_ids]
+            )
+            self._conn.commit()
+
+    def tombstones(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT chunk_id FROM tombstones")}
+
+    def clear_tombstones(self, chunk_ids: Iterable[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM tombstones WHERE chunk_id = ?", [(chunk_id,) for chunk_id in chunk_ids])
+            self._conn.commit()
+
+_stores: Dict[str, ProfileStore] = {}
+_stores_lock = threading.Lock()
+
+def get_profile_store(name: str) -> ProfileStore:
+    """Return the shared profile store for a collection ("students" or "mentors")."""
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = ProfileStore(os.path.join(PROFILE_DIR, f"{name}.sqlite3"))
+        return _stores[name]
+
+def load_profile_documents(file_path: str) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    Load profiles from a JSON array file and split them into indexable chunks.
+
+    Every chunk carries the profile_id of the profile it came from, so
+    retrieval can resolve hits to whole profiles even across chunk boundaries.
+
+    Args:
+        file_path: Path to a JSON file containing a list of profiles
+
+    Returns:
+        Tuple of (document chunks, parsed profiles)
+    """
+    from langchain_community.document_loaders import JSONLoader
+    from langchain_text_splitters import CharacterTextSplitter
+
+    loader = JSONLoader(file_path=file_path, jq_schema='.[]', text_content=False)
+    data = loader.load()
+
+    profiles = []
+    for doc in data:
+        profile = json.loads(doc.page_content)
+        doc.metadata["profile_id"] = profile_id(profile) or ""
+        profiles.append(profile)
+
+    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    docs = text_splitter.split_documents(data)
+
+    return docs, profiles
+
+def split_profiles(profiles: List[Dict[str, Any]], source: str = "api") -> List[Any]:
+    """
+    Turn parsed profiles into indexable chunks tagged with their profile_id.
+
+    Produces the same page content as JSONLoader with text_content=False.
+
+    Args:
+        profiles: Parsed profiles
+        source: Value for the chunks' source metadata
+
+    Returns:
+        Document chunks
+    """
+    from langchain_core.documents import Document
+    from langchain_text_splitters import CharacterTextSplitter
+
+    data = [
+        Document(
+            page_content=json.dumps(profile),
+            metadata={"source": source, "seq_num": i + 1, "profile_id": profile_id(profile) or ""}
+        )
+        for i, profile in enumerate(profiles)
+    ]
+
+    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    return text_splitter.split_documents(data)
+
+def unique_profile_hits(
+    documents: List[str],
+    metadatas: List[Optional[Dict[str, Any]]],
+    ids: Optional[List[str]] = None,
+    tombstones: Optional[set] = None
+) -> List[Dict[str, Any]]:
+    """
+    Collapse ranked chunk hits to one hit per profile, keeping the best-ranked chunk.
+
+    Args:
+        documents: Chunk text per hit, best first
+        metadatas: Chunk metadata per hit
+        ids: Chunk ID per hit, needed to filter tombstones
+        tombstones: Chunk IDs to skip
+
+    Returns:
+        List of hits with index, profile_id and document
+    """
+    ids = ids or [None] * len(documents)
+    tombstones = tombstones or set()
+    seen = set()
+    hits = []
+    for index, (chunk_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+        if chunk_id in tombstones:
+            continue
+        pid = (metadata or {}).get("profile_id") or None
+        if pid is not None:
+            if pid in seen:
+                continue
+            seen.add(pid)
+        hits.append({"index": index, "profile_id": pid, "document": document})
+    return hits
+
+def hydrate_profiles(store: ProfileStore, hits: List[Dict[str, Any]]) -> List[bytes]:
+    """
+    Resolve hits to serialized profiles.
+
+    Hits without a stored profile fall back to their chunk text, which only
+    works when the chunk holds a complete profile (stores indexed before the
+    profile store existed).
+
+    Args:
+        store: Profile store for the collection
+        hits: Hits from unique_profile_hits
+
+    Returns:
+        Serialized JSON profiles in hit order
+    """
+    stored = store.get_many([hit["profile_id"] for hit in hits if hit["profile_id"]])
+
+    profiles = []
+    for hit in hits:
+        body = stored.get(hit["profile_id"])
+        if body is None:
+            try:
+                orjson.loads(hit["document"])
+                body = hit["document"].encode("utf-8")
+            except orjson.JSONDecodeError as json_err:
+                print(f"JSON decoding error: {json_err} - Document content: {hit['document'][:100]}...")
+                continue
+        profiles.append(body)
+    return profiles
+
+def render_profiles_response(key: str, profiles: List[bytes], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """Assemble a JSON response body from pre-serialized profiles without re-encoding them."""
+    body = b'{"' + key.encode("utf-8") + b'":[' + b",".join(profiles) + b"]"
+    for name, value in (extra or {}).items():
+        body += b',"' + name.encode("utf-8") + b'":' + orjson.dumps(value)
+    return body + b"}"
+
+def backfill(name: str) -> Dict[str, int]:
+    """
+    Populate a profile store from its source file and tag existing chunks with profile IDs.
+
+    Chunks indexed before profile IDs were recorded have no profile_id, so
+    updates and deletes could not find them. Safe to run repeatedly: stored
+    profiles are never overwritten by the source file, and already tagged
+    chunks are left alone.
+
+    Args:
+        name: Collection name ("students" or "mentors")
+
+    Returns:
+        Dictionary with backfill counts
+    """
+    import chromadb
+
+    persist_directory, file_path = COLLECTIONS[name]
+    store = get_profile_store(name)
+
+    profiles = []
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as f:
+            profiles = json.load(f)
+    existing = store.get_many([pid for pid in map(profile_id, profiles) if pid])
+    stored = store.put_many([p for p in profiles if profile_id(p) not in existing])
+
+    if not os.path.exists(persist_directory):
+        return {"stored": stored, "tagged": 0, "untagged": 0}
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection("langchain")
+    data = collection.get(include=["metadatas"])
+    missing = [chunk_id for chunk_id, metadata in zip(data["ids"], data["metadatas"]) if not (metadata or {}).get("profile_id")]
+    if not missing:
+        return {"stored": stored, "tagged": 0, "untagged": 0}
+
+    # Match against the source file and every stored profile, including ones added through the API
+    known = [(profile_id(p), p) for p in profiles] + [(pid, orjson.loads(body)) for pid, body in store.items()]
+    serialized = [(pid, json.dumps(profile)) for pid, profile in known if pid]
+    data = collection.get(ids=missing, include=["documents", "metadatas"])
+
+    ids, metadatas, untagged = [], [], 0
+    for chunk_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+        metadata = dict(metadata or {})
+        try:
+            parsed = json.loads(document)
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
+            pid = profile_id(parsed)
+        else:
+            # A partial chunk: find the profile whose serialized form contains it
+            pid = next((p for p, text in serialized if document in text), None)
+        if not pid:
+            untagged += 1
+            continue
+        metadata["profile_id"] = pid
+        ids.append(chunk_id)
+        metadatas.append(metadata)
+
+    if ids:
+        collection.update(ids=ids, metadatas=metadatas)
+
+    return {"stored": stored, "tagged": len(ids), "untagged": untagged}
+
+if __name__ == "__main__":
+    for name in COLLECTIONS:
+        stats = backfill(name)
+        print(f"{name}: {stats['stored']} profiles stored, {stats['tagged']} chunks tagged, {stats['untagged']} untagged")
@@ -0,0 +1,74 @@
+import sys
+import argparse
+import subprocess
+from typing import Callable, Dict
+
+# Punkt ships as pickles in older NLTK releases and as punkt_tab from 3.8.2 on
+NLTK_RESOURCES = [("tokenizers/punkt", "punkt"), ("tokenizers/punkt_tab", "punkt_tab")]
+SPACY_MODEL = "en_core_web_sm"
+
+def provision_nltk(args: argparse.Namespace):
+    import nltk
+
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+            print(f"nltk: {package} already installed")
+        except LookupError:
+            print(f"nltk: downloading {package}")
+            nltk.download(package, quiet=True)
+
+def provision_spacy(args: argparse.Namespace):
+    import spacy
+
+    if spacy.util.is_package(args.spacy_model):
+        print(f"spacy: {args.spacy_model} already installed")
+        return
+    print(f"spacy: downloading {args.spacy_model}")
+    subprocess.check_call([sys.executable, "-m", "spacy", "download", args.spacy_model])
+
+def provision_whisper(args: argparse.Namespace):
+    import whisper
+
+    # load_model fetches the checkpoint into the local cache on first use
+    print(f"whisper: fetching the {args.whisper_model} model")
+    whisper.load_model(args.whisper_model, device="cpu")
+
+def provision_deepface(args: argparse.Namespace):
+    from model_registry import load_deepface_emotion
+
+    print("deepface: fetching the emotion model weights")
+    load_deepface_emotion()
+
+PROVISION_STEPS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    "nltk": provision_nltk,
+    "spacy": provision_spacy,
+    "whisper": provision_whisper,
+    "deepface": provision_deepface
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Download the data and model files the analyzers load, ahead of serving. "
+                    "Nothing is downloaded at import or request time."
+    )
+    parser.add_argument("steps", nargs="*",
+                        help=f"What to provision, any of {', '.join(sorted(PROVISION_STEPS))} (default: everything)")
+    parser.add_argument("--spacy-model", default=SPACY_MODEL)
+    parser.add_argument("--whisper-model", default="base")
+    args = parser.parse_args()
+
+    unknown = set(args.steps) - set(PROVISION_STEPS)
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+
+    failed = []
+    for step in args.steps or sorted(PROVISION_STEPS):
+        try:
+            PROVISION_STEPS[step](args)
+        except Exception as e:
+            print(f"{step}: failed: {str(e)}")
+            failed.append(step)
+
+    if failed:
+        raise SystemExit(f"Provisioning failed for: {', '.join(failed)}")
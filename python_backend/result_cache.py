@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Any, Callable, Optional
+from term_matcher import TECH_TAXONOMY_PATH
+
+current_dir = os.path.dirname(__file__)
+
+ANALYSIS_CACHE = os.getenv("ANALYSIS_CACHE", "1") == "1"
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", os.path.join(current_dir, 'cache', 'analysis'))
+ANALYSIS_CACHE_MAX_BYTES = int(float(os.getenv("ANALYSIS_CACHE_MB", "1024")) * 1024 * 1024)
+
+# Bump a stage's version when its algorithm or output format changes, so only
+# that stage's entries (and the full reports built from them) are recomputed
+STAGE_VERSIONS = {
+    "transcription": 1,
+    "acoustics": 1,
+    "emotion_results": 1,
+    "nlp_results": 1,
+    # Voice report, scores and recommendations, rebuilt from the cached stages;
+    # fingerprinted by its source files below, so it needs no manual bump
+    "report": 1
+}
+
+# Environment settings that change a stage's output
+STAGE_SETTINGS = {
+    "transcription": [
+        "ASR_BACKEND", "ASR_MODEL_DIR", "ASR_COMPUTE_TYPE", "ASR_VAD", "ASR_WORD_TIMESTAMPS",
+        "ASR_LONGFORM_SECONDS", "ASR_WINDOW_SECONDS", "VAD_THRESHOLD", "VAD_MIN_SILENCE", "VAD_PADDING"
+    ],
+    "acoustics": ["VAD_THRESHOLD", "VAD_MIN_SILENCE", "VAD_PADDING"],
+    "emotion_results": [
+        "FACE_SAMPLE_FPS", "FACE_FRAME_BUDGET", "ANALYSIS_WIDTH", "ADAPTIVE_EMOTION_SAMPLING",
+        "FRAME_CHANGE_THRESHOLD", "LANDMARK_CHANGE_THRESHOLD", "EMOTION_MAX_INTERVAL"
+    ],
+    "nlp_results": ["TECH_TAXONOMY_PATH", "DOMAIN_SCORE_LIMIT", "SPACY_EXCLUDE"],
+    "report": ["PACE_WINDOW_SECONDS"]
+}
+
+# Files whose content changes a stage's output. The report is cheap to rebuild,
+# so its code is fingerprinted: editing a scoring weight or a recommendation
+# rule invalidates cached reports but not the stage outputs they reuse
+STAGE_FILES = {
+    "nlp_results": [TECH_TAXONOMY_PATH],
+    "report": [
+        os.path.join(current_dir, 'presentation_analysis.py'),
+        os.path.join(current_dir, 'voice_analysis.py'),
+        os.path.join(current_dir, 'speech_timeline.py')
+    ]
+}
+
+# Temporary files older than this were left behind by a crashed writer
+STALE_TEMP_SECONDS = 3600
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return content_digest(f.read())
+    except OSError:
+        return None
+
+def is_fallback(value: Any) -> bool:
+    """Analyzers return their defaults with an "error" key when they could not run."""
+    return isinstance(value, dict) and "error" in value
+
+def stage_fingerprint(stage: str) -> Dict[str, Any]:
+    """Version, settings and data files that determine a stage's output."""
+    return {
+        "version": STAGE_VERSIONS[stage],
+        "settings": {name: os.getenv(name) for name in STAGE_SETTINGS.get(stage, ())},
+        "files": {path: file_digest(path) for path in STAGE_FILES.get(stage, ())}
+    }
+
+def cache_key(stage: str, *parts: Any) -> str:
+    """
+    Key of a stage's output for one input.
+
+    Args:
+        stage: Stage name
+        parts: JSON-serializable values identifying the input, e.g. the
+            content hash of the upload
+
+    Returns:
+        Hex digest over the stage's fingerprint and the input
+    """
+    payload = json.dumps([stage, stage_fingerprint(stage), *parts], sort_keys=True)
+    return content_digest(payload.encode("utf-8"))
+
+def report_key(content_hash: str) -> str:
+    """Key of the complete analysis of an upload, covering every stage's configuration."""
+    stages = {stage: stage_fingerprint(stage) for stage in STAGE_VERSIONS if stage != "report"}
+    return cache_key("report", content_hash, stages)
+
+class DiskCache:
+    """
+    Pickled values in a local directory, bounded in total size.
+
+    Entries are written to a temporary file and renamed into place, so the
+    API process and the analysis workers can share the directory without
+    ever reading a partial entry. Reads refresh an entry's modification time,
+    and once the directory outgrows its budget the least recently used
+    entries are deleted.
+    """
+
+    def __init__(self, directory: str = ANALYSIS_CACHE_DIR, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as e:
+            # Truncated, or written by an incompatible version of a dependency
+            print(f"Discarding unreadable cache entry {key}: {str(e)}")
+            remove_file(path)
+            self._count("misses")
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return value
+
+    def put(self, key: str, value: Any):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            # A cache that cannot be written must not fail the analysis
+            print(f"Could not write cache entry {key}: {str(e)}")
+            remove_file(temp_path)
+            return
+
+        self._count("writes")
+        self._evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return list(entries)
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".pkl"):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith(".tmp") and now - stat.st_mtime > STALE_TEMP_SECONDS:
+                remove_file(entry.path)
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        # Trim below the budget so the next writes do not each trigger an eviction
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if remove_file(path):
+                total -= size
+                evicted += 1
+        self._count("evictions", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = []
+        for entry in self._entries():
+            if entry.name.endswith(".pkl"):
+                try:
+                    sizes.append(entry.stat().st_size)
+                except FileNotFoundError:
+                    continue
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "entries": len(sizes),
+            "size_mb": round(sum(sizes) / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+            **counts
+        }
+
+def remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[DiskCache]:
+    """The process's handle on the shared cache directory, or None if caching is disabled."""
+    global _cache
+    if not ANALYSIS_CACHE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache()
+        return _cache
+
+def is_cached(stage: str, *key_parts: Any) -> bool:
+    cache = get_cache()
+    if cache is None or any(part is None for part in key_parts):
+        return False
+    return cache.contains(cache_key(stage, *key_parts))
+
+def cached(stage: str, compute: Callable[[], Any], *key_parts: Any) -> Any:
+    """
+    Return a stage's cached output, computing and storing it on a miss.
+
+    Args:
+        stage: Stage name, selecting its version and settings
+        compute: Produces the output on a miss; if it raises or returns a
+            fallback, nothing is stored
+        key_parts: Identify the stage's input; caching is skipped if any is None
+
+    Returns:
+        The stage's output
+    """
+    cache = get_cache()
+    if cache is None or any(part is None for part in key_parts):
+        return compute()
+
+    key = cache_key(stage, *key_parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if not is_fallback(value):
+            cache.put(key, value)
+    return value
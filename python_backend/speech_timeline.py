@@ -0,0 +1,235 @@
+import os
+import string
+import numpy as np
+from typing import Dict, List, Any, Tuple
+from transcript_document import syllable_counts
+
+# Width of the bins used for speaking rate over time
+PACE_WINDOW_SECONDS = float(os.getenv("PACE_WINDOW_SECONDS", "10"))
+
+# Common filler words and sounds
+FILLER_WORDS = [
+    "um", "uh", "er", "ah", "like", "you know", "so", "actually",
+    "basically", "literally", "kind of", "sort of", "i mean"
+]
+FILLER_PHRASES = [tuple(filler.split()) for filler in FILLER_WORDS]
+
+PUNCTUATION = string.punctuation + "“”‘’…—–"
+CLOSING_PUNCTUATION = "\"')]”’"
+
+def match_fillers(words: np.ndarray) -> np.ndarray:
+    """
+    Find filler words and phrases in a word sequence.
+
+    Each phrase is matched across the whole sequence with shifted array
+    comparisons. Longer phrases are matched first and shorter ones may not
+    overlap them, so "you know" is never also counted as two words.
+
+    Args:
+        words: Lowercase words without surrounding punctuation
+
+    Returns:
+        Index into FILLER_WORDS at the first word of every match, -1 elsewhere
+    """
+    n = len(words)
+    matches = np.full(n, -1, dtype=np.int64)
+    covered = np.zeros(n, dtype=bool)
+
+    for index in sorted(range(len(FILLER_PHRASES)), key=lambda i: -len(FILLER_PHRASES[i])):
+        phrase = FILLER_PHRASES[index]
+        size = len(phrase)
+        if n < size:
+            continue
+
+        hit = np.ones(n - size + 1, dtype=bool)
+        for offset, token in enumerate(phrase):
+            hit &= (words[offset:n - size + 1 + offset] == token) & ~covered[offset:n - size + 1 + offset]
+
+        positions = np.flatnonzero(hit)
+        matches[positions] = index
+        for offset in range(size):
+            covered[positions + offset] = True
+
+    return matches
+
+class SpeechTimeline:
+    """
+    The words of a transcript placed on the recording's timeline.
+
+    Words are held as parallel arrays (text, start, end, sentence end,
+    syllables, filler match) so rates, pauses and fillers are computed with
+    array operations rather than by rescanning the transcript text.
+    """
+
+    def __init__(self, raw_words: List[str], starts: np.ndarray, ends: np.ndarray):
+        raw = np.char.strip(np.asarray(raw_words, dtype=str))
+        words = np.char.strip(np.char.lower(raw), PUNCTUATION)
+        trailing = np.char.rstrip(raw, CLOSING_PUNCTUATION)
+        sentence_end = np.char.endswith(trailing, ".") | np.char.endswith(trailing, "!") | np.char.endswith(trailing, "?")
+
+        # Tokens that are only punctuation are dropped, but a sentence end
+        # they carry moves to the word before them
+        keep = np.char.str_len(words) > 0
+        previous_kept = np.cumsum(keep) - 1
+        moved = ~keep & sentence_end & (previous_kept >= 0)
+
+        self.words = words[keep]
+        self.starts = np.asarray(starts, dtype=np.float64)[keep]
+        self.ends = np.asarray(ends, dtype=np.float64)[keep]
+        self.sentence_end = sentence_end[keep]
+        self.sentence_end[previous_kept[moved]] = True
+
+        self.syllables = syllable_counts(self.words)
+        self.fillers = match_fillers(self.words)
+
+    @classmethod
+    def from_transcription(cls, transcription: Dict[str, Any], duration: float) -> "SpeechTimeline":
+        """
+        Build the timeline from ASR output.
+
+        Word timestamps are used when the backend produced them. Otherwise
+        each segment's time is spread over its words in proportion to their
+        length. A transcript without segments is treated as one segment
+        spanning the recording.
+
+        Args:
+            transcription: Output of transcribe_audio
+            duration: Recording length in seconds
+
+        Returns:
+            SpeechTimeline
+        """
+        segments = transcription.get("segments") or []
+        if not segments and transcription.get("transcript"):
+            segments = [{"start": 0.0, "end": duration, "text": transcription["transcript"]}]
+
+        raw_words: List[str] = []
+        starts: List[np.ndarray] = []
+        ends: List[np.ndarray] = []
+        for segment in segments:
+            words = segment.get("words")
+            if words:
+                raw_words.extend(word["word"] for word in words)
+                starts.append(np.array([word["start"] for word in words], dtype=np.float64))
+                ends.append(np.array([word["end"] for word in words], dtype=np.float64))
+                continue
+
+            tokens = segment["text"].split()
+            if not tokens:
+                continue
+            word_starts, word_ends = spread_words(tokens, segment["start"], segment["end"])
+            raw_words.extend(tokens)
+            starts.append(word_starts)
+            ends.append(word_ends)
+
+        if not raw_words:
+            return cls([], np.zeros(0), np.zeros(0))
+        return cls(raw_words, np.concatenate(starts), np.concatenate(ends))
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def syllable_count(self) -> int:
+        return int(self.syllables.sum())
+
+    def filler_counts(self) -> List[Dict[str, Any]]:
+        """Occurrences of each filler word or phrase, in FILLER_WORDS order."""
+        counts = np.bincount(self.fillers[self.fillers >= 0], minlength=len(FILLER_WORDS))
+        return [
+            {"word": FILLER_WORDS[index], "count": int(count)}
+            for index, count in enumerate(counts) if count > 0
+        ]
+
+    def pace(self, duration: float, window: float = PACE_WINDOW_SECONDS) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Speaking rate over time.
+
+        Words are assigned to fixed windows by their midpoint and counted
+        with bincount.
+
+        Args:
+            duration: Recording length in seconds
+            window: Window width in seconds
+
+        Returns:
+            Per-window rates, and the coefficient of variation of words per
+            minute over windows that contain speech
+        """
+        if duration <= 0 or window <= 0:
+            return [], 0.0
+
+        n_bins = int(np.ceil(duration / window))
+        edges = np.minimum(np.arange(n_bins + 1) * window, duration)
+        lengths = np.diff(edges)
+
+        midpoints = (self.starts + self.ends) / 2
+        bins = np.clip((midpoints // window).astype(np.int64), 0, n_bins - 1)
+        words = np.bincount(bins, minlength=n_bins)
+        syllables = np.bincount(bins, weights=self.syllables, minlength=n_bins)
+        fillers = np.bincount(bins[self.fillers >= 0], minlength=n_bins)
+
+        words_per_minute = np.where(lengths > 0, words / np.maximum(lengths, 1e-9) * 60, 0)
+        syllables_per_minute = np.where(lengths > 0, syllables / np.maximum(lengths, 1e-9) * 60, 0)
+
+        # A short last window would exaggerate the spread, so it is left out
+        spoken = words_per_minute[(words > 0) & (lengths >= window / 2)]
+        variability = float(np.std(spoken) / np.mean(spoken)) if len(spoken) > 1 else 0.0
+
+        timeline = [
+            {
+                "start": round(float(edges[i]), 2),
+                "end": round(float(edges[i + 1]), 2),
+                "words_per_minute": round(float(words_per_minute[i]), 1),
+                "syllables_per_minute": round(float(syllables_per_minute[i]), 1),
+                "filler_count": int(fillers[i])
+            }
+            for i in range(n_bins)
+        ]
+        return timeline, round(variability, 3)
+
+    def pause_placement(self, pause_segments: np.ndarray) -> Dict[str, Any]:
+        """
+        Classify measured pauses by where they fall in the speech.
+
+        A pause whose preceding word ends a sentence is at a sentence
+        boundary; one between two words of the same sentence is mid-sentence.
+        Pauses before the first word are neither.
+
+        Args:
+            pause_segments: (pauses, 2) start and end seconds from the acoustics
+
+        Returns:
+            Dictionary with pause counts by placement
+        """
+        pauses = np.asarray(pause_segments, dtype=np.float64).reshape(-1, 2)
+        if len(pauses) == 0 or self.word_count == 0:
+            return {
+                "pauses_at_sentence_boundaries": 0,
+                "pauses_mid_sentence": 0,
+                "sentence_boundary_pause_ratio": 0
+            }
+
+        midpoints = pauses.mean(axis=1)
+        # Word ends can step back slightly across stitched segments
+        previous = np.searchsorted(np.maximum.accumulate(self.ends), midpoints, side="right") - 1
+        has_previous = previous >= 0
+        at_boundary = has_previous & self.sentence_end[np.maximum(previous, 0)]
+        mid_sentence = has_previous & ~at_boundary & (previous < self.word_count - 1)
+
+        boundary_count = int(at_boundary.sum())
+        mid_count = int(mid_sentence.sum())
+        placed = boundary_count + mid_count
+        return {
+            "pauses_at_sentence_boundaries": boundary_count,
+            "pauses_mid_sentence": mid_count,
+            "sentence_boundary_pause_ratio": round(boundary_count / placed, 3) if placed else 0
+        }
+
+def spread_words(tokens: List[str], start: float, end: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Spread a segment's time over its words in proportion to their length."""
+    lengths = np.char.str_len(np.asarray(tokens, dtype=str)).astype(np.float64)
+    edges = np.concatenate(([0.0], np.cumsum(lengths))) / lengths.sum()
+    times = start + (end - start) * edges
+    return times[:-1], times[1:]
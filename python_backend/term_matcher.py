@@ -0,0 +1,176 @@
+import os
+import json
+import numpy as np
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+from transcript_document import preprocess_text
+
+current_dir = os.path.dirname(__file__)
+
+TECH_TAXONOMY_PATH = os.getenv("TECH_TAXONOMY_PATH", os.path.join(current_dir, 'tech_domains.json'))
+
+class TermMatches:
+    """
+    Result of scanning one word sequence.
+
+    Attributes:
+        term_counts: Occurrences of every term of the matcher
+        domain_terms: Distinct terms found per domain
+        domain_hits: Total term occurrences per domain
+        first_seen: Word position of each term's first occurrence, -1 if absent
+    """
+
+    def __init__(self, matcher: "TermMatcher", term_counts: np.ndarray, first_seen: np.ndarray):
+        self.matcher = matcher
+        self.term_counts = term_counts
+        self.first_seen = first_seen
+
+        present = (term_counts > 0).astype(np.float64)
+        n_domains = len(matcher.domains)
+        self.domain_terms = np.bincount(matcher.pair_domains, weights=present[matcher.pair_terms], minlength=n_domains)
+        self.domain_hits = np.bincount(matcher.pair_domains, weights=term_counts[matcher.pair_terms], minlength=n_domains)
+
+    def found_terms(self, domain: str) -> List[str]:
+        """Terms of a domain that occurred, in order of first occurrence."""
+        terms = self.matcher.domain_term_ids(domain)
+        terms = terms[self.term_counts[terms] > 0]
+        terms = terms[np.argsort(self.first_seen[terms], kind="stable")]
+        return [self.matcher.terms[term] for term in terms]
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over words, built from a domain taxonomy.
+
+    Terms are normalized like transcripts (lowercase, punctuation as word
+    breaks) and the automaton steps one word at a time, so terms only match
+    whole words and every domain is counted in a single pass over the text.
+    A term listed under several domains counts for each of them.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Sequence[str]]):
+        self.domains = list(taxonomy)
+        self.terms: List[str] = []
+        term_ids: Dict[str, int] = {}
+
+        # Trie over words: goto[state][word] -> state, with the terms ending at each state
+        self.goto: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[int]] = [[]]
+
+        pairs = set()
+        for domain_id, terms in enumerate(taxonomy.values()):
+            for term in terms:
+                normalized = preprocess_text(term)
+                if not normalized:
+                    continue
+                if normalized not in term_ids:
+                    term_ids[normalized] = len(self.terms)
+                    self.terms.append(normalized)
+                    self._insert(normalized.split(), term_ids[normalized])
+                pairs.add((term_ids[normalized], domain_id))
+
+        pairs = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+        self.pair_terms = pairs[:, 0]
+        self.pair_domains = pairs[:, 1]
+        self.domain_sizes = np.bincount(self.pair_domains, minlength=len(self.domains))
+        self._domain_index = {domain: index for index, domain in enumerate(self.domains)}
+
+        self.fail = [0] * len(self.goto)
+        self._link()
+
+    def _insert(self, words: List[str], term_id: int):
+        state = 0
+        for word in words:
+            next_state = self.goto[state].get(word)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][word] = next_state
+                self.goto.append({})
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(term_id)
+
+    def _link(self):
+        # Breadth-first, so every state's failure target is linked before it
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                target = self.fail[state]
+                while target and word not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(word, 0)
+                # A state also reports every term that ends at its failure target
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def domain_term_ids(self, domain: str) -> np.ndarray:
+        index = self._domain_index.get(domain)
+        if index is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.pair_terms[self.pair_domains == index]
+
+    def find(self, words: Sequence[str]) -> Tuple[List[int], List[int]]:
+        """
+        Find every term occurrence in a word sequence.
+
+        Args:
+            words: Normalized words, e.g. TranscriptDocument.words
+
+        Returns:
+            Term ids and the position of the word each occurrence ends on
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        matched: List[int] = []
+        positions: List[int] = []
+
+        state = 0
+        for position, word in enumerate(words):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if outputs[state]:
+                matched.extend(outputs[state])
+                positions.extend([position] * len(outputs[state]))
+
+        return matched, positions
+
+    def scan(self, words: Sequence[str]) -> TermMatches:
+        """
+        Count term occurrences per term and per domain in one pass.
+
+        Args:
+            words: Normalized words, e.g. TranscriptDocument.words
+
+        Returns:
+            TermMatches with per-term and per-domain counts
+        """
+        matched, positions = self.find(words)
+        matched = np.asarray(matched, dtype=np.int64)
+        term_counts = np.bincount(matched, minlength=len(self.terms)).astype(np.float64)
+
+        # With repeated indices the last write wins, so writing in reverse keeps the earliest position
+        first_seen = np.full(len(self.terms), -1, dtype=np.int64)
+        first_seen[matched[::-1]] = np.asarray(positions, dtype=np.int64)[::-1]
+        return TermMatches(self, term_counts, first_seen)
+
+def load_taxonomy(path: str = TECH_TAXONOMY_PATH) -> Dict[str, List[str]]:
+    """
+    Read a domain taxonomy file.
+
+    Args:
+        path: JSON object mapping each domain name to its list of terms
+
+    Returns:
+        Dictionary of domain -> terms
+    """
+    with open(path, encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    if not isinstance(taxonomy, dict):
+        raise ValueError(f"Taxonomy {path} must map domain names to term lists")
+    return taxonomy
+
+@lru_cache(maxsize=4)
+def get_term_matcher(path: str = TECH_TAXONOMY_PATH) -> TermMatcher:
+    """Compiled matcher for a taxonomy file, built once per process."""
+    return TermMatcher(load_taxonomy(path))
@@ -0,0 +1,176 @@
+import re
+import string
+import numpy as np
+from functools import cached_property
+from typing import Dict, List, Any
+from model_registry import MissingModelError
+
+VOWEL_CODES = np.array([ord(char) for char in "aeiouy"], dtype=np.uint32)
+
+def preprocess_text(text: str) -> str:
+    """Clean and normalize text."""
+    # Convert to lowercase
+    text = text.lower()
+    # Remove punctuation
+    text = re.sub(f'[{re.escape(string.punctuation)}]', ' ', text)
+    # Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with NLTK's Punkt tokenizer."""
+    from nltk.tokenize import sent_tokenize
+    try:
+        return sent_tokenize(text)
+    except LookupError as e:
+        raise MissingModelError("NLTK Punkt data is not installed; run `python provision.py nltk`") from e
+
+def count_syllables(words: np.ndarray) -> np.ndarray:
+    """
+    Count syllables in every word at once using a vowel-group heuristic.
+
+    The words are joined into one code point array; a syllable starts
+    wherever a vowel follows a non-vowel, and the onsets are summed per word.
+    Words of three letters or fewer count as one syllable, and a final
+    silent e (but not -le) is not counted.
+
+    Args:
+        words: Lowercase words without surrounding punctuation, none empty
+
+    Returns:
+        Syllable count per word
+    """
+    if len(words) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    lengths = np.char.str_len(words)
+    codes = np.frombuffer(" ".join(words.tolist()).encode("utf-32-le"), dtype=np.uint32)
+    vowel = np.isin(codes, VOWEL_CODES)
+    onset = vowel.copy()
+    onset[1:] &= ~vowel[:-1]
+
+    # Words are separated by one space, which is never a vowel
+    starts = np.concatenate(([0], np.cumsum(lengths[:-1] + 1)))
+    counts = np.add.reduceat(onset.astype(np.int64), starts)
+
+    ends = starts + lengths
+    last = codes[ends - 1]
+    before_last = np.where(lengths >= 2, codes[np.maximum(ends - 2, 0)], 0)
+    counts -= (last == ord("e")) & (before_last != ord("l"))
+
+    counts[lengths <= 3] = 1
+    return np.maximum(counts, 1)
+
+def syllable_counts(words: np.ndarray) -> np.ndarray:
+    """Syllables per word, counting each distinct word only once."""
+    if len(words) == 0:
+        return np.zeros(0, dtype=np.int64)
+    unique, inverse = np.unique(words, return_inverse=True)
+    return count_syllables(unique)[inverse.reshape(-1)]
+
+class TranscriptDocument:
+    """
+    A transcript tokenized once and shared by every text analysis.
+
+    Sentences come from the punctuated transcript; each is split into
+    comma-separated clauses and normalized words. Word, syllable and letter
+    counts are derived from those tokens and cached, and every readability
+    formula is computed from the shared counts.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentences = split_sentences(text) if text.strip() else []
+        # Words of each clause of each sentence
+        self.clauses = [
+            [preprocess_text(clause).split() for clause in sentence.split(",")]
+            for sentence in self.sentences
+        ]
+
+    @cached_property
+    def sentence_words(self) -> List[List[str]]:
+        return [[word for clause in clauses for word in clause] for clauses in self.clauses]
+
+    @cached_property
+    def words(self) -> np.ndarray:
+        return np.asarray([word for words in self.sentence_words for word in words], dtype=str)
+
+    @cached_property
+    def clean_text(self) -> str:
+        """Lowercase words without punctuation, as produced by preprocess_text."""
+        return " ".join(self.words.tolist())
+
+    @cached_property
+    def clean_sentences(self) -> List[str]:
+        return [" ".join(words) for words in self.sentence_words]
+
+    @cached_property
+    def sentence_lengths(self) -> np.ndarray:
+        return np.array([len(words) for words in self.sentence_words if words], dtype=np.int64)
+
+    @cached_property
+    def clause_lengths(self) -> np.ndarray:
+        return np.array([len(words) for clauses in self.clauses for words in clauses if words], dtype=np.int64)
+
+    @cached_property
+    def syllables(self) -> np.ndarray:
+        return syllable_counts(self.words)
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_lengths)
+
+    @cached_property
+    def counts(self) -> Dict[str, int]:
+        """Totals every readability formula is built from."""
+        return {
+            "words": self.word_count,
+            "sentences": self.sentence_count,
+            "syllables": int(self.syllables.sum()),
+            "polysyllables": int(np.sum(self.syllables >= 3)),
+            "letters": int(np.char.str_len(self.words).sum()) if self.word_count else 0
+        }
+
+    def flesch_reading_ease(self) -> float:
+        counts = self.counts
+        if counts["words"] == 0:
+            return 0.0
+        words_per_sentence = counts["words"] / max(1, counts["sentences"])
+        syllables_per_word = counts["syllables"] / counts["words"]
+        return 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+
+    def gunning_fog(self) -> float:
+        counts = self.counts
+        if counts["words"] == 0:
+            return 0.0
+        words_per_sentence = counts["words"] / max(1, counts["sentences"])
+        complex_share = counts["polysyllables"] / counts["words"]
+        return 0.4 * (words_per_sentence + 100 * complex_share)
+
+    def smog_index(self) -> float:
+        counts = self.counts
+        # SMOG is only defined for three or more sentences
+        if counts["sentences"] < 3:
+            return 0.0
+        return 1.043 * float(np.sqrt(counts["polysyllables"] * 30 / counts["sentences"])) + 3.1291
+
+    def coleman_liau_index(self) -> float:
+        counts = self.counts
+        if counts["words"] == 0:
+            return 0.0
+        letters_per_100 = counts["letters"] / counts["words"] * 100
+        sentences_per_100 = max(1, counts["sentences"]) / counts["words"] * 100
+        return 0.0588 * letters_per_100 - 0.296 * sentences_per_100 - 15.8
+
+    def readability(self) -> Dict[str, Any]:
+        """Every readability metric from one set of counts."""
+        return {
+            "flesch_reading_ease": self.flesch_reading_ease(),
+            "gunning_fog": self.gunning_fog(),
+            "smog_index": self.smog_index(),
+            "coleman_liau_index": self.coleman_liau_index()
+        }
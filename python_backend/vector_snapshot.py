@@ -0,0 +1,300 @@
+import os
+import json
+import mmap
+import uuid
+import struct
+import threading
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+current_dir = os.path.dirname(__file__)
+SNAPSHOT_DIR = os.path.join(current_dir, 'db', 'snapshots')
+
+COLLECTIONS = {
+    "students": os.path.join(current_dir, 'db', 'students_data'),
+    "mentors": os.path.join(current_dir, 'db', 'mentors_data')
+}
+
+# File layout: magic, header length, JSON header, then 64-byte aligned sections
+MAGIC = b"THVSNAP1"
+ALIGNMENT = 64
+
+def snapshot_path(name: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(snapshot_dir, f"{name}.vsnap")
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_snapshot(
+    path: str,
+    ids: List[str],
+    embeddings: np.ndarray,
+    documents: List[str],
+    metadatas: List[Optional[Dict[str, Any]]],
+    space: str = "l2"
+) -> str:
+    """
+    Write vectors, IDs and records to a single snapshot file.
+
+    The file is written next to its destination and moved into place with
+    an atomic rename, so readers never see a partial snapshot and workers
+    that still map the old file keep a valid view until they reload.
+
+    Args:
+        path: Destination snapshot file
+        ids: Record IDs
+        embeddings: Vector matrix of shape (n, dim)
+        documents: Document text per record
+        metadatas: Metadata dictionary per record
+        space: Distance function the vectors were indexed with
+
+    Returns:
+        Path to the written snapshot
+    """
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if len(ids) == 0:
+        # An emptied collection returns a flat empty array, which cannot be reshaped to (0, -1)
+        vectors = np.zeros((0, 0), dtype=np.float32)
+    elif vectors.ndim != 2:
+        vectors = vectors.reshape(len(ids), -1)
+    norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+
+    id_width = max([len(i.encode("utf-8")) for i in ids] + [1])
+    id_array = np.array([i.encode("utf-8") for i in ids], dtype=f"S{id_width}")
+
+    records = [
+        json.dumps({"document": doc, "metadata": meta or {}}).encode("utf-8")
+        for doc, meta in zip(documents, metadatas)
+    ]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(r) for r in records])
+    blob = b"".join(records)
+
+    arrays = {
+        "vectors": vectors,
+        "norms": norms,
+        "ids": id_array,
+        "offsets": offsets
+    }
+
+    # Header size depends on section offsets, so lay sections out after a
+    # generously sized header slot
+    header_slot = _align(len(MAGIC) + 8 + 4096)
+    sections = {}
+    position = header_slot
+    for name, array in arrays.items():
+        sections[name] = {"offset": position, "dtype": array.dtype.str, "shape": list(array.shape)}
+        position = _align(position + array.nbytes)
+    sections["records"] = {"offset": position, "length": len(blob)}
+
+    header = json.dumps({
+        "count": len(ids),
+        "dim": int(vectors.shape[1]) if len(ids) else 0,
+        "space": space,
+        "sections": sections
+    }).encode("utf-8")
+    if len(MAGIC) + 8 + len(header) > header_slot:
+        raise ValueError("Snapshot header does not fit in its reserved slot.")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(sections[name]["offset"])
+            f.write(array.tobytes())
+        f.seek(sections["records"]["offset"])
+        f.write(blob)
+        # Empty trailing sections are never written, but readers map up to their offsets
+        f.truncate(sections["records"]["offset"] + len(blob))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+    return path
+
+def export_collection(persist_directory: str, path: str) -> Dict[str, Any]:
+    """
+    Export a persisted Chroma collection to a snapshot file.
+
+    Args:
+        persist_directory: Directory of the persisted Chroma store
+        path: Destination snapshot file
+
+    Returns:
+        Dictionary with export stats
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection("langchain")
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+
+    write_snapshot(
+        path,
+        data["ids"],
+        np.asarray(data["embeddings"], dtype=np.float32),
+        data["documents"],
+        data["metadatas"],
+        space=space
+    )
+
+    return {"path": path, "count": len(data["ids"]), "bytes": os.path.getsize(path)}
+
+class VectorSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    All arrays are views into one shared mapping, so every worker process
+    that opens the same file shares its pages through the OS page cache.
+    The query and count methods follow the Chroma collection API used by
+    the recommend handlers, so a snapshot can stand in for a collection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_ino, stat.st_mtime_ns)
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a vector snapshot.")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+
+        self.size = header["count"]
+        self.dim = header["dim"]
+        self.space = header["space"]
+
+        sections = header["sections"]
+        for name in ("vectors", "norms", "ids", "offsets"):
+            section = sections[name]
+            dtype = np.dtype(section["dtype"])
+            shape = tuple(section["shape"])
+            array = np.frombuffer(self._mmap, dtype=dtype, count=int(np.prod(shape)), offset=section["offset"])
+            setattr(self, name, array.reshape(shape))
+        self._records_offset = sections["records"]["offset"]
+
+        # Requests searching this snapshot; a retired snapshot closes when the last one releases it
+        self._leases = 0
+        self._retired = False
+        self._lease_lock = threading.Lock()
+
+    def acquire(self):
+        with self._lease_lock:
+            self._leases += 1
+
+    def release(self):
+        with self._lease_lock:
+            self._leases -= 1
+            close = self._retired and self._leases == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """Close the snapshot once no request holds it, after a newer file replaced it."""
+        with self._lease_lock:
+            self._retired = True
+            close = self._leases == 0
+        if close:
+            self.close()
+
+    def is_stale(self) -> bool:
+        """Check whether the snapshot file has been replaced since it was opened."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_ino, stat.st_mtime_ns) != self._identity
+
+    def count(self) -> int:
+        return self.size
+
+    def get_id(self, index: int) -> str:
+        return self.ids[index].decode("utf-8")
+
+    def record(self, index: int) -> Dict[str, Any]:
+        start = self._records_offset + int(self.offsets[index])
+        end = self._records_offset + int(self.offsets[index + 1])
+        return json.loads(self._mmap[start:end])
+
+    def search(self, query_embedding: np.ndarray, k: int) -> Dict[str, np.ndarray]:
+        """
+        Exact nearest neighbour search over the mapped vectors.
+
+        Args:
+            query_embedding: Query vector of shape (dim,)
+            k: Number of neighbours
+
+        Returns:
+            Dictionary with neighbour indices and Chroma-compatible distances
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return {"indices": np.empty(0, dtype=np.int64), "distances": np.empty(0, dtype=np.float32)}
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        dots = self.vectors @ query
+        if self.space == "ip":
+            distances = 1.0 - dots
+        elif self.space == "cosine":
+            denom = self.norms * (np.linalg.norm(query) or 1.0)
+            denom[denom == 0] = 1.0
+            distances = 1.0 - dots / denom
+        else:
+            distances = self.norms ** 2 - 2 * dots + float(query @ query)
+
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+
+        return {"indices": top, "distances": distances[top]}
+
+    def query(self, query_embeddings, n_results: int = 10, include=("documents", "metadatas", "distances")) -> Dict[str, Any]:
+        """Chroma-style query returning one result list per query embedding."""
+        results = {"ids": [], "documents": [], "metadatas": [], "embeddings": [], "distances": []}
+
+        for query_embedding in query_embeddings:
+            hits = self.search(query_embedding, n_results)
+            indices = hits["indices"]
+            records = [self.record(i) for i in indices] if ("documents" in include or "metadatas" in include) else []
+
+            results["ids"].append([self.get_id(i) for i in indices])
+            results["documents"].append([r["document"] for r in records])
+            results["metadatas"].append([r["metadata"] for r in records])
+            results["embeddings"].append(self.vectors[indices])
+            results["distances"].append(hits["distances"].tolist())
+
+        return {key: value for key, value in results.items() if key == "ids" or key in include}
+
+    def close(self):
+        # Drop the array views before closing the mapping they point into
+        for name in ("vectors", "norms", "ids", "offsets"):
+            setattr(self, name, None)
+        self._mmap.close()
+        self._file.close()
+
+def refresh_snapshot(name: str, persist_directory: str, snapshot_dir: str = SNAPSHOT_DIR):
+    """Re-export a collection's snapshot after a write, if it has one."""
+    path = snapshot_path(name, snapshot_dir)
+    if os.path.exists(path):
+        export_collection(persist_directory, path)
+
+def load_snapshot(name: str, snapshot_dir: str = SNAPSHOT_DIR) -> Optional[VectorSnapshot]:
+    """Open the named snapshot if it exists."""
+    path = snapshot_path(name, snapshot_dir)
+    if not os.path.exists(path):
+        return None
+    return VectorSnapshot(path)
+
+if __name__ == "__main__":
+    for name, persist_directory in COLLECTIONS.items():
+        if not os.path.exists(persist_directory):
+            print(f"Skipping {name}: {persist_directory} does not exist.")
+            continue
+        stats = export_collection(persist_directory, snapshot_path(name))
+        print(f"Exported {name}: {stats['count']} vectors, {stats['bytes']} bytes -> {stats['path']}")
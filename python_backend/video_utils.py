@@ -1,8 +1,293 @@
 import os
 import subprocess
-from typing import Optional
-import moviepy.editor as mp
-import whisper
+import hashlib
+import threading
+import numpy as np
+from typing import Optional, Iterator, Union, Tuple
+
+AUDIO_SAMPLE_RATE = 16000
+FRAME_BUDGET = int(os.getenv("FRAME_BUDGET", "100"))
+ANALYSIS_WIDTH = int(os.getenv("ANALYSIS_WIDTH", "640"))
+SEEK_SECONDS = 2.0
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "500")) * 1024 * 1024)
+MAX_VIDEO_SECONDS = float(os.getenv("MAX_VIDEO_SECONDS", "1800"))
+
+class UploadTooLargeError(Exception):
+    pass
+
+class MediaContext:
+    """
+    Decoded view of one uploaded video, shared by every analyzer.
+
+    The audio track is demuxed once into a 16 kHz mono float32 buffer, which
+    is exactly what Whisper and the acoustic feature engine read, so
+    no intermediate WAV is written or re-read. Video frames are decoded
+    lazily, only when an analyzer iterates over them, and only at the
+    sampled timestamps.
+    """
+
+    def __init__(self, video_path: str, sample_rate: int = AUDIO_SAMPLE_RATE, pcm_path: Optional[str] = None):
+        self.video_path = video_path
+        self.sample_rate = sample_rate
+        self.pcm_path = pcm_path
+        self._audio: Optional[np.ndarray] = None
+
+    @property
+    def audio(self) -> np.ndarray:
+        """Mono PCM samples in [-1, 1], decoded on first access."""
+        if self._audio is None:
+            if self.pcm_path and os.path.exists(self.pcm_path):
+                # Already demuxed while the upload was streaming in
+                self._audio = np.fromfile(self.pcm_path, dtype=np.float32)
+            else:
+                self._audio = decode_audio(self.video_path, self.sample_rate)
+        return self._audio
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    def frames(
+        self,
+        fps: float = 1,
+        max_frames: int = FRAME_BUDGET,
+        width: int = ANALYSIS_WIDTH,
+        timestamps: bool = False
+    ) -> Iterator[Union[np.ndarray, Tuple[float, np.ndarray]]]:
+        """
+        Yield BGR frames sampled evenly over the whole video, decoding only those frames.
+        
+        Frames are taken at the requested rate, or spread evenly within
+        max_frames when the video is longer than that allows. Short gaps are
+        skipped with grab(), which demuxes without converting the frame, and
+        long gaps seek directly so the decoder restarts at the nearest keyframe.
+        
+        Args:
+            fps: Frames per second to sample
+            max_frames: Upper bound on the number of frames yielded
+            width: Frames wider than this are downscaled to it
+            timestamps: Yield (seconds, frame) pairs instead of bare frames
+        """
+        import cv2
+
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            return
+
+        try:
+            video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if total_frames <= 0:
+                # Container without a frame count, fall back to a sequential pass
+                targets = None
+            else:
+                sample_count = min(max_frames, max(1, int(total_frames / video_fps * fps)))
+                targets = np.unique(np.linspace(0, total_frames - 1, sample_count).round().astype(int))
+
+            # Seeking costs a keyframe decode, so only seek past a couple of seconds of frames
+            seek_gap = int(video_fps * SEEK_SECONDS)
+            interval = max(1, int(video_fps / fps))
+            position = 0
+            yielded = 0
+
+            while yielded < max_frames:
+                if targets is not None:
+                    if yielded >= len(targets):
+                        break
+                    target = int(targets[yielded])
+                else:
+                    target = position if position % interval == 0 else position + interval - position % interval
+
+                if target - position > seek_gap:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                    position = target
+                while position < target:
+                    if not cap.grab():
+                        return
+                    position += 1
+
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                position += 1
+
+                if frame.shape[1] > width:
+                    height = int(frame.shape[0] * width / frame.shape[1])
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+                yielded += 1
+                yield ((position - 1) / video_fps, frame) if timestamps else frame
+        finally:
+            cap.release()
+
+def decode_audio(path: str, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """
+    Demux and resample the audio track of a media file with a single ffmpeg pass.
+    
+    Args:
+        path: Path to a video or audio file
+        sample_rate: Output sample rate
+        
+    Returns:
+        Mono float32 samples
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "-"
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Read into one growable buffer so the array below wraps it without a copy
+    # and stays writable, which torch.from_numpy in Whisper requires
+    buffer = bytearray()
+    while True:
+        chunk = proc.stdout.read(1 << 20)
+        if not chunk:
+            break
+        buffer += chunk
+
+    stderr = proc.stderr.read()
+    if proc.wait() != 0:
+        raise RuntimeError(f"Failed to decode audio: {stderr.decode('utf-8', errors='replace').strip()}")
+
+    return np.frombuffer(buffer, dtype=np.float32)
+
+def load_media(video_path: str, pcm_path: Optional[str] = None) -> MediaContext:
+    """Open a video and decode its audio track up front, unless it was streamed in already."""
+    media = MediaContext(video_path, pcm_path=pcm_path)
+    media.audio  # decode in the stage that owns the context
+    return media
+
+class StreamingDemuxer:
+    """
+    Writes an upload to disk while piping the same bytes through ffmpeg.
+
+    The audio track is demuxed and resampled as the upload arrives, so by the
+    time the last byte lands the PCM buffer is ready and the size and
+    duration limits have already been checked. Containers ffmpeg cannot read
+    from a pipe (an MP4 with its index at the end) simply leave no PCM
+    behind, and the analysis decodes the saved file instead.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        max_bytes: int = MAX_UPLOAD_BYTES,
+        max_seconds: float = MAX_VIDEO_SECONDS
+    ):
+        self.video_path = video_path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.max_samples = int(max_seconds * sample_rate)
+        self.bytes_received = 0
+        self.samples_decoded = 0
+        self._digest = hashlib.sha256()
+        self.demux_failed = False
+
+        self._file = open(video_path, "wb")
+        self._pcm = bytearray()
+        self._proc = None
+        self._reader = None
+
+        cmd = [
+            "ffmpeg", "-nostdin", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", "-ac", "1", "-ar", str(sample_rate),
+            "-f", "f32le", "pipe:1"
+        ]
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"Streaming demux unavailable, audio will be decoded after upload: {str(e)}")
+            self.demux_failed = True
+            return
+
+        # Drain stdout continuously so ffmpeg never blocks on a full pipe
+        self._reader = threading.Thread(target=self._read_pcm, name="demux-reader", daemon=True)
+        self._reader.start()
+
+    def _read_pcm(self):
+        while True:
+            chunk = self._proc.stdout.read(1 << 16)
+            if not chunk:
+                break
+            self._pcm += chunk
+            self.samples_decoded = len(self._pcm) // 4
+
+    @property
+    def seconds_decoded(self) -> float:
+        return self.samples_decoded / self.sample_rate
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the bytes received so far; identifies the upload in the result cache."""
+        return self._digest.hexdigest()
+
+    def feed(self, chunk: bytes):
+        """
+        Append a chunk of the upload.
+        
+        Args:
+            chunk: Next bytes of the request body
+            
+        Raises:
+            UploadTooLargeError: The upload crossed the size or duration limit
+        """
+        self.bytes_received += len(chunk)
+        if self.bytes_received > self.max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+        if self.samples_decoded > self.max_samples:
+            raise UploadTooLargeError(f"Video is longer than {self.max_samples // self.sample_rate} seconds")
+
+        self._file.write(chunk)
+        self._digest.update(chunk)
+
+        if not self.demux_failed:
+            try:
+                self._proc.stdin.write(chunk)
+            except (BrokenPipeError, OSError):
+                # ffmpeg gave up on this container from a pipe; keep saving the file
+                self.demux_failed = True
+
+    def finish(self, pcm_path: str) -> Optional[str]:
+        """
+        Close the upload and store the streamed PCM.
+        
+        Args:
+            pcm_path: Where to write the decoded samples
+            
+        Returns:
+            pcm_path if the whole audio track was demuxed, otherwise None
+        """
+        self._file.close()
+        if self._proc is None:
+            return None
+
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            self.demux_failed = True
+        returncode = self._proc.wait()
+        self._reader.join()
+
+        if self.samples_decoded > self.max_samples:
+            raise UploadTooLargeError(f"Video is longer than {self.max_samples // self.sample_rate} seconds")
+        if self.demux_failed or returncode != 0 or not self._pcm:
+            return None
+
+        with open(pcm_path, "wb") as f:
+            f.write(self._pcm)
+        return pcm_path
+
+    def abort(self):
+        self._file.close()
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._reader.join(timeout=5)
 
 def extract_audio(video_path: str, output_dir: str) -> str:
     """
@@ -15,6 +300,8 @@ def extract_audio(video_path: str, output_dir: str) -> str:
     Returns:
         Path to the extracted audio file
     """
+    import moviepy.editor as mp
+    
     audio_path = os.path.join(output_dir, "extracted_audio.wav")
     
     # Using moviepy
@@ -23,28 +310,24 @@ def extract_audio(video_path: str, output_dir: str) -> str:
     
     return audio_path
 
-def transcribe_audio(audio_path: str, model_size: str = "base") -> dict:
+def transcribe_audio(audio: Union[str, np.ndarray], model_size: str = "base") -> dict:
     """
-    Transcribe audio file to text using OpenAI's Whisper.
+    Transcribe audio file to text with the configured ASR backend (Whisper by default).
     
     Args:
-        audio_path: Path to the audio file
+        audio: Path to the audio file, or 16 kHz mono samples
         model_size: Whisper model size ("tiny", "base", "small", "medium", "large")
         
     Returns:
         Dictionary containing transcript and metadata
     """
-    # Load Whisper model
-    model = whisper.load_model(model_size)
+    from asr import transcribe
     
-    # Transcribe audio
-    result = model.transcribe(audio_path)
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
     
-    return {
-        "transcript": result["text"],
-        "segments": result["segments"],
-        "language": result["language"]
-    }
+    # Only the speech regions are transcribed
+    return transcribe(audio, model_size)
 
 def extract_video_frames(video_path: str, output_dir: str, fps: int = 1) -> str:
     """
@@ -82,6 +365,8 @@ def get_video_duration(video_path: str) -> float:
     Returns:
         Duration in seconds
     """
+    import moviepy.editor as mp
+    
     video = mp.VideoFileClip(video_path)
     duration = video.duration
     video.close()
@@ -98,6 +383,8 @@ def get_video_metadata(video_path: str) -> dict:
     Returns:
         Dictionary containing video metadata
     """
+    import moviepy.editor as mp
+    
     video = mp.VideoFileClip(video_path)
     
     metadata = {
@@ -1,10 +1,10 @@
-import os
 import numpy as np
-import librosa
-import parselmouth
-from parselmouth.praat import call
-from typing import Dict, List, Any, Tuple
-import whisper
+from typing import Dict, Any, Union, Optional
+from video_utils import MediaContext, decode_audio
+from asr import transcribe
+from acoustic_features import extract_acoustic_features
+from speech_timeline import SpeechTimeline
+from transcript_document import TranscriptDocument
 
 def analyze_voice(audio_path: str) -> Dict[str, Any]:
     """
@@ -17,398 +17,210 @@ def analyze_voice(audio_path: str) -> Dict[str, Any]:
         Dictionary with voice analysis metrics
     """
     try:
-        # Load audio
-        y, sr = librosa.load(audio_path, sr=None)
-        
-        # Basic audio stats
-        duration = librosa.get_duration(y=y, sr=sr)
+        # Decode once and share the samples between ASR and acoustics
+        media = MediaContext(audio_path)
         
         # Transcribe audio
-        transcription = transcribe_audio(audio_path)
-        transcript = transcription["transcript"]
-        
-        # Calculate speech rate
-        speech_rate_results = calculate_speech_rate(transcript, duration)
-        
-        # Analyze pitch variation
-        pitch_results = analyze_pitch(audio_path)
-        
-        # Detect pauses
-        pause_results = detect_pauses(y, sr)
-        
-        # Analyze voice stability
-        stability_results = analyze_voice_stability(audio_path)
+        transcription = transcribe_audio(media.audio)
         
-        # Analyze speech fluency
-        fluency_results = analyze_speech_fluency(transcript)
+        # Measure pitch, pauses and volume
+        acoustics = analyze_acoustics(media)
         
-        # Calculate overall metrics
-        fluency_score = calculate_fluency_score(
-            speech_rate_results["words_per_minute"],
-            pause_results["pause_frequency"],
-            fluency_results["filler_word_rate"]
-        )
-        
-        pace_score = calculate_pace_score(
-            speech_rate_results["words_per_minute"],
-            pause_results["pause_frequency"]
-        )
-        
-        voice_steadiness = calculate_voice_steadiness(
-            pitch_results["pitch_variability"],
-            stability_results["volume_stability"]
-        )
-        
-        # Assess coherence
-        speech_coherence = assess_speech_coherence(transcript)
-        
-        return {
-            "transcript": transcript,
-            "duration": duration,
-            "words_per_minute": speech_rate_results["words_per_minute"],
-            "syllables_per_minute": speech_rate_results["syllables_per_minute"],
-            "pitch_mean": pitch_results["pitch_mean"],
-            "pitch_variability": pitch_results["pitch_variability"],
-            "pitch_variation": pitch_results["pitch_variation"],
-            "pause_count": pause_results["pause_count"],
-            "pause_frequency": pause_results["pause_frequency"],
-            "avg_pause_duration": pause_results["avg_pause_duration"],
-            "volume_stability": stability_results["volume_stability"],
-            "filler_words": fluency_results["filler_words"],
-            "filler_word_rate": fluency_results["filler_word_rate"],
-            "fluency_score": round(fluency_score, 1),
-            "pace_score": round(pace_score, 1),
-            "voice_steadiness": round(voice_steadiness, 1),
-            "speech_coherence": round(speech_coherence, 1),
-            "pitch_confidence": round(pitch_results["pitch_confidence"], 1)
-        }
+        return combine_voice_results(transcription, acoustics)
     except Exception as e:
         # Return default values if analysis fails
         print(f"Voice analysis error: {str(e)}")
-        return {
-            "transcript": "Failed to analyze audio.",
-            "duration": 0,
-            "words_per_minute": 0,
-            "syllables_per_minute": 0,
-            "pitch_mean": 0,
-            "pitch_variability": 0,
-            "pitch_variation": 0,
-            "pause_count": 0,
-            "pause_frequency": 0,
-            "avg_pause_duration": 0,
-            "volume_stability": 0,
-            "filler_words": [],
-            "filler_word_rate": 0,
-            "fluency_score": 5.0,
-            "pace_score": 5.0,
-            "voice_steadiness": 5.0,
-            "speech_coherence": 5.0,
-            "pitch_confidence": 5.0,
-            "error": str(e)
-        }
+        return voice_analysis_fallback(e)
 
-def transcribe_audio(audio_path: str, model_size: str = "base") -> Dict[str, Any]:
+def analyze_acoustics(media: MediaContext) -> Dict[str, Any]:
     """
-    Transcribe audio to text using Whisper.
+    Measure the acoustic properties of a recording, independent of its transcript.
     
     Args:
-        audio_path: Path to the audio file
-        model_size: Whisper model size
+        media: Decoded media context
         
     Returns:
-        Dictionary with transcript and metadata
+        Dictionary with duration, pitch, pause and stability results, plus
+        the per-frame feature arrays under "frames"
     """
-    # Load Whisper model
-    model = whisper.load_model(model_size)
-    
-    # Transcribe audio
-    result = model.transcribe(audio_path)
-    
-    return {
-        "transcript": result["text"],
-        "segments": result["segments"],
-        "language": result["language"]
-    }
+    # Pitch, intensity and pauses all come from one framed pass over the buffer
+    return extract_acoustic_features(media.audio, media.sample_rate)
 
-def calculate_speech_rate(transcript: str, duration: float) -> Dict[str, float]:
+def combine_voice_results(
+    transcription: Dict[str, Any],
+    acoustics: Dict[str, Any],
+    document: Optional[TranscriptDocument] = None
+) -> Dict[str, Any]:
     """
-    Calculate speech rate metrics.
+    Combine a transcription and acoustic measurements into the voice analysis report.
     
     Args:
-        transcript: Text transcript
-        duration: Audio duration in seconds
+        transcription: Output of transcribe_audio
+        acoustics: Output of analyze_acoustics
+        document: The transcript already tokenized, shared with the NLP analysis
         
     Returns:
-        Dictionary with speech rate metrics
+        Dictionary with voice analysis metrics
     """
-    # Count words
-    words = transcript.split()
-    word_count = len(words)
-    
-    # Estimate syllables (simple approximation)
-    syllable_count = 0
-    for word in words:
-        syllable_count += count_syllables(word)
-    
-    # Calculate rates per minute
-    words_per_minute = (word_count / duration) * 60 if duration > 0 else 0
-    syllables_per_minute = (syllable_count / duration) * 60 if duration > 0 else 0
+    transcript = transcription["transcript"]
+    if document is None:
+        document = TranscriptDocument(transcript)
+    duration = acoustics["duration"]
+    pitch_results = acoustics["pitch"]
+    pause_results = acoustics["pauses"]
+    stability_results = acoustics["stability"]
+    
+    # Place the transcribed words on the recording's timeline once
+    timeline = SpeechTimeline.from_transcription(transcription, duration)
+    
+    # Calculate speech rate
+    speech_rate_results = calculate_speech_rate(timeline, duration)
+    
+    # Analyze speech fluency
+    fluency_results = analyze_speech_fluency(timeline)
+    
+    # Where the measured pauses fall relative to sentences
+    pause_placement = timeline.pause_placement(acoustics.get("frames", {}).get("pause_segments", np.empty((0, 2))))
+    
+    # Calculate overall metrics
+    fluency_score = calculate_fluency_score(
+        speech_rate_results["words_per_minute"],
+        pause_results["pause_frequency"],
+        fluency_results["filler_word_rate"]
+    )
+    
+    pace_score = calculate_pace_score(
+        speech_rate_results["words_per_minute"],
+        pause_results["pause_frequency"]
+    )
+    
+    voice_steadiness = calculate_voice_steadiness(
+        pitch_results["pitch_variability"],
+        stability_results["volume_stability"]
+    )
+    
+    # Assess coherence
+    speech_coherence = assess_speech_coherence(document)
     
     return {
-        "word_count": word_count,
-        "syllable_count": syllable_count,
-        "words_per_minute": round(words_per_minute, 1),
-        "syllables_per_minute": round(syllables_per_minute, 1)
+        "transcript": transcript,
+        "duration": duration,
+        "words_per_minute": speech_rate_results["words_per_minute"],
+        "syllables_per_minute": speech_rate_results["syllables_per_minute"],
+        "pace_timeline": speech_rate_results["pace_timeline"],
+        "pace_variability": speech_rate_results["pace_variability"],
+        "pitch_mean": pitch_results["pitch_mean"],
+        "pitch_variability": pitch_results["pitch_variability"],
+        "pitch_variation": pitch_results["pitch_variation"],
+        "pause_count": pause_results["pause_count"],
+        "pause_frequency": pause_results["pause_frequency"],
+        "avg_pause_duration": pause_results["avg_pause_duration"],
+        "pauses_at_sentence_boundaries": pause_placement["pauses_at_sentence_boundaries"],
+        "pauses_mid_sentence": pause_placement["pauses_mid_sentence"],
+        "sentence_boundary_pause_ratio": pause_placement["sentence_boundary_pause_ratio"],
+        "volume_stability": stability_results["volume_stability"],
+        "filler_words": fluency_results["filler_words"],
+        "filler_word_rate": fluency_results["filler_word_rate"],
+        "fluency_score": round(fluency_score, 1),
+        "pace_score": round(pace_score, 1),
+        "voice_steadiness": round(voice_steadiness, 1),
+        "speech_coherence": round(speech_coherence, 1),
+        "pitch_confidence": round(pitch_results["pitch_confidence"], 1),
+        "asr_seconds_saved": transcription.get("asr_seconds_saved", 0)
     }
 
-def count_syllables(word: str) -> int:
-    """
-    Count syllables in a word using a simple heuristic.
-    
-    Args:
-        word: Word to count syllables for
-        
-    Returns:
-        Number of syllables
-    """
-    word = word.lower()
-    # Remove punctuation
-    for char in ",.!?;:":
-        word = word.replace(char, "")
-    
-    # Special cases
-    if len(word) <= 3:
-        return 1
-    
-    # Count vowel groups
-    vowels = "aeiouy"
-    count = 0
-    prev_is_vowel = False
-    
-    for char in word:
-        is_vowel = char in vowels
-        if is_vowel and not prev_is_vowel:
-            count += 1
-        prev_is_vowel = is_vowel
-    
-    # Adjust for silent e
-    if word.endswith('e') and not word.endswith('le'):
-        count -= 1
-    
-    # Ensure at least one syllable
-    return max(1, count)
+def voice_analysis_fallback(error: Exception) -> Dict[str, Any]:
+    """Default voice analysis report used when the audio cannot be analyzed."""
+    return {
+        "transcript": "Failed to analyze audio.",
+        "duration": 0,
+        "words_per_minute": 0,
+        "syllables_per_minute": 0,
+        "pace_timeline": [],
+        "pace_variability": 0,
+        "pitch_mean": 0,
+        "pitch_variability": 0,
+        "pitch_variation": 0,
+        "pause_count": 0,
+        "pause_frequency": 0,
+        "avg_pause_duration": 0,
+        "pauses_at_sentence_boundaries": 0,
+        "pauses_mid_sentence": 0,
+        "sentence_boundary_pause_ratio": 0,
+        "volume_stability": 0,
+        "filler_words": [],
+        "filler_word_rate": 0,
+        "fluency_score": 5.0,
+        "pace_score": 5.0,
+        "voice_steadiness": 5.0,
+        "speech_coherence": 5.0,
+        "pitch_confidence": 5.0,
+        "asr_seconds_saved": 0,
+        "error": str(error)
+    }
 
-def analyze_pitch(audio_path: str) -> Dict[str, float]:
+def transcribe_audio(audio: Union[str, np.ndarray], model_size: str = "base") -> Dict[str, Any]:
     """
-    Analyze pitch characteristics using Praat.
+    Transcribe audio to text with the configured ASR backend (Whisper by default).
     
     Args:
-        audio_path: Path to the audio file
+        audio: Path to the audio file, or 16 kHz mono samples
+        model_size: Whisper model size
         
     Returns:
-        Dictionary with pitch metrics
+        Dictionary with transcript and metadata
     """
-    try:
-        # Load sound file
-        sound = parselmouth.Sound(audio_path)
-        
-        # Extract pitch
-        pitch = call(sound, "To Pitch", 0.0, 75, 600)
-        
-        # Get pitch values
-        pitch_values = pitch.selected_array['frequency']
-        
-        # Filter out zero values (unvoiced frames)
-        pitch_values = pitch_values[pitch_values > 0]
-        
-        if len(pitch_values) == 0:
-            return {
-                "pitch_mean": 0,
-                "pitch_std": 0,
-                "pitch_min": 0,
-                "pitch_max": 0,
-                "pitch_variability": 0,
-                "pitch_variation": 0,
-                "pitch_confidence": 0
-            }
-        
-        # Calculate statistics
-        pitch_mean = np.mean(pitch_values)
-        pitch_std = np.std(pitch_values)
-        pitch_min = np.min(pitch_values)
-        pitch_max = np.max(pitch_values)
-        
-        # Calculate variability (coefficient of variation)
-        pitch_variability = (pitch_std / pitch_mean) if pitch_mean > 0 else 0
-        
-        # Calculate pitch variation as range normalized by mean
-        pitch_variation = ((pitch_max - pitch_min) / pitch_mean) if pitch_mean > 0 else 0
-        
-        # Calculate confidence based on number of voiced frames
-        pitch_confidence = min(10, len(pitch_values) / 100)
-        
-        return {
-            "pitch_mean": round(pitch_mean, 1),
-            "pitch_std": round(pitch_std, 1),
-            "pitch_min": round(pitch_min, 1),
-            "pitch_max": round(pitch_max, 1),
-            "pitch_variability": round(pitch_variability, 3),
-            "pitch_variation": round(pitch_variation, 3),
-            "pitch_confidence": pitch_confidence
-        }
-    except Exception as e:
-        return {
-            "pitch_mean": 0,
-            "pitch_std": 0,
-            "pitch_min": 0,
-            "pitch_max": 0,
-            "pitch_variability": 0,
-            "pitch_variation": 0,
-            "pitch_confidence": 0,
-            "error": str(e)
-        }
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
+    
+    # Only the speech regions are transcribed
+    return transcribe(audio, model_size)
 
-def detect_pauses(y: np.ndarray, sr: int) -> Dict[str, Any]:
+def calculate_speech_rate(timeline: SpeechTimeline, duration: float) -> Dict[str, Any]:
     """
-    Detect pauses in speech.
+    Calculate speech rate metrics, overall and over time.
     
     Args:
-        y: Audio time series
-        sr: Sampling rate
+        timeline: Transcribed words on the recording's timeline
+        duration: Audio duration in seconds
         
     Returns:
-        Dictionary with pause metrics
+        Dictionary with speech rate metrics
     """
-    # Calculate RMS energy
-    frame_length = int(sr * 0.025)  # 25ms frames
-    hop_length = int(sr * 0.010)    # 10ms hop
-    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-    
-    # Normalize RMS
-    rms_norm = rms / np.max(rms) if np.max(rms) > 0 else rms
-    
-    # Define silence threshold
-    silence_threshold = 0.1
-    
-    # Find silent frames
-    silent_frames = rms_norm < silence_threshold
-    
-    # Group consecutive silent frames into pauses
-    pauses = []
-    is_pause = False
-    pause_start = 0
-    
-    min_pause_duration = 0.3  # Minimum pause duration in seconds
-    min_pause_frames = int(min_pause_duration * sr / hop_length)
-    
-    for i, silent in enumerate(silent_frames):
-        if silent and not is_pause:
-            # Start of a pause
-            is_pause = True
-            pause_start = i
-        elif not silent and is_pause:
-            # End of a pause
-            pause_duration = (i - pause_start) * hop_length / sr
-            if (i - pause_start) >= min_pause_frames:
-                pauses.append(pause_duration)
-            is_pause = False
-    
-    # Calculate pause metrics
-    pause_count = len(pauses)
-    avg_pause_duration = np.mean(pauses) if pauses else 0
-    total_duration = len(y) / sr
-    pause_frequency = pause_count / (total_duration / 60) if total_duration > 0 else 0
+    word_count = timeline.word_count
+    syllable_count = timeline.syllable_count
+    
+    # Calculate rates per minute
+    words_per_minute = (word_count / duration) * 60 if duration > 0 else 0
+    syllables_per_minute = (syllable_count / duration) * 60 if duration > 0 else 0
+    
+    # Rates per window show where the speaker rushes or slows down
+    pace_timeline, pace_variability = timeline.pace(duration)
     
     return {
-        "pause_count": pause_count,
-        "pause_frequency": round(pause_frequency, 1),  # pauses per minute
-        "avg_pause_duration": round(avg_pause_duration, 2),
-        "pauses": pauses
+        "word_count": word_count,
+        "syllable_count": syllable_count,
+        "words_per_minute": round(words_per_minute, 1),
+        "syllables_per_minute": round(syllables_per_minute, 1),
+        "pace_timeline": pace_timeline,
+        "pace_variability": pace_variability
     }
 
-def analyze_voice_stability(audio_path: str) -> Dict[str, float]:
-    """
-    Analyze voice stability using volume variation.
-    
-    Args:
-        audio_path: Path to the audio file
-        
-    Returns:
-        Dictionary with stability metrics
-    """
-    try:
-        # Load sound file
-        sound = parselmouth.Sound(audio_path)
-        
-        # Get intensity (volume)
-        intensity = call(sound, "To Intensity", 100, 0.0, "yes")
-        intensity_values = call(intensity, "Get all values", 0, 0, 0, 0)
-        
-        # Calculate stability metrics
-        if len(intensity_values) > 0:
-            intensity_mean = np.mean(intensity_values)
-            intensity_std = np.std(intensity_values)
-            
-            # Coefficient of variation as stability measure
-            volume_variation = intensity_std / intensity_mean if intensity_mean > 0 else 0
-            
-            # Convert to stability score (lower variation = higher stability)
-            volume_stability = max(0, 10 - (volume_variation * 20))
-            
-            return {
-                "intensity_mean": round(intensity_mean, 1),
-                "intensity_std": round(intensity_std, 1),
-                "volume_variation": round(volume_variation, 3),
-                "volume_stability": round(volume_stability, 1)
-            }
-        else:
-            return {
-                "intensity_mean": 0,
-                "intensity_std": 0,
-                "volume_variation": 0,
-                "volume_stability": 5.0
-            }
-    except Exception as e:
-        return {
-            "intensity_mean": 0,
-            "intensity_std": 0,
-            "volume_variation": 0,
-            "volume_stability": 5.0,
-            "error": str(e)
-        }
-
-def analyze_speech_fluency(transcript: str) -> Dict[str, Any]:
+def analyze_speech_fluency(timeline: SpeechTimeline) -> Dict[str, Any]:
     """
     Analyze speech fluency by detecting filler words.
     
     Args:
-        transcript: Text transcript
+        timeline: Transcribed words on the recording's timeline
         
     Returns:
         Dictionary with fluency metrics
     """
-    # List of common filler words and sounds
-    filler_words = [
-        "um", "uh", "er", "ah", "like", "you know", "so", "actually", 
-        "basically", "literally", "kind of", "sort of", "i mean"
-    ]
-    
-    # Convert transcript to lowercase for easier matching
-    lower_transcript = transcript.lower()
-    
-    # Count filler words
-    filler_word_count = 0
-    found_fillers = []
-    
-    for filler in filler_words:
-        # Count occurrences
-        count = lower_transcript.count(f" {filler} ")
-        if count > 0:
-            filler_word_count += count
-            found_fillers.append({"word": filler, "count": count})
+    found_fillers = timeline.filler_counts()
+    filler_word_count = sum(filler["count"] for filler in found_fillers)
     
     # Calculate filler word rate
-    word_count = len(transcript.split())
+    word_count = timeline.word_count
     filler_rate = filler_word_count / word_count if word_count > 0 else 0
     
     return {
@@ -539,36 +351,29 @@ def calculate_voice_steadiness(pitch_variability: float, volume_stability: float
     
     return steadiness_score
 
-def assess_speech_coherence(transcript: str) -> float:
+def assess_speech_coherence(document: TranscriptDocument) -> float:
     """
     Assess speech coherence based on sentence structure and flow.
     
     Args:
-        transcript: Text transcript
+        document: Tokenized transcript
         
     Returns:
         Coherence score (0-10)
     """
     # Basic coherence assessment using sentence length variation
-    sentences = []
-    for end_mark in ['.', '!', '?']:
-        parts = transcript.split(end_mark)
-        for part in parts[:-1]:  # Skip the last part which might be empty
-            if part.strip():
-                sentences.append(part.strip())
-    
-    # If no clear sentences, split by commas as fallback
-    if len(sentences) <= 1:
-        parts = transcript.split(',')
-        sentences = [part.strip() for part in parts if part.strip()]
+    sentence_lengths = document.sentence_lengths
+    
+    # If no clear sentences, use comma-separated clauses as fallback
+    if len(sentence_lengths) <= 1:
+        sentence_lengths = document.clause_lengths
     
     # If still no sentences, return default score
-    if len(sentences) <= 1:
+    if len(sentence_lengths) <= 1:
         return 5.0
     
     # Calculate sentence length statistics
-    sentence_lengths = [len(s.split()) for s in sentences]
-    avg_length = sum(sentence_lengths) / len(sentence_lengths)
+    avg_length = float(np.mean(sentence_lengths))
     
     # Penalize very short or very long average sentence length
     if avg_length < 5: